@@ -0,0 +1,79 @@
+"""
+Copyright (c) 2025 Wojciech Kwiatkowski
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+"""
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from src.backend.geo_design import Airfoil, Surface
+from src.backend.geo_design.geometry_generator import FromAvl
+from .common import measure, large_geometry
+
+
+def bench_geometry_string():
+    geometry = large_geometry(nof_surfaces=20, nof_sections=100)
+
+    def changed_string():
+        for surface in geometry.surfaces.values(): surface.touch()
+        return geometry.string()
+
+    measure('Geometry.string() 20 surfaces x 100 sections', changed_string)
+    measure('Geometry.string() 20 surfaces x 100 sections, unchanged', geometry.string, number=20)
+    with TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / 'bench.avl'
+        measure('Geometry.write() 20 surfaces x 100 sections, unchanged',
+                lambda: geometry.save_to_avl(path).close(), number=20)
+
+
+def bench_from_avl():
+    geometry = large_geometry(nof_surfaces=20, nof_sections=100)
+    with TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / 'bench.avl'
+        geometry.save_to_avl(path).close()
+        measure('FromAvl.load 20 surfaces x 100 sections', lambda: FromAvl.load(path))
+
+
+def bench_from_avl_large():
+    geometry = large_geometry(nof_surfaces=50, nof_sections=40)
+    with TemporaryDirectory() as temp_dir:
+        inline_path = Path(temp_dir) / 'inline.avl'
+        with open(inline_path, 'w') as f: f.write(geometry.string())
+        afile_path = Path(temp_dir) / 'afile.avl'
+        geometry.write_avl_file(afile_path)
+        measure('FromAvl.load 50 surfaces x 40 sections, AIRFOIL', lambda: FromAvl.load(inline_path))
+        measure('FromAvl.load 50 surfaces x 40 sections, AFILE', lambda: FromAvl.load(afile_path))
+
+
+def bench_surface_metrics():
+    surface = list(large_geometry(nof_surfaces=1, nof_sections=500).surfaces.values())[0]
+    measure('Surface.area() 500 sections', surface.area, number=20)
+    measure('Surface.length_abs 500 sections', lambda: surface.length_abs, number=20)
+    measure('Surface.is_straight 500 sections', lambda: surface.is_straight, number=20)
+    measure('Surface.sort_sections() 500 sections', surface.sort_sections, number=20)
+    measure('Surface.distribute_points() 500 sections', lambda: surface.distribute_points(3000), number=20)
+
+
+def bench_geometry_properties():
+    geometry = large_geometry(nof_surfaces=20, nof_sections=100)
+    measure('Geometry Sref, Cref, Bref 20 surfaces x 100 sections',
+            lambda: (geometry.surface_area, geometry.chord_length, geometry.span_length), number=20)
+
+
+def bench_set_mechanization():
+    airfoil = Airfoil.from_naca('0012')
+
+    def mechanized_surface():
+        surface = Surface.template.simple_tapered(name='Wing', length=10, chord=1, taper_ratio=.5, sweep_angle=5,
+                                                  origin_position=(0, 0, 0), inclination_angle=0, dihedral_angle=3,
+                                                  airfoil=airfoil, mid_gap=0)
+        surface.add_section_gentle([10 * (i + .5) / 400 for i in range(400)])
+        surface.set_mechanization(flaps=[(.1 + .5 * i, .3 + .5 * i, .7) for i in range(10)],
+                                  ailerons=[(5.1 + .5 * i, 5.3 + .5 * i, .75) for i in range(9)])
+        return surface
+
+    measure('Surface.set_mechanization() 400 sections, 19 controls', mechanized_surface)
@@ -0,0 +1,110 @@
+"""
+Copyright (c) 2025 Wojciech Kwiatkowski
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+"""
+
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from src.backend import ImageGetter, PlotCache
+from src.backend.geo_design import GeometryGenerator
+from .common import measure, fake_avl, fake_gs
+
+# Ghostscript takes a few tenths of a second to start on Windows.
+gs_startup = 0.2
+
+
+def write_ps_file(path: Path, nof_pages: int = 1) -> None:
+    """Writes a PostScript file like the hardcopy of ``fake_avl.py``."""
+    with open(path, 'w') as f:
+        f.write('%!PS-Adobe-2.0\n%%Creator: fake_avl\n')
+        for page in range(1, nof_pages + 1):
+            f.write(f'%%Page: {page} {page}\nnewpath 72 72 moveto 540 720 lineto stroke\nshowpage\n')
+        f.write(f'%%Trailer\n%%Pages: {nof_pages}\n%%EOF\n')
+
+
+def legacy_ps2png(ps_path: Path, png_path: Path) -> None:
+    """The one-shot conversion at 300 dpi, used by ``ImageGetter`` before the Ghostscript worker."""
+    subprocess.run(ImageGetter.gs_command + ['-dSAFER', '-dBATCH', '-dNOPAUSE', '-sDEVICE=png16m', '-r300',
+                                             f'-sOutputFile={png_path}', str(ps_path)], check=True)
+
+
+def bench_ps2png():
+    with TemporaryDirectory() as temp_dir, fake_gs(startup=gs_startup):
+        workspace = ImageGetter.create_workspace(temp_dir, 'bench')
+        ps_path, png_path = workspace / 'plot.ps', workspace / 'plot.png'
+        write_ps_file(ps_path)
+        measure('PostScript to PNG, one-shot Ghostscript, 300 dpi', lambda: legacy_ps2png(ps_path, png_path), repeat=3)
+        worker = ImageGetter.gs_worker(temp_dir)
+        for resolution in (300, 150):
+            measure(f'PostScript to PNG, GhostscriptWorker, {resolution} dpi',
+                    lambda: worker.convert(ps_path, png_path, resolution), repeat=3)
+
+
+def bench_get_trefftz():
+    """Successive Trefftz plots, like flipping through the pages of a series."""
+    geometry = GeometryGenerator.default()
+    geometry.distribute_points()
+    data = {'alpha -> alpha': [i * 1.0 for i in range(5)]}
+    with TemporaryDirectory() as temp_dir, fake_avl(), fake_gs(startup=gs_startup):
+        measure('ImageGetter.get_trefftz 5 pages',
+                lambda: [ImageGetter.get_trefftz(geometry, data, i, 0, Path(temp_dir)) for i in range(5)], repeat=3)
+
+
+def bench_get_trefftz_concurrent():
+    """Four Trefftz plots one after another, and from four threads at once, each plot in its own workspace."""
+    geometry = GeometryGenerator.default()
+    geometry.distribute_points()
+    data = {'alpha -> alpha': [i * 1.0 for i in range(4)]}
+    with TemporaryDirectory() as temp_dir, fake_avl(latency=0.05, startup=0.1), fake_gs(startup=gs_startup):
+        def plot(i): return ImageGetter.get_trefftz(geometry, data, i, 0, Path(temp_dir))
+
+        measure('ImageGetter.get_trefftz 4 plots, sequential', lambda: [plot(i) for i in range(4)], repeat=3)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            measure('ImageGetter.get_trefftz 4 plots, 4 threads', lambda: list(executor.map(plot, range(4))), repeat=3)
+
+
+def bench_export_plots():
+    """The Trefftz plots of a whole series, one by one, and by a single AVL run and a single Ghostscript job."""
+    geometry = GeometryGenerator.default()
+    geometry.distribute_points()
+    data = {'alpha -> alpha': [i * 1.0 for i in range(10)]}
+    with TemporaryDirectory() as temp_dir, fake_avl(latency=0.05, startup=0.1), fake_gs(startup=gs_startup):
+        temp_dir = Path(temp_dir)
+
+        def one_by_one():
+            for i in range(10):
+                ImageGetter.get_trefftz(geometry, data, i, 0, temp_dir).save(temp_dir / f'trefftz_{i + 1}.png')
+
+        measure('Trefftz plots of 10 cases, one by one', one_by_one, repeat=3)
+        measure('Trefftz plots of 10 cases, ImageGetter.export_plots to PNG',
+                lambda: ImageGetter.export_plots(geometry, data, 0, temp_dir / 'export', temp_dir), repeat=3)
+        measure('Trefftz plots of 10 cases, ImageGetter.export_plots to PDF',
+                lambda: ImageGetter.export_plots(geometry, data, 0, temp_dir / 'export.pdf', temp_dir), repeat=3)
+
+
+def bench_get_plot():
+    """Showing the Trefftz plot of a results page, made by AVL, or found in the plot cache after a prefetch."""
+    geometry = GeometryGenerator.default()
+    geometry.distribute_points()
+    data = {'alpha -> alpha': [i * 1.0 for i in range(3)]}
+    default_cache = ImageGetter.plot_cache
+    with TemporaryDirectory() as temp_dir, fake_avl(latency=0.05, startup=0.1), fake_gs(startup=gs_startup):
+        temp_dir = Path(temp_dir)
+        try:
+            measure('Trefftz plot, made by AVL', lambda: ImageGetter.get_trefftz(geometry, data, 1, 0, temp_dir))
+            ImageGetter.plot_cache = PlotCache(temp_dir / 'cache')
+            ImageGetter.get_plot('trefftz', geometry, data, 1, 0, temp_dir)
+            measure('Trefftz plot, ImageGetter.get_plot from memory',
+                    lambda: ImageGetter.get_plot('trefftz', geometry, data, 1, 0, temp_dir))
+            ImageGetter.plot_cache = PlotCache(temp_dir / 'cache', max_memory=0)
+            measure('Trefftz plot, ImageGetter.get_plot from disk',
+                    lambda: ImageGetter.get_plot('trefftz', geometry, data, 1, 0, temp_dir))
+        finally:
+            ImageGetter.plot_cache = default_cache
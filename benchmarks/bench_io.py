@@ -0,0 +1,81 @@
+"""
+Copyright (c) 2025 Wojciech Kwiatkowski
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+"""
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from src.backend import AVLInterface, load_from_csv
+from src.backend.geo_design import Airfoil, AirfoilLibrary
+from .common import measure, naca_points
+
+names = ['alpha -> alpha', 'beta -> beta', 'pb/2V -> pb/2V', 'qc/2V -> qc/2V', 'rb/2V -> rb/2V',
+         'flaps -> flaps', 'ailerons -> ailerons', 'elevators -> elevators']
+
+
+def bench_create_run_file_contents():
+    data = {name: [i * 0.01 + j for i in range(1000)] for j, name in enumerate(names)}
+    measure('AVLInterface.create_run_file_contents 1000 cases',
+            lambda: AVLInterface.create_run_file_contents(data, 1000))
+
+
+def bench_load_from_csv():
+    with TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / 'sweep.csv'
+        rows = [','.join(f'{i * 0.01 + j}' for j in range(len(names))) for i in range(10000)]
+        path.write_text(','.join(names) + '\n' + '\n'.join(rows) + '\n')
+        measure('load_from_csv 10000 rows x 8 columns', lambda: load_from_csv(path))
+
+
+def write_airfoil_files(directory: Path, nof_points: int) -> tuple[Path, Path]:
+    """Writes the same airfoil in the Selig and the Lednicer format, returns the paths."""
+    points = naca_points(nof_points=nof_points)
+    selig = directory / 'selig.dat'
+    selig.write_text('BENCH SELIG\n' + ''.join(f' {x:.6f}  {y:.6f}\n' for x, y in points))
+    half = nof_points // 2
+    upper = list(reversed(points[:half + 1]))
+    lower = [upper[0]] + points[half + 1:]
+    lednicer = directory / 'lednicer.dat'
+    lednicer.write_text(f'BENCH LEDNICER\n{len(upper)}. {len(lower)}.\n\n'
+                        + ''.join(f'{x:.6f} {y:.6f}\n' for x, y in upper) + '\n'
+                        + ''.join(f'{x:.6f} {y:.6f}\n' for x, y in lower))
+    return selig, lednicer
+
+
+def bench_airfoil_from_file():
+    with TemporaryDirectory() as temp_dir:
+        selig, lednicer = write_airfoil_files(Path(temp_dir), 401)
+        for name, path in (('Selig', selig), ('Lednicer', lednicer)):
+            def load_uncached():
+                Airfoil.clear_file_cache()
+                return Airfoil.from_file(path)
+
+            measure(f'Airfoil.from_file {name} 401 points', load_uncached, number=20)
+            measure(f'Airfoil.from_file {name} 401 points, cached', lambda: Airfoil.from_file(path), number=200)
+
+
+def bench_airfoil_library():
+    with TemporaryDirectory() as temp_dir:
+        directory = Path(temp_dir) / 'airfoils'
+        directory.mkdir()
+        for i in range(2000):
+            points = naca_points(thickness=0.04 + i / 10000, nof_points=121)
+            (directory / f'bench{i:04d}.dat').write_text(f'BENCH {i}\n' + ''.join(f'{x:.6f} {y:.6f}\n' for x, y in points))
+
+        def scan_cold():
+            library = AirfoilLibrary(Path(temp_dir) / f'cold{len(list(Path(temp_dir).glob("*.sqlite")))}.sqlite')
+            library.scan(directory)
+            library.close()
+
+        library = AirfoilLibrary(Path(temp_dir) / 'library.sqlite')
+        library.scan(directory)
+        measure('AirfoilLibrary.scan 2000 files, new index', scan_cold, repeat=3)
+        measure('AirfoilLibrary.scan 2000 files, unchanged', lambda: library.scan(directory))
+        measure('AirfoilLibrary.search name, 2000 files', lambda: library.search('12'), number=20)
+        measure('AirfoilLibrary.search thickness, 2000 files', lambda: library.search(thickness=(0.1, 0.12)), number=20)
+        library.close()
@@ -0,0 +1,91 @@
+"""
+Copyright (c) 2025 Wojciech Kwiatkowski
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+"""
+
+import re
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from src.backend.avl_interface.results_parser import ResultsParser
+from .common import measure
+from .fake_avl import FakeAVL, parse_args
+
+
+def st_file_contents(alpha: float, controls: list[str]) -> str:
+    """Returns the contents of an ST file, as written by the fake AVL."""
+    avl = FakeAVL(parse_args([]))
+    avl.geometry_name = 'Bench'
+    avl.surfaces = ['Wing', 'H Tail', 'V Tail']
+    avl.controls = controls
+    avl.nof_sections = 12
+    avl.cases = [{'alpha': alpha}]
+    solution = avl.solution()
+    return '\n'.join(avl.forces_block(solution) + avl.st_block(solution)) + '\n'
+
+
+def st_file_to_dict(st_str: str) -> dict[str, float]:
+    """Takes the raw contents of the 'ST' file and converts it to a name-value dict."""
+    st_str = re.sub(r'\s*=\s*', '=', st_str)
+    st_str = re.sub(r'\n', '', st_str)
+    st_str = re.sub(r'Clb Cnr / Clr Cnb', 'Clb_Cnr/Clr_Cnb', st_str)
+    vals = st_str.split()
+    _r: dict[str, float] = {}
+    for val in vals:
+        if not '=' in val: continue
+        k, v = val.split('=')
+        _r[k] = float(v)
+    return _r
+
+
+def split_st_dict(st_dict: dict[str, float]) -> list[dict[str, float]]:
+    """Splits the 'ST_file' dict into 'forces' and 'ST' """
+    breakpoints = ['Alpha', 'CLa']
+    result = []
+    current_dict = {}
+
+    for key, value in st_dict.items():
+        if key in breakpoints and current_dict:
+            result.append(current_dict)
+            current_dict = {}
+        current_dict[key] = value
+
+    if current_dict:
+        result.append(current_dict)  # Append the last chunk
+
+    return result[1:]
+
+
+def legacy_parse_st(contents: str) -> list[dict[str, float]]:
+    """
+    The multi-pass parsing of an ST file, used before ``ResultsParser.parse_st``.
+    Kept as the reference that ``parse_st`` is checked against.
+    """
+    data = split_st_dict(st_file_to_dict(contents))
+    data[0] = ResultsParser.sort_forces_dict(data[0])
+    data[1] = ResultsParser.sort_st_dict(data[1])
+    return data
+
+
+def bench_st_file_to_dict():
+    contents = st_file_contents(2.0, ['flaps', 'ailerons', 'elevators', 'rudder'])
+    measure('st_file_to_dict (reference)', lambda: st_file_to_dict(contents), number=200)
+
+
+def bench_parse_st():
+    contents = st_file_contents(2.0, ['flaps', 'ailerons', 'elevators', 'rudder'])
+    assert ResultsParser.parse_st(contents) == legacy_parse_st(contents)
+    measure('ST parsing, multi-pass (st_file_to_dict, split, sort)', lambda: legacy_parse_st(contents), number=200)
+    measure('ST parsing, single-pass (ResultsParser.parse_st)', lambda: ResultsParser.parse_st(contents), number=200)
+
+
+def bench_all_sts_to_data():
+    controls = ['flaps', 'ailerons', 'elevators', 'rudder']
+    with TemporaryDirectory() as temp_dir:
+        paths = [Path(temp_dir) / f'{i + 1}' for i in range(1000)]
+        for i, path in enumerate(paths): path.write_text(st_file_contents(i / 100, controls))
+        measure('ResultsParser.all_sts_to_data 1000 files', lambda: ResultsParser.all_sts_to_data(paths))
@@ -0,0 +1,23 @@
+"""
+Copyright (c) 2025 Wojciech Kwiatkowski
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+"""
+
+import numpy as np
+
+from src.backend import physics
+from .common import measure
+
+
+def bench_density():
+    altitudes = np.linspace(0, 8e4, 10000)
+    altitudes_list = altitudes.tolist()
+    table = physics.isa_table()
+    measure('get_density 10000 altitudes, one at a time', lambda: [physics.get_density(h) for h in altitudes_list])
+    measure('get_density 10000 altitudes, array', lambda: physics.get_density(altitudes), number=20)
+    measure('ISATable.get_density 10000 altitudes', lambda: table.get_density(altitudes), number=20)
+    measure('get_mach 10000 altitudes, array', lambda: physics.get_mach(100.0, altitudes), number=20)
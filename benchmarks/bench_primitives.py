@@ -0,0 +1,58 @@
+"""
+Copyright (c) 2025 Wojciech Kwiatkowski
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+"""
+
+from src.backend import Vector3, Vec3Array
+from src.backend.geo_design import Section, Airfoil
+from .common import measure, measure_memory
+
+
+class LegacyVector3:
+    """The ``__dict__``-based vector, used before ``Vector3`` got ``__slots__``."""
+
+    def __init__(self, x: float, y: float, z: float) -> None:
+        if not all(isinstance(val, (int, float)) for val in (x, y, z)):
+            raise TypeError("All arguments must be numeric")
+        self.x, self.y, self.z = x, y, z
+
+    def __add__(self, other: 'LegacyVector3') -> 'LegacyVector3':
+        return LegacyVector3(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __mul__(self, other: float) -> 'LegacyVector3':
+        return LegacyVector3(self.x * other, self.y * other, self.z * other)
+
+    def __sub__(self, other: 'LegacyVector3') -> 'LegacyVector3':
+        return self.__add__(other * -1)
+
+
+def sections(nof_sections: int) -> list[Section]:
+    airfoil = Airfoil.from_naca('2412')
+    return [Section((0.1 * i, 0.1 * i, 0.01 * i), 2 - i / nof_sections, 0, airfoil) for i in range(nof_sections)]
+
+
+def bench_vectors():
+    n = 20000
+    coordinates = [(0.1 * i, 0.2 * i, 0.3 * i) for i in range(n)]
+    legacy = [LegacyVector3(*xyz) for xyz in coordinates]
+    vectors = [Vector3(*xyz) for xyz in coordinates]
+    array = Vec3Array.from_vectors(vectors)
+    offset = Vector3(1, 2, 3)
+    measure_memory(f'{n} vectors, __dict__', lambda: [LegacyVector3(*xyz) for xyz in coordinates])
+    measure_memory(f'{n} vectors, Vector3', lambda: [Vector3(*xyz) for xyz in coordinates])
+    measure_memory(f'{n} vectors, Vec3Array', lambda: Vec3Array.from_vectors(vectors))
+    measure(f'{n} vectors, __dict__ a - b + a', lambda: [v - legacy[0] + v for v in legacy])
+    measure(f'{n} vectors, Vector3 a - b + a', lambda: [v - offset + v for v in vectors])
+    measure(f'{n} vectors, Vec3Array a - b + a', lambda: array - offset + array, number=100)
+
+
+def bench_sections():
+    n = 20000
+    measure_memory(f'{n} sections', lambda: sections(n))
+    measure(f'Creating {n} sections', lambda: sections(n))
+    created = sections(n)
+    measure(f'Mirroring {n} sections', lambda: [section.mirror() for section in created])
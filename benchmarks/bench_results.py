@@ -0,0 +1,51 @@
+"""
+Copyright (c) 2025 Wojciech Kwiatkowski
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+"""
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from src.backend import ResultSet
+from src.backend.avl_interface.results_parser import ResultsParser
+from .bench_parser import st_file_contents
+from .common import measure
+
+
+def series_cases(nof_cases: int) -> list[list[dict[str, float]]]:
+    """Returns the [forces, ST] results of a series, as parsed from the fake AVL ST files."""
+    controls = ['flaps', 'ailerons', 'elevators', 'rudder']
+    return [ResultsParser.parse_st(st_file_contents(i / 100, controls)) for i in range(nof_cases)]
+
+
+def legacy_to_csv(cases: list[list[dict[str, float]]], path: Path) -> None:
+    """The string-concatenating CSV export, used by the results display before ``ResultSet.to_csv``."""
+    to_save = ''
+    for key in (cases[0][0] | cases[0][1]).keys():
+        to_save += f'{key},'
+    to_save = to_save[:-1]
+    to_save += '\n'
+    for i in range(len(cases)):
+        for val in (cases[i][0] | cases[i][1]).values():
+            to_save += f'{val},'
+        to_save = to_save[:-1]
+        to_save += '\n'
+    to_save = to_save[:-1]
+    with open(path, 'w') as f:
+        f.write(to_save)
+
+
+def bench_result_set():
+    cases = series_cases(5000)
+    results = ResultSet.from_cases(cases)
+    measure('ResultSet.from_cases 5000 cases', lambda: ResultSet.from_cases(cases))
+    measure('CLtot column, list of dicts 5000 cases', lambda: [forces['CLtot'] for forces, _ in cases], number=20)
+    measure('CLtot column, ResultSet 5000 cases', lambda: results['CLtot'], number=2000)
+    with TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / 'results.csv'
+        measure('CSV export, string concatenation 5000 cases', lambda: legacy_to_csv(cases, path))
+        measure('CSV export, ResultSet.to_csv 5000 cases', lambda: results.to_csv(path))
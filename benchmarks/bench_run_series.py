@@ -0,0 +1,74 @@
+"""
+Copyright (c) 2025 Wojciech Kwiatkowski
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+"""
+
+import asyncio
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from src.backend import AVLInterface, AbortFlag
+from src.backend.geo_design import GeometryGenerator
+from .common import measure, fake_avl
+
+
+def series_data(nof_cases: int) -> dict[str, list[float]]:
+    return {'alpha -> alpha': [i * 0.1 for i in range(nof_cases)],
+            'beta -> beta': [0.0] * nof_cases,
+            'flaps -> flaps': [5.0] * nof_cases}
+
+
+def bench_run_series():
+    geometry = GeometryGenerator.default()
+    geometry.distribute_points()
+    data = series_data(200)
+    with TemporaryDirectory() as temp_dir, fake_avl():
+        for workers in (1, 4):
+            measure(f'AVLInterface.run_series 200 cases, {workers} workers',
+                    lambda: AVLInterface.run_series(geometry, data, 0, AbortFlag(), Path(temp_dir), workers))
+
+
+def bench_run_series_latency():
+    """With a latency per case, to see the gain of running the shards in parallel."""
+    geometry = GeometryGenerator.default()
+    geometry.distribute_points()
+    data = series_data(40)
+    with TemporaryDirectory() as temp_dir, fake_avl(latency=0.01, startup=0.1):
+        for workers in (1, 4):
+            measure(f'AVLInterface.run_series 40 cases, 10 ms each, {workers} workers',
+                    lambda: AVLInterface.run_series(geometry, data, 0, AbortFlag(), Path(temp_dir), workers),
+                    repeat=3)
+
+
+def bench_async_run_series():
+    geometry = GeometryGenerator.default()
+    geometry.distribute_points()
+    data = series_data(200)
+    with TemporaryDirectory() as temp_dir, fake_avl():
+        measure('AVLInterface.async_run_series 200 cases, 4 workers',
+                lambda: asyncio.run(AVLInterface.async_run_series(geometry, data, 0, Path(temp_dir), 4)))
+
+
+def bench_run_series_envelope():
+    """A flight-envelope sweep, 10 altitudes of 20 cases, run one altitude at a time, and as a single series."""
+    geometry = GeometryGenerator.default()
+    geometry.distribute_points()
+    altitudes = [i * 1000.0 for i in range(10)]
+    data = series_data(20)
+    envelope = {name: values * len(altitudes) for name, values in data.items()}
+    envelope['altitude'] = [altitude for altitude in altitudes for _ in range(20)]
+
+    async def per_altitude():
+        return [await AVLInterface.async_run_series(geometry, data, altitude, Path(temp_dir), 1)
+                for altitude in altitudes]
+
+    with TemporaryDirectory() as temp_dir, fake_avl(startup=0.05):
+        measure('AVLInterface.async_run_series 10 x 20 cases, one series per altitude',
+                lambda: asyncio.run(per_altitude()), repeat=3)
+        measure('AVLInterface.async_run_series 10 x 20 cases, altitude series',
+                lambda: asyncio.run(AVLInterface.async_run_series(geometry, envelope, 0, Path(temp_dir), 1)),
+                repeat=3)
@@ -0,0 +1,148 @@
+"""
+Copyright (c) 2025 Wojciech Kwiatkowski
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+"""
+
+import math
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+import tracemalloc
+from typing import Callable, Iterator
+
+from src.backend import AVLInterface, ImageGetter
+from src.backend.geo_design import Geometry, Surface, Section, Airfoil, Flaps
+
+fake_avl_path = Path(__file__).parent / 'fake_avl.py'
+fake_gs_path = Path(__file__).parent / 'fake_gs.py'
+results: list[dict] = []  # Every measurement, collected by the runner.
+default_repeat = 5
+
+
+def measure(name: str, func: Callable[[], object], repeat: int = None, number: int = 1) -> dict:
+    """
+    Times the given function, prints and records the result.
+
+    Parameters:
+        name (str): The name of the benchmark.
+        func (Callable): The function to time, without arguments.
+        repeat (int): The number of measurements. Defaults to ``default_repeat``.
+        number (int): The number of calls per measurement, for very short functions.
+    Returns:
+        dict: The name, the best and median time per call in seconds, and the repeat and number.
+    """
+    repeat = repeat or default_repeat
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        for _ in range(number): func()
+        times.append((perf_counter() - start) / number)
+    result = {'name': name, 'best': min(times), 'median': median(times), 'repeat': repeat, 'number': number}
+    print(f'{name:<60s} best {format_time(result['best']):>10s}   median {format_time(result['median']):>10s}')
+    results.append(result)
+    return result
+
+
+def measure_memory(name: str, func: Callable[[], object]) -> dict:
+    """
+    Measures the memory allocated by the function and still held by its result, prints and records it.
+
+    Parameters:
+        name (str): The name of the benchmark.
+        func (Callable): The function to measure, without arguments. Its result is kept alive until measured.
+    Returns:
+        dict: The name, and the held memory in bytes as both the best and the median, so it can be compared.
+    """
+    tracemalloc.start()
+    try:
+        kept = func()
+        held, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del kept
+    result = {'name': name, 'best': held, 'median': held, 'repeat': 1, 'number': 1}
+    print(f'{name:<60s} held {held / 2 ** 20:>9.3f} MiB')
+    results.append(result)
+    return result
+
+
+def format_time(seconds: float) -> str:
+    """Returns the time in the most readable unit."""
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale: return f'{seconds / scale:.3f} {unit}'
+    return f'{seconds / 1e-9:.1f} ns'
+
+
+def naca_points(thickness: float = 0.12, nof_points: int = 61) -> list[tuple[float, float]]:
+    """Returns the points of a symmetric NACA 4-digit airfoil, from the trailing edge over the top to the bottom."""
+    half = nof_points // 2
+    xs = [0.5 * (1 - math.cos(math.pi * i / half)) for i in range(half + 1)]
+    ys = [5 * thickness * (0.2969 * x ** 0.5 - 0.1260 * x - 0.3516 * x ** 2 + 0.2843 * x ** 3 - 0.1015 * x ** 4)
+          for x in xs]
+    top = [(x, y) for x, y in zip(reversed(xs), reversed(ys))]
+    bottom = [(x, -y) for x, y in zip(xs[1:], ys[1:])]
+    return top + bottom
+
+
+def large_geometry(nof_surfaces: int = 20, nof_sections: int = 100) -> Geometry:
+    """Returns a geometry of tapered surfaces, each with the given number of sections, airfoils given by points,
+    and flaps on the inner half of the sections."""
+    airfoil = Airfoil.from_points(naca_points(), 'Bench')
+    surfaces = []
+    for i in range(nof_surfaces):
+        sections = [Section(leading_edge_position=(0.1 * j, 0.1 * j, 0.01 * j),
+                            chord=2 - j / nof_sections,
+                            inclination=0,
+                            airfoil=airfoil,
+                            control=Flaps(0.7) if j < nof_sections // 2 else None)
+                    for j in range(nof_sections)]
+        surfaces.append(Surface(name=f'Surface {i}', sections=sections, origin_position=(3 * i, 0, 0), airfoil=airfoil))
+    geometry = Geometry('Bench', surfaces=surfaces)
+    geometry.distribute_points(min(3000, nof_surfaces * nof_sections + 100))
+    return geometry
+
+
+@contextmanager
+def fake_avl(latency: float = 0.0, startup: float = 0.0, fail_rate: float = 0.0, max_cases: int = 25) -> Iterator[None]:
+    """
+    Makes ``AVLInterface`` run ``fake_avl.py`` with the given options, for the duration of the ``with`` block.
+
+    The results cache is disabled and the run case limit is detected again, so every run reaches the fake AVL.
+    """
+    saved = AVLInterface.avl_command, AVLInterface.results_cache, AVLInterface.run_case_limit
+    saved_args = os.environ.get('FAKE_AVL_ARGS')
+    AVLInterface.avl_command = [sys.executable, str(fake_avl_path)]
+    AVLInterface.results_cache = None
+    AVLInterface.run_case_limit = None
+    os.environ['FAKE_AVL_ARGS'] = (f'--latency {latency} --startup {startup} '
+                                   f'--fail-rate {fail_rate} --max-cases {max_cases}')
+    try:
+        yield
+    finally:
+        AVLInterface.session_pool.close_all()
+        AVLInterface.avl_command, AVLInterface.results_cache, AVLInterface.run_case_limit = saved
+        if saved_args is None: os.environ.pop('FAKE_AVL_ARGS')
+        else: os.environ['FAKE_AVL_ARGS'] = saved_args
+
+
+@contextmanager
+def fake_gs(startup: float = 0.0) -> Iterator[None]:
+    """Makes ``ImageGetter`` run ``fake_gs.py`` with the given start-up time, for the duration of the ``with`` block."""
+    saved = ImageGetter.gs_command
+    saved_args = os.environ.get('FAKE_GS_ARGS')
+    ImageGetter.gs_command = [sys.executable, str(fake_gs_path)]
+    os.environ['FAKE_GS_ARGS'] = f'--startup {startup}'
+    try:
+        yield
+    finally:
+        ImageGetter.close_worker()
+        ImageGetter.gs_command = saved
+        if saved_args is None: os.environ.pop('FAKE_GS_ARGS')
+        else: os.environ['FAKE_GS_ARGS'] = saved_args
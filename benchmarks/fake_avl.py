@@ -0,0 +1,384 @@
+"""
+Copyright (c) 2025 Wojciech Kwiatkowski
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+A pure-Python stand-in for ``avl.exe``, for benchmarking G-AVL on machines that cannot run the real solver.
+
+It reads the same stdin command protocol as AVL (top-level ``LOAD``, ``CASE``, ``OPER``, ``Q``, and in ``OPER``
+case selection, ``X``, ``ST``, ``T``, ``G`` and hardcopy ``H``), prints the same banners and prompts,
+and writes ST files in AVL's layout. The numbers are made up, but consistent with the run-case inputs.
+
+Usage:
+    python benchmarks/fake_avl.py [plane.avl] [--latency S] [--startup S] [--fail-rate P] [--max-cases N] [--seed N]
+
+The same options can also be given through the ``FAKE_AVL_ARGS`` environment variable.
+"""
+
+import argparse
+import math
+import os
+import random
+import re
+import shlex
+import sys
+import time
+from pathlib import Path
+
+EOL = '\r\n'  # Mimic the Windows build, whose output the parser expects.
+
+
+class FakeAVL:
+    """A single fake AVL process, reading commands from stdin until ``Q`` or the end of the input."""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.random = random.Random(args.seed)
+        self.geometry_name = ''
+        self.surfaces: list[str] = []
+        self.controls: list[str] = []
+        self.nof_sections = 0
+        self.cases: list[dict[str, float]] = [{}]
+        self.case_names: list[str] = ['-unnamed-']
+        self.current_case = 0
+        self.executed = False
+        self.ps_file = None
+        self.ps_pages = 0
+
+    # ---- output ----
+
+    @staticmethod
+    def write(text: str = '') -> None:
+        sys.stdout.write(text.replace('\n', EOL))
+
+    def line(self, text: str = '') -> None:
+        self.write(text + '\n')
+
+    def prompt(self, text: str, kind: str = 'c') -> str | None:
+        """Writes an AVL-style prompt without a newline and reads one line of input."""
+        self.write(f'\n{text}   {kind}>  ')
+        sys.stdout.flush()
+        line = sys.stdin.readline()
+        if not line: return None
+        return line.rstrip('\r\n')
+
+    # ---- loading ----
+
+    def banner(self) -> None:
+        self.line(' ' + '=' * 51)
+        self.line('  Athena Vortex Lattice  Program      Version  3.40')
+        self.line('  Copyright (C) 2002   Mark Drela, Harold Youngren')
+        self.line()
+        self.line('  This software comes with ABSOLUTELY NO WARRANTY,')
+        self.line('    subject to the GNU General Public License.')
+        self.line()
+        self.line('  Caveat computor')
+        self.line(' ' + '=' * 51)
+
+    def load_geometry(self, path: Path) -> None:
+        self.line()
+        self.line(f' Reading file: {path}  ...')
+        try:
+            lines = path.read_text().splitlines()
+        except OSError:
+            self.line(f' ** Open error on file: {path}')
+            return
+        content = [l.split('#')[0].split('!')[0].strip() for l in lines]
+        content = [l for l in content if l]
+        self.geometry_name = content[0] if content else ''
+        self.surfaces, self.controls, self.nof_sections = [], [], 0
+        for i, l in enumerate(content):
+            keyword = l[:4].upper()
+            if keyword == 'SURF' and i + 1 < len(content):
+                self.surfaces.append(content[i + 1])
+            elif keyword == 'SECT':
+                self.nof_sections += 1
+            elif keyword == 'CONT' and i + 1 < len(content):
+                name = content[i + 1].split()[0]
+                if name not in self.controls: self.controls.append(name)
+        self.line()
+        self.line(f' Configuration: {self.geometry_name}')
+        for surface in self.surfaces:
+            self.line()
+            self.line(f'  Building surface: {surface}')
+            self.line(f'     Reading airfoil from file: ')
+        self.line()
+        self.line(f' Mach = 0.0000  (default)')
+        self.line()
+        self.line(f'    {len(self.controls)} Control variables')
+        self.line(f'    0 Design parameters')
+        self.line()
+        self.line(f' Initializing blank run cases')
+
+    def load_mass(self, path: Path) -> None:
+        self.line(' ' + '-' * 63)
+        self.line(f' Trying to read file: {path}  ...')
+        self.line(f' Mass file  {path}  open error')
+        self.line(f' Internal mass defaults used')
+
+    def load_run_file(self, path: Path, announce=True) -> None:
+        if announce:
+            self.line(' ' + '-' * 63)
+            self.line(f' Trying to read file: {path}  ...')
+        try:
+            text = path.read_text()
+        except OSError:
+            self.line(f' Run case file  {path}  open error')
+            return
+        cases, names = [], []
+        for l in text.splitlines():
+            header = re.match(r'\s*Run case\s+\d+:\s*(.*)', l)
+            if header:
+                cases.append({})
+                names.append(header.group(1).strip())
+                continue
+            if '=' not in l or not cases: continue
+            key, value = l.rsplit('=', 1)
+            key = key.split('->')[0].strip()
+            try:
+                cases[-1][key] = float(value.split()[0])
+            except (ValueError, IndexError):
+                pass
+        if len(cases) > self.args.max_cases:
+            self.line(f' ** Run case array limit NRMAX reached.  Only {self.args.max_cases} cases read.')
+            cases, names = cases[:self.args.max_cases], names[:self.args.max_cases]
+        if not cases:
+            cases, names = [{}], ['-unnamed-']
+        self.cases, self.case_names = cases, names
+        self.current_case = 0
+        self.line()
+        self.line(f' Run cases read  ...')
+        for i, name in enumerate(names):
+            self.line(f'  {i + 1:3d}: {name}')
+
+    def main_menu(self) -> None:
+        self.line()
+        self.line('   ' + '=' * 58)
+        for text in ('Quit    Exit program', '', ' .OPER    Compute operating-point run cases',
+                     ' .MODE    Eigenvalue analysis of run cases', ' .TIME    Time-domain calculations', '',
+                     '  LOAD f  Read configuration input file', '  MASS f  Read mass distribution file',
+                     '  CASE f  Read run case file'):
+            self.line('   ' + text)
+
+    # ---- aerodynamics ----
+
+    def solution(self) -> dict[str, float]:
+        case = self.cases[self.current_case]
+        alpha = case.get('alpha', 0.0)
+        beta = case.get('beta', 0.0)
+        a, b = math.radians(alpha), math.radians(beta)
+        deflections = [case.get(c, 0.0) for c in self.controls]
+        CL = 4.6 * a + sum(0.01 * d for d in deflections)
+        CDi = CL ** 2 / (math.pi * 8 * 0.95)
+        return {'alpha': alpha, 'beta': beta, 'a': a, 'b': b, 'CL': CL, 'CDi': CDi,
+                'CY': -0.2 * b, 'Cl': -0.05 * b, 'Cm': -1.1 * a, 'Cn': 0.07 * b,
+                'pb': case.get('pb/2V', 0.0), 'qc': case.get('qc/2V', 0.0), 'rb': case.get('rb/2V', 0.0),
+                'Mach': case.get('Mach', 0.0), 'deflections': deflections}
+
+    def forces_block(self, s: dict) -> list[str]:
+        ca, sa = math.cos(s['a']), math.sin(s['a'])
+        lines = [
+            ' ' + '-' * 63,
+            ' Vortex Lattice Output -- Total Forces',
+            '',
+            f' Configuration: {self.geometry_name}',
+            f'     # Surfaces = {len(self.surfaces):3d}',
+            f'     # Strips   = {self.nof_sections * 10:3d}',
+            f'     # Vortices = {self.nof_sections * 60:3d}',
+            '',
+            '  Sref =  4.0000       Cref =  1.0000       Bref =  8.0000    ',
+            '  Xref =  0.0000       Yref =  0.0000       Zref =  0.0000    ',
+            '',
+            ' Standard axis orientation,  X fwd, Z down         ',
+            '',
+            f' Run case: {self.case_names[self.current_case]}',
+            '',
+            f"  Alpha = {s['alpha']:10.5f}     pb/2V = {s['pb']:10.5f}     p'b/2V = {s['pb']:10.5f}",
+            f"  Beta  = {s['beta']:10.5f}     qc/2V = {s['qc']:10.5f}",
+            f"  Mach  = {s['Mach']:10.3f}     rb/2V = {s['rb']:10.5f}     r'b/2V = {s['rb']:10.5f}",
+            '',
+            f"  CXtot = {s['CL'] * sa - s['CDi'] * ca:10.5f}     Cltot = {s['Cl']:10.5f}     Cl'tot = {s['Cl']:10.5f}",
+            f"  CYtot = {s['CY']:10.5f}     Cmtot = {s['Cm']:10.5f}",
+            f"  CZtot = {-s['CL'] * ca - s['CDi'] * sa:10.5f}     Cntot = {s['Cn']:10.5f}     Cn'tot = {s['Cn']:10.5f}",
+            '',
+            f"  CLtot = {s['CL']:10.5f}",
+            f"  CDtot = {s['CDi']:10.5f}",
+            f"  CDvis = {0:10.5f}     CDind = {s['CDi']:10.7f}",
+            f"  CLff  = {s['CL']:10.5f}     CDff  = {s['CDi']:10.7f}    | Trefftz",
+            f"  CYff  = {s['CY']:10.5f}         e = {0.95:10.4f}    | Plane  ",
+            '',
+        ]
+        for name, d in zip(self.controls, s['deflections']):
+            lines.append(f'   {name:<15s} = {d:10.5f}')
+        lines += ['', ' ' + '-' * 63]
+        return lines
+
+    def st_block(self, s: dict) -> list[str]:
+        r = lambda: self.random.uniform(-0.1, 0.1)  # noqa
+        lines = [
+            '',
+            ' Stability-axis derivatives...',
+            '',
+            '                             alpha                beta',
+            '                  ----------------    ----------------',
+            f" z' force CL |    CLa = {4.6:11.6f}    CLb = {r():11.6f}",
+            f" y  force CY |    CYa = {r():11.6f}    CYb = {-0.2:11.6f}",
+            f" x' mom.  Cl'|    Cla = {r():11.6f}    Clb = {-0.05:11.6f}",
+            f" y  mom.  Cm |    Cma = {-1.1:11.6f}    Cmb = {r():11.6f}",
+            f" z' mom.  Cn'|    Cna = {r():11.6f}    Cnb = {0.07:11.6f}",
+            '',
+            "                     roll rate  p'      pitch rate  q'        yaw rate  r'",
+            '                  ----------------    ----------------    ----------------',
+            f" z' force CL |    CLp = {r():11.6f}    CLq = {7.2:11.6f}    CLr = {r():11.6f}",
+            f" y  force CY |    CYp = {r():11.6f}    CYq = {r():11.6f}    CYr = {r():11.6f}",
+            f" x' mom.  Cl'|    Clp = {-0.5:11.6f}    Clq = {r():11.6f}    Clr = {r():11.6f}",
+            f" y  mom.  Cm |    Cmp = {r():11.6f}    Cmq = {-12.0:11.6f}    Cmr = {r():11.6f}",
+            f" z' mom.  Cn'|    Cnp = {r():11.6f}    Cnq = {r():11.6f}    Cnr = {-0.03:11.6f}",
+            '',
+        ]
+        if self.controls:
+            header = '                 '
+            for i, name in enumerate(self.controls):
+                header += f' {name:>11s}  d{i + 1:02d} '
+            lines += [header, '                 ' + '  ----------------' * len(self.controls)]
+            for label, prefix in ((" z' force CL |", 'CL'), (' y  force CY |', 'CY'), (" x' mom.  Cl'|", 'Cl'),
+                                  (' y  mom.  Cm |', 'Cm'), (" z' mom.  Cn'|", 'Cn'), (' Trefftz drag|', 'CDff'),
+                                  (' span eff.   |', 'e')):
+                line = label
+                for i in range(len(self.controls)):
+                    key = f'{prefix}d{i + 1:02d}'
+                    line += f' {key:>7s} = {r():11.6f}'
+                lines.append(line)
+            lines.append('')
+        lines += [
+            '',
+            f' Neutral point  Xnp = {0.27:11.6f}',
+            '',
+            f' Clb Cnr / Clr Cnb  = {1.2:11.6f}    (  > 1 if spirally stable )',
+        ]
+        return lines
+
+    def execute_case(self) -> bool:
+        time.sleep(self.args.latency)
+        if self.random.random() < self.args.fail_rate:
+            self.line()
+            self.line(' ***  Execution failed: injected failure')
+            return False
+        self.executed = True
+        self.line()
+        self.line(' Building normalwash AIC matrix...')
+        self.line(' Factoring normalwash AIC matrix...')
+        self.line(' Building source+doublet strength AIC matrix...')
+        self.line(' Building source+doublet velocity AIC matrix...')
+        self.line(' Building bound-vortex velocity matrix...')
+        self.line()
+        self.line(' iter d(alpha)   d(beta)    d(pb/2V)   d(qc/2V)   d(rb/2V)')
+        self.line('   1  0.000E+00  0.000E+00  0.000E+00  0.000E+00  0.000E+00')
+        for l in self.forces_block(self.solution()): self.line(l)
+        return True
+
+    def hardcopy(self) -> None:
+        if self.ps_file is None:
+            self.ps_file = open('plot.ps', 'w')
+            self.ps_file.write('%!PS-Adobe-2.0\n%%Creator: fake_avl\n')
+        self.ps_pages += 1
+        self.ps_file.write(f'%%Page: {self.ps_pages} {self.ps_pages}\n'
+                           f'newpath 72 72 moveto 540 720 lineto stroke\nshowpage\n')
+        self.ps_file.flush()
+        self.line()
+        self.line(' Hardcopy written to plot.ps')
+
+    def close_plot(self) -> None:
+        # Like Xplot11, the PostScript file is only finished when the program exits.
+        if self.ps_file is not None:
+            self.ps_file.write(f'%%Trailer\n%%Pages: {self.ps_pages}\n%%EOF\n')
+            self.ps_file.close()
+            self.ps_file = None
+
+    # ---- menus ----
+
+    def plot_menu(self, name: str) -> bool:
+        while True:
+            command = self.prompt(f' {name} plot command')
+            if command is None: return False
+            if not command.strip(): return True
+            if command.strip().upper() == 'H': self.hardcopy()
+
+    def oper(self) -> bool:
+        while True:
+            command = self.prompt(f' .OPER (case {self.current_case + 1}/{len(self.cases)})')
+            if command is None: return False
+            parts = command.split()
+            if not parts: return True
+            keyword, argument = parts[0].upper(), ' '.join(parts[1:])
+            if keyword.isdigit():
+                index = int(keyword) - 1
+                if 0 <= index < len(self.cases):
+                    self.current_case = index
+                    self.executed = False
+                else:
+                    self.line(f' ** Run case {keyword} does not exist')
+            elif keyword == 'X':
+                self.execute_case()
+            elif keyword == 'ST':
+                file_name = argument or self.prompt(' Enter filename, or <return> for screen output', 's')
+                if file_name is None: return False
+                if not self.executed:
+                    self.line(' ** Must execute the case first')
+                    continue
+                lines = self.forces_block(self.solution()) + self.st_block(self.solution())
+                if file_name.strip():
+                    with open(file_name.strip(), 'w') as f: f.write('\n'.join(lines) + '\n')
+                else:
+                    for l in lines: self.line(l)
+            elif keyword == 'T':
+                if not self.plot_menu('Trefftz'): return False
+            elif keyword == 'G':
+                if not self.plot_menu('Geometry'): return False
+            else:
+                self.line(f' * {keyword[:4]} command not recognized.  Type a "?" for list')
+
+    def run(self) -> None:
+        time.sleep(self.args.startup)
+        self.banner()
+        if self.args.file:
+            avl_path = Path(self.args.file)
+            self.load_geometry(avl_path)
+            self.load_mass(avl_path.with_suffix('.mass'))
+            self.load_run_file(avl_path.with_suffix('.run'))
+        self.main_menu()
+        while True:
+            command = self.prompt(' AVL')
+            if command is None: break
+            parts = command.split()
+            if not parts: continue
+            keyword, argument = parts[0].upper(), ' '.join(parts[1:])
+            if keyword in ('Q', 'QUIT'): break
+            elif keyword == 'OPER':
+                if not self.oper(): break
+            elif keyword == 'LOAD':
+                self.load_geometry(Path(argument or self.prompt(' Enter input filename', 's') or ''))
+            elif keyword == 'CASE':
+                self.load_run_file(Path(argument or self.prompt(' Enter run case filename', 's') or ''), False)
+            else:
+                self.line(f' * {keyword[:4]} command not recognized.  Type a "?" for list')
+        self.close_plot()
+        sys.stdout.flush()
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='A scriptable stand-in for avl.exe.')
+    parser.add_argument('file', nargs='?', default=None, help='The .avl file to load at start-up.')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds spent on every X (execute) command.')
+    parser.add_argument('--startup', type=float, default=0.0, help='Seconds spent before printing the banner.')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Probability of an injected execution error.')
+    parser.add_argument('--max-cases', type=int, default=25, help='Maximal number of run cases, like NRMAX.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the random values.')
+    return parser.parse_args(shlex.split(os.environ.get('FAKE_AVL_ARGS', '')) + argv)
+
+
+if __name__ == '__main__':
+    FakeAVL(parse_args(sys.argv[1:])).run()
@@ -0,0 +1,125 @@
+"""
+Copyright (c) 2025 Wojciech Kwiatkowski
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+A pure-Python stand-in for the Ghostscript executable, for benchmarking G-AVL on machines without Ghostscript.
+
+It renders every ``showpage`` of the input PostScript file as a blank letter-size page, at the requested resolution,
+so the cost of a conversion grows with the resolution like in Ghostscript, or as a single PDF file of blank pages
+for the 'pdfwrite' device. It supports the one-shot command line, ``-sDEVICE=png16m -r300 -sOutputFile=out.png in.ps``,
+and the single-line jobs sent by ``GhostscriptWorker`` to the interactive mode, started without an input file.
+With ``-dSAFER``, the files not matching any ``--permit-file-read=``/``--permit-file-write=`` pattern are refused,
+with the pattern rules of Ghostscript: 'dir/*' for a directory and its subdirectories, 'dir/' for a directory only,
+and the exact path otherwise.
+
+Usage:
+    python benchmarks/fake_gs.py [options] [file.ps] [--startup S]
+
+The ``--startup`` option can also be given through the ``FAKE_GS_ARGS`` environment variable.
+"""
+
+import re
+import shlex
+import sys
+import time
+import os
+from pathlib import Path
+
+from PIL import Image
+
+ps_string = r'\(((?:[^()\\]|\\.)*)\)'
+job_pattern = re.compile(r'\((?P<device>\w+)\) selectdevice << /HWResolution \[(?P<resolution>\d+) \d+\] '
+                         rf'/OutputFile {ps_string} >> setpagedevice {ps_string} run}}')
+print_pattern = re.compile(rf'{ps_string} print')
+
+
+def unescape(text: str) -> str:
+    return re.sub(r'\\(.)', lambda match: '\n' if match.group(1) == 'n' else match.group(1), text)
+
+
+permissions: dict[str, list[str]] | None = None  # The permitted patterns with -dSAFER, by 'read' and 'write'
+
+
+def permitted(path: str, access: str) -> bool:
+    """Returns ``True`` if the file may be accessed, see the module docstring."""
+    if permissions is None: return True
+    for pattern in permissions[access]:
+        if pattern.endswith('/*') and path.startswith(pattern[:-1]): return True
+        if pattern.endswith('/') and path.startswith(pattern) and '/' not in path[len(pattern):]: return True
+        if path == pattern: return True
+    return False
+
+
+def render(ps_path: Path, output_path: str, resolution: int, device: str) -> None:
+    """Writes a blank image of every page of the file, raises ``OSError`` if the file cannot be read,
+    and ``PermissionError`` if it may not be accessed."""
+    if not permitted(ps_path.as_posix(), 'read') or not permitted(output_path, 'write'):
+        raise PermissionError(f'{ps_path} or {output_path}')
+    with open(ps_path) as f:
+        nof_pages = f.read().count('showpage')
+    mode = 'RGBA' if device == 'pngalpha' else 'RGB'
+    size = (int(8.5 * resolution), int(11 * resolution))
+    if device == 'pdfwrite':
+        pages = [Image.new(mode, size, 'white') for _ in range(nof_pages)]
+        pages[0].save(output_path, save_all=True, append_images=pages[1:], resolution=resolution)
+        return
+    for page in range(1, nof_pages + 1):
+        path = output_path.replace('%d', str(page)) if '%d' in output_path else output_path
+        Image.new(mode, size, 'white').save(path)
+
+
+def interactive() -> None:
+    """Runs the jobs read from stdin, one per line, until 'quit' or the end of the input."""
+    for line in sys.stdin:
+        if line.strip() == 'quit': break
+        strings = [unescape(text) for text in print_pattern.findall(line)]
+        job = job_pattern.search(line)
+        if job is None:
+            sys.stdout.write(''.join(strings))
+        else:
+            try:
+                render(Path(unescape(job.group(4))), unescape(job.group(3)), int(job.group('resolution')),
+                       job.group('device'))
+                sys.stdout.write(strings[0])
+            except PermissionError:
+                sys.stdout.write(strings[1] + '/invalidfileaccess\n')
+            except OSError:
+                sys.stdout.write(strings[1] + '/undefinedfilename\n')
+        sys.stdout.flush()
+
+
+def main(argv: list[str]) -> None:
+    global permissions
+    argv = shlex.split(os.environ.get('FAKE_GS_ARGS', '')) + argv
+    options = {'startup': 0.0, 'device': 'png16m', 'resolution': 72, 'output': None}
+    files = []
+    args = iter(argv)
+    for arg in args:
+        if arg == '--startup': options['startup'] = float(next(args))
+        elif arg.startswith('-sDEVICE='): options['device'] = arg.removeprefix('-sDEVICE=')
+        elif arg.startswith('-r'): options['resolution'] = int(arg.removeprefix('-r'))
+        elif arg.startswith('-sOutputFile='): options['output'] = arg.removeprefix('-sOutputFile=')
+        elif arg == '-dSAFER': permissions = permissions or {'read': [], 'write': []}
+        elif arg.startswith('--permit-file-'):
+            access, pattern = arg.removeprefix('--permit-file-').split('=', 1)
+            permissions = permissions or {'read': [], 'write': []}
+            permissions[access].append(pattern)
+        elif not arg.startswith('-'): files.append(Path(arg))
+    time.sleep(options['startup'])
+    if not files:
+        interactive()
+        return
+    if permissions is not None:
+        # Like Ghostscript, the files given on the command line are permitted.
+        permissions['read'] += [file.as_posix() for file in files]
+        permissions['write'].append(options['output'])
+    for file in files:
+        render(file, options['output'], options['resolution'], options['device'])
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
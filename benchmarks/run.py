@@ -0,0 +1,76 @@
+"""
+Copyright (c) 2025 Wojciech Kwiatkowski
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Runs the benchmarks, i.e. every ``bench_*`` function of the ``bench_*.py`` modules in this directory.
+
+Usage:
+    python -m benchmarks.run [-k PATTERN] [--repeat N] [--save results.json] [--compare baseline.json]
+
+With ``--compare``, exits with code 1 if any benchmark got slower than the baseline by more than the tolerance,
+so it can be used to catch performance regressions on CI.
+"""
+
+import argparse
+import importlib
+import json
+import logging
+import sys
+from pathlib import Path
+
+from . import common
+
+
+def collect(pattern: str = '') -> list:
+    """Returns all the benchmark functions whose module or function name contains the pattern."""
+    functions = []
+    for path in sorted(Path(__file__).parent.glob('bench_*.py')):
+        module = importlib.import_module(f'{__package__}.{path.stem}')
+        for name, func in vars(module).items():
+            if name.startswith('bench_') and callable(func) and pattern in f'{path.stem}.{name}':
+                functions.append(func)
+    return functions
+
+
+def compare(results: list[dict], baseline_path: Path, tolerance: float) -> bool:
+    """Prints the comparison with the baseline, returns ``False`` if any benchmark regressed."""
+    with open(baseline_path) as f:
+        baseline = {result['name']: result for result in json.load(f)}
+    passed = True
+    print(f'\nCompared to {baseline_path.name}:')
+    for result in results:
+        if result['name'] not in baseline: continue
+        ratio = result['best'] / baseline[result['name']]['best']
+        regressed = ratio > tolerance
+        passed &= not regressed
+        print(f'{result['name']:<60s} {ratio:6.2f}x{'   REGRESSION' if regressed else ''}')
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs the G-AVL benchmarks.')
+    parser.add_argument('-k', dest='pattern', default='', help='Only run the benchmarks containing the pattern.')
+    parser.add_argument('--repeat', type=int, default=common.default_repeat, help='Number of measurements.')
+    parser.add_argument('--save', type=Path, help='Save the results to a JSON file.')
+    parser.add_argument('--compare', type=Path, help='Compare the results with a JSON file saved before.')
+    parser.add_argument('--tolerance', type=float, default=1.25,
+                        help='Maximal allowed ratio of the best time to the baseline.')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    common.default_repeat = args.repeat
+    for func in collect(args.pattern): func()
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(common.results, f, indent=4)
+    if args.compare and not compare(common.results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -8,9 +8,6 @@ the Free Software Foundation, either version 3 of the License, or
 """
 
 
-from src.app import App
-from src.scenes import GeoDesignScene
-from src.backend.geo_design import GeometryGenerator
 import logging
 import argparse
 import sys
@@ -26,6 +23,14 @@ def setup_args():
     parser.add_argument("--log-file", default="DEBUG",
                         choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
                         help="Logging level for file output")
+    subparsers = parser.add_subparsers(dest="command")
+    batch = subparsers.add_parser("batch", help="Run a sweep without the GUI")
+    batch.add_argument("geometry", type=Path, help="The .gavl or .avl geometry file")
+    batch.add_argument("sweep", type=Path,
+                       help="The .csv or .json sweep definition, with a named column for each run-file parameter")
+    batch.add_argument("output", type=Path, help="The output .csv or .npz file")
+    batch.add_argument("--height", type=float, default=0.0, help="Flight altitude in meters")
+    batch.add_argument("--workers", type=int, default=None, help="Maximal number of AVL processes run at once")
     args = parser.parse_args()
     return args
 
@@ -59,7 +64,15 @@ def main():
     # --- setup logging ---
     setup_logging(args.log_console, args.log_file)
 
+    # --- run batch, without importing the GUI ---
+    if args.command == "batch":
+        from src.batch import run_batch
+        sys.exit(run_batch(args.geometry, args.sweep, args.output, args.height, args.workers))
+
     # --- run app ---
+    from src.app import App
+    from src.scenes import GeoDesignScene
+    from src.backend.geo_design import GeometryGenerator
     logging.debug("Starting app...")
     app = App()
     logging.debug("App started.")
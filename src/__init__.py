@@ -1,3 +1,2 @@
-from . import app
 from . import backend
 from .backend import handle_crash
@@ -15,7 +15,7 @@ import pickle
 import os
 import logging
 from src.backend.geo_design import Geometry, GeometryGenerator
-from src.backend import handle_crash, Settings
+from src.backend import handle_crash, Settings, AVLInterface
 
 
 class App:
@@ -83,6 +83,7 @@ class App:
             logging.info('Exiting the app.')
             logging.shutdown()
             App.destroy_all_children(self.root)
+            AVLInterface.session_pool.close_all()
             self.work_dir.cleanup()
             self.root.destroy()
 
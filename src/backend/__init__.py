@@ -3,6 +3,6 @@ from . import math_functions
 from . import physics
 from .avl_interface import *
 from .handle_crash_file import handle_crash
-from .load_from_csv import load_from_csv
+from .load_from_csv import load_from_csv, load_from_json
 from .settings import Settings
-from .vector3 import Vector3, AnyVector3
+from .vector3 import Vector3, Vec3Array, AnyVector3
@@ -1,2 +1,7 @@
 from .avl_interface import AVLInterface, AbortFlag
+from .avl_session import AVLSession, AVLSessionPool
+from .ghostscript_worker import GhostscriptWorker
 from .image_getter import ImageGetter
+from .plot_cache import PlotCache
+from .result_set import ResultSet, ResultView
+from .results_cache import ResultsCache
@@ -7,11 +7,23 @@ the Free Software Foundation, either version 3 of the License, or
 (at your option) any later version.
 """
 
+import asyncio
+import os
+import re
 import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, Future
+from contextlib import closing
 from pathlib import Path
 from subprocess import Popen, PIPE
+from typing import Callable, Iterator
 import logging
 
+import numpy as np
+
+from .avl_session import AVLSession, AVLSessionPool
+from .result_set import ResultSet
+from .results_cache import ResultsCache
 from .results_parser import ResultsParser
 from .. import physics
 from ..geo_design import Geometry
@@ -22,11 +34,40 @@ avl_exe_path = Path(__file__).parent.parent.parent / 'avl' / 'avl.exe'
 
 class AVLInterface:
     """A toolbox class to act as the AVL interface.
-    Also contains all methods required to format data into AVL's formats, etc."""
+    Also contains all methods required to format data into AVL's formats, etc.
+
+    Attributes:
+        session_pool (AVLSessionPool): The pool of persistent AVL sessions used to run the series.
+        workers (int): The default maximal number of AVL processes running a series at the same time.
+        min_shard_size (int): The minimal number of cases worth starting another AVL process for.
+        max_session_cases (int): The maximal number of cases ``async_run_series`` runs in the persistent sessions
+          of ``session_pool``. Longer series are run by one-shot AVL processes, that can be killed right away.
+        run_case_limit (int | None): The maximal number of run cases the AVL executable can hold at once.
+          Longer series are run in blocks. ``None`` to detect it on first use.
+        default_run_case_limit (int): The limit used if it cannot be detected, NRMAX of the stock AVL build.
+        results_cache (ResultsCache | None): The persistent cache of the case results. ``None`` to disable caching.
+        avl_command (list[str]): The command starting AVL, to which the .avl file path is appended.
+          Can be replaced, e.g. to run a different build of AVL, or a stand-in for benchmarking.
+
+    Besides the AVL run-file parameters, the run-file data of a series can have an 'altitude' column, in meters.
+    A run file holds a single air density, so the cases are grouped by density into blocks, see ``density_blocks``.
+    """
+    session_pool = AVLSessionPool()
+    workers = os.cpu_count() or 1
+    min_shard_size = 8
+    max_session_cases = 200
+    run_case_limit: int | None = None
+    default_run_case_limit = 25
+    results_cache: ResultsCache | None = ResultsCache()
+    avl_command: list[str] = [str(avl_exe_path)]
 
     @staticmethod
-    def create_run_file_contents(run_file_data: dict[str, list[float]], height: float) -> str:
-        """Returns a string containing the input data transformed into a .run format."""
+    def create_run_file_contents(run_file_data: dict[str, list[float]],
+                                 height: float = 0.0,
+                                 density: float = None) -> str:
+        """Returns a string containing the input data transformed into a .run format.
+        All the cases are at the given air density, or the density at ``height`` if it is not given."""
+        if density is None: density = physics.get_density(height)
         no_of_runs = len(list(run_file_data.values())[0])
         _r = ''
         for i in range(no_of_runs):
@@ -35,47 +76,182 @@ class AVLInterface:
             _r += '\n\n'
 
         _r += ('grav.acc. = 9.80665 m/s^2\n'
-               f'density = {physics.get_density(height)} kg/m^3\n')
+               f'density = {density} kg/m^3\n')
         return _r
 
     @staticmethod
-    def create_st_command(paths: list[Path]) -> str:
-        """Creates a command string for running a given number of cases, each runs 'ST' and saved to file."""
+    def flight_conditions(data: dict[str, list[float]], height: float) -> tuple[dict[str, list[float]], list[float]]:
+        """
+        Turns the altitudes of the cases into air densities, for the whole series at once.
+
+        If the data has a 'velocity' column but no 'Mach', the Mach number of every case is added,
+        at the altitude of the case.
+
+        Parameters:
+            data (dict[str, list[float]]): The run-file data, with an optional 'altitude' column, in meters.
+            height (float): The altitude of the cases, if the data has no 'altitude' column.
+        Returns:
+            The run-file data without the 'altitude' column, and the air density of every case, in kg/m^3.
+        Raises:
+            ValueError: If any altitude is outside the 0 to 80,000 m range.
+        """
+        nof_cases = len(list(data.values())[0])
+        data = dict(data)
+        altitudes = data.pop('altitude', None)
+        if altitudes is None:
+            altitudes = height
+            densities = [physics.get_density(height)] * nof_cases
+        else:
+            altitudes = np.asarray(altitudes, dtype=np.float64)
+            if not np.all((0 <= altitudes) & (altitudes <= 8e4)):
+                raise ValueError('Altitude must be between 0 and 80,000 m.')
+            densities = physics.get_density(altitudes).tolist()
+        if 'velocity' in data and 'Mach' not in data:
+            data['Mach'] = np.broadcast_to(
+                physics.get_mach(np.asarray(data['velocity'], dtype=np.float64), altitudes), (nof_cases,)).tolist()
+        return data, densities
+
+    @staticmethod
+    def density_blocks(densities: list[float], limit: int) -> list[tuple[int, int]]:
+        """Returns the (start, end) of the blocks of consecutive cases at the same density,
+        each of at most ``limit`` cases. Every block is loaded from its own run file."""
+        _r = []
+        start = 0
+        for end in range(1, len(densities) + 1):
+            if end == len(densities) or end - start == limit or densities[end] != densities[start]:
+                _r.append((start, end))
+                start = end
+        return _r
+
+    @classmethod
+    def write_run_file(cls,
+                       path: Path,
+                       data: dict[str, list[float]],
+                       densities: list[float],
+                       start: int,
+                       end: int) -> None:
+        """Writes the cases from ``start`` to ``end`` of a block into a .run file, see ``density_blocks``."""
+        with open(path, 'w') as run_file:
+            run_file.write(cls.create_run_file_contents(
+                {name: values[start:end] for name, values in data.items()}, density=densities[start]))
+
+    @staticmethod
+    def create_st_command(paths: list[Path], quit_avl: bool = True) -> str:
+        """Creates a command string for running a given number of cases, each runs 'ST' and saved to file.
+        If ``quit_avl`` is ``False``, the command ends at the top level menu instead of quitting AVL."""
         _r = 'OPER\n'
         for i, path in enumerate(paths):
             _r += (f'{i + 1}\n'
                    f'X\n'
                    f'st\n'
                    f'{str(path.absolute())}\n')
-        _r += ('\n'
-               'Q\n')
+        _r += '\n'
+        if quit_avl: _r += 'Q\n'
         return _r
 
     @staticmethod
-    def execute(command: str, avl_file_path: Path | str, app_wd: Path) -> str:
+    def _run_location(avl_file_path: Path | str, work_dir: Path | None) -> tuple[str, Path]:
+        """Returns the .avl file argument of AVL and the directory to run it from, see ``execute``.
+        The file is given by its name when AVL runs in its directory, so no long path is read by AVL."""
+        avl_file_path = Path(avl_file_path).absolute()
+        work_dir = Path(work_dir).absolute() if work_dir is not None else avl_file_path.parent
+        if work_dir == avl_file_path.parent: return avl_file_path.name, work_dir
+        logging.warning(f'Running AVL outside of the directory of {avl_file_path.name}, '
+                        f'the airfoil files may not be found.')
+        return str(avl_file_path), work_dir
+
+    @staticmethod
+    def execute(command: str, avl_file_path: Path | str, work_dir: Path = None) -> str:
         """
         Executes the given AVL command or chain of commands, returns the full AVL output as string.
 
-        Creates a new ``Popen`` instance of AVL, using stdin ``PIPE`` feeds the instance the given command,
-        and returns the full stdout ``PIPE`` output as a string.
+        Creates a new ``Popen`` instance of AVL from ``avl_command``, using stdin ``PIPE`` feeds the instance
+        the given command, and returns the full stdout ``PIPE`` output as a string.
         If any errors are encountered, a respective exception will be raised, except for ``SINVRT``.
 
         Parameters:
             command (str): The command to be executed. For a chain of commands, join them using \\n.
             avl_file_path (Path, str): Path to the .avl file to run the AVL on.
-            app_wd (Path): Path to the application working directory, where the AVL should be run from.
-              Any files created directly by AVL will be saved there.
+            work_dir (Path): The directory AVL is run from, where any files created directly by AVL will be saved.
+              Must be the directory of the .avl file, which references its airfoil files by name. Defaults to it.
         Returns:
             str: The full AVL output as string.
         Raises:
             Exception: If an error occurs while executing the command.
         """
         logging.debug(f'Executing AVL command: {command.replace('\n', ' // ')}')
-        avl = Popen([avl_exe_path, str(avl_file_path)], stdin=PIPE, stdout=PIPE, stderr=PIPE, shell=True, cwd=app_wd)
+        avl_file_path, work_dir = AVLInterface._run_location(avl_file_path, work_dir)
+        avl = Popen(AVLInterface.avl_command + [avl_file_path], stdin=PIPE, stdout=PIPE, stderr=PIPE, cwd=work_dir,
+                    creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0)
         if command[-2:] != '\n': command += '\n'
         dump, err = avl.communicate(bytes(command, encoding='utf-8'))
         dump = dump.decode()
         err = err.decode()
+        AVLInterface.check_output(dump, err)
+        return dump
+
+    @staticmethod
+    async def async_execute(command: str,
+                            avl_file_path: Path | str,
+                            work_dir: Path = None,
+                            on_output: Callable[[], None] = None) -> str:
+        """
+        Asynchronous version of ``execute``.
+
+        The AVL process is started directly, without a shell, and its output is read as it is produced.
+        If the task is cancelled, the AVL process is killed right away, and ``asyncio.CancelledError`` is re-raised.
+
+        Parameters:
+            command (str): The command to be executed. For a chain of commands, join them using \\n.
+            avl_file_path (Path, str): Path to the .avl file to run the AVL on.
+            work_dir (Path): The directory AVL is run from, where any files created directly by AVL will be saved.
+              Must be the directory of the .avl file, which references its airfoil files by name. Defaults to it.
+            on_output (Callable[[], None]): Optional, called every time AVL prints something.
+        Returns:
+            str: The full AVL output as string.
+        Raises:
+            Exception: If an error occurs while executing the command.
+        """
+        logging.debug(f'Executing AVL command asynchronously: {command.replace('\n', ' // ')}')
+        avl_file_path, work_dir = AVLInterface._run_location(avl_file_path, work_dir)
+        avl = await asyncio.create_subprocess_exec(
+            *AVLInterface.avl_command, avl_file_path, stdin=PIPE, stdout=PIPE, stderr=PIPE, cwd=work_dir,
+            # gfortran buffers the output to a pipe, so it would only arrive at exit.
+            env=os.environ | {'GFORTRAN_UNBUFFERED_PRECONNECTED': 'y'},
+            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0)
+        if command[-2:] != '\n': command += '\n'
+
+        async def feed():
+            try:
+                avl.stdin.write(bytes(command, encoding='utf-8'))
+                await avl.stdin.drain()
+                avl.stdin.close()
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # AVL exited before reading all the input, the output will tell why.
+
+        async def read_stdout():
+            chunks = []
+            while chunk := await avl.stdout.read(4096):
+                chunks.append(chunk)
+                if on_output: on_output()
+            return b''.join(chunks)
+
+        try:
+            _, dump, err = await asyncio.gather(feed(), read_stdout(), avl.stderr.read())
+            await avl.wait()
+        finally:
+            if avl.returncode is None:
+                logging.info('Killing the AVL process.')
+                avl.kill()
+                await avl.wait()
+        dump = dump.decode()
+        err = err.decode()
+        AVLInterface.check_output(dump, err)
+        return dump
+
+    @staticmethod
+    def check_output(dump: str, err: str) -> None:
+        """Raises a ``RuntimeError`` if the AVL output or error stream reports any errors, except for ``SINVRT``."""
         if err:
             # Ignore 'Notes' - non-critical notifications
             err = '\n'.join([line for line in err.split('\n') if 'Note' not in line])
@@ -88,7 +264,6 @@ class AVLInterface:
             # raise RuntimeError('SINVRT - geometry too complex, cannot construct a spline.')
         if 'SDUPL' in dump:
             raise RuntimeError('SDUPL - geometry resolution too high, decrease mesh density.')
-        return dump
 
     @staticmethod
     def create_temp_files(temp_dir: Path, nof_cases: int) -> list[Path]:
@@ -99,63 +274,515 @@ class AVLInterface:
         files = [path.joinpath(f'{i + 1}') for i in range(nof_cases)]
         return files
 
+    @staticmethod
+    def create_series_dir(app_work_dir: Path) -> Path:
+        """Creates a new directory for a series run, at the first not-used name, and returns its path."""
+        i = 0
+        while True:
+            try:
+                work_dir = app_work_dir / f'series_{i}'
+                work_dir.mkdir()
+                break
+            except FileExistsError:
+                i += 1
+        logging.debug(f'Created temporary directory for series: {work_dir.name}')
+        return work_dir
+
+    @staticmethod
+    def finished_files(paths: list[Path], start: int = 0) -> list[Path]:
+        """
+        Returns the leading ST files from ``start`` on, that AVL has finished writing before it was stopped.
+
+        AVL writes the files one by one, in order, so a file is finished once the next one has been created.
+        The last file cannot be told apart from one being written, so it is never considered finished.
+        The files before ``start`` are assumed finished, and are not checked again.
+        """
+        _r = []
+        for path, next_path in zip(paths[start:-1], paths[start + 1:]):
+            if not next_path.exists(): break
+            _r.append(path)
+        return _r
+
+    @staticmethod
+    def split_cases(data: dict[str, list[float]], nof_shards: int) -> list[dict[str, list[float]]]:
+        """Splits the run-file data into up to ``nof_shards`` consecutive shards of nearly equal size."""
+        nof_cases = len(list(data.values())[0])
+        nof_shards = max(1, min(nof_shards, nof_cases))
+        bounds = [nof_cases * i // nof_shards for i in range(nof_shards + 1)]
+        return [{name: values[start:end] for name, values in data.items()}
+                for start, end in zip(bounds[:-1], bounds[1:])]
+
+    @staticmethod
+    def select_cases(data: dict[str, list[float]], indices: list[int]) -> dict[str, list[float]]:
+        """Returns the run-file data of the cases at the given indices."""
+        return {name: [values[i] for i in indices] for name, values in data.items()}
+
+    @classmethod
+    def lookup_cache(cls,
+                     geometry: Geometry,
+                     data: dict[str, list[float]],
+                     densities: list[float]) -> tuple[list[str], list[list[val_dict] | None]]:
+        """
+        Looks the cases at the given air densities up in ``results_cache``.
+
+        Returns:
+            The cache keys of all cases, empty if the cache is disabled,
+            and the cached [forces, ST] of every case, ``None`` for the cases not found.
+        """
+        nof_cases = len(list(data.values())[0])
+        if cls.results_cache is None: return [], [None] * nof_cases
+        keys = cls.results_cache.get_keys(geometry.string(), data, densities)
+        cached = cls.results_cache.get_many(keys)
+        logging.info(f'Found {len(cached)} of {nof_cases} cases in the results cache.')
+        return keys, [cached.get(key) for key in keys]
+
+    @classmethod
+    def store_in_cache(cls, keys: list[str], results: list[list[val_dict] | None], indices: list[int]) -> None:
+        """Stores the results of the cases at the given indices in ``results_cache``, if enabled."""
+        if cls.results_cache is None or not indices: return
+        cls.results_cache.put_many({keys[i]: results[i] for i in indices})
+
     @classmethod
     def run_series(cls,
                    geometry: Geometry,
                    data: dict[str, list[float]],
                    height: float,
                    flag: 'AbortFlag',
-                   app_work_dir: Path) -> tuple[list[list[val_dict]], str]:
+                   app_work_dir: Path,
+                   workers: int = None) -> tuple[ResultSet, str]:
         """
         Runs all cases using 'ST' and returns the results.
 
+        The cases found in ``results_cache`` are not run again, only the missing ones are put into the .run file.
+        The cases are run in persistent AVL sessions from ``session_pool``,
+        so the AVL start-up and geometry loading is only paid once per geometry.
+        Series longer than the run case limit of the AVL executable are split into blocks, see ``run_case_limit``,
+        and so are the cases at different altitudes. The cases are run ordered by the air density,
+        so that a series over a few altitudes is run in a few blocks, in a single AVL process per shard.
+        If more than one worker is allowed, the cases are split into shards, each run in its own working directory
+        by its own AVL process at the same time, and the results are merged back in the original order.
+        To keep the processes alive between the series, ``session_pool.max_sessions`` should not be lower than ``workers``.
+
         Parameters:
             geometry (Geometry): The geometry to turn into .avl file.
-            data (dict[str, list[float]): The data to turn into a .run file.
-            height (float): The flight altitude, in meters.
+            data (dict[str, list[float]): The data to turn into a .run file, see ``flight_conditions``.
+            height (float): The flight altitude of the cases, in meters, if the data has no 'altitude' column.
             flag (AbortFlag): The Flag object to abort mid-execution, in case the user cancels the calculation.
             app_work_dir (Path): The application working directory, where the AVL should be run from.
+            workers (int): The maximal number of AVL processes run at the same time. Defaults to ``cls.workers``.
 
         Return:
-            ([[{name-value} for intro, forces, ST] for each case], errors)
+            (ResultSet of the forces and ST of each case, errors)
+        """
+        if flag: return ResultSet.from_cases([]), 'Aborted'  # If the user cancelled the calculation mid-execution. Will be checked multiple times.
+        data, densities = cls.flight_conditions(data, height)
+        keys, results = cls.lookup_cache(geometry, data, densities)
+        missing = sorted((i for i, result in enumerate(results) if result is None), key=densities.__getitem__)
+        if not missing: return ResultSet.from_cases(results), None
+
+        vals, errors = cls._run_sharded(geometry, cls.select_cases(data, missing), [densities[i] for i in missing],
+                                        flag, app_work_dir, workers)
+        if flag: return ResultSet.from_cases([]), 'Aborted'
+        if len(vals) != len(missing): return ResultSet.from_cases([]), errors
+        for i, case in zip(missing, vals): results[i] = case
+        if not errors: cls.store_in_cache(keys, results, missing)
+        return ResultSet.from_cases(results), errors
+
+    @classmethod
+    def _run_sharded(cls,
+                     geometry: Geometry,
+                     data: dict[str, list[float]],
+                     densities: list[float],
+                     flag: 'AbortFlag',
+                     app_work_dir: Path,
+                     workers: int = None,
+                     on_case: Callable[[int, val_dict, val_dict], None] = None
+                     ) -> tuple[list[list[val_dict]], str]:
+        """
+        Runs all given cases in shards, bypassing the cache. See ``run_series``.
+
+        ``on_case`` is optional, called from the parser threads with the index, forces and ST of each case,
+        once the block of the case is parsed.
         """
-        if flag: return [], 'Aborted'  # If the user cancelled the calculation mid-execution. Will be checked multiple times.
         nof_cases = len(list(data.values())[0])
-        logging.info(f'Running {nof_cases} cases.')
-        contents = cls.create_run_file_contents(data, height)
-        # Create a new directory for this run, at the first not-used name.
-        i = 0
-        while True:
+        workers = workers or cls.workers
+        # Do not start a process for just a few cases.
+        nof_shards = min(workers, -(-nof_cases // cls.min_shard_size))
+        logging.info(f'Running {nof_cases} cases in {nof_shards} shards.')
+        if nof_shards <= 1:
+            return cls._run_shard(geometry, data, densities, flag, app_work_dir, 0, on_case)
+
+        shards = cls.split_cases(data, nof_shards)
+        shard_densities = [shard['density'] for shard in cls.split_cases({'density': densities}, nof_shards)]
+        offsets = [0]
+        for shard in shards[:-1]: offsets.append(offsets[-1] + len(list(shard.values())[0]))
+        with ThreadPoolExecutor(max_workers=nof_shards, thread_name_prefix='avl_shard') as executor:
+            futures = [executor.submit(cls._run_shard, geometry, shard, shard_density, flag, app_work_dir,
+                                       offset, on_case)
+                       for shard, shard_density, offset in zip(shards, shard_densities, offsets)]
+            results = [future.result() for future in futures]
+        if flag: return [], 'Aborted'
+        vals = [case for shard_vals, _ in results for case in shard_vals]
+        errors = '\n'.join(dict.fromkeys(shard_errors for _, shard_errors in results if shard_errors)) or None
+        return vals, errors
+
+    @classmethod
+    async def async_run_series(cls,
+                               geometry: Geometry,
+                               data: dict[str, list[float]],
+                               height: float,
+                               app_work_dir: Path,
+                               workers: int = None,
+                               on_case: Callable[[int, val_dict, val_dict], None] = None
+                               ) -> tuple[ResultSet, str]:
+        """
+        Asynchronous version of ``run_series``.
+
+        The cases found in ``results_cache`` are reported to ``on_case`` first, and only the missing ones are run.
+        Up to ``max_session_cases`` missing cases are run in the persistent sessions of ``session_pool``,
+        like in ``run_series``, from a worker thread. Longer series are split into shards, each run by its own
+        one-shot AVL process, started with ``asyncio.create_subprocess_exec``, so many series can be driven
+        from a single event loop.
+        Cancelling the task stops the sessions after the current case, or kills the AVL processes right away,
+        and re-raises ``asyncio.CancelledError``.
+        The cases finished before have already been reported to ``on_case``, and are kept in ``results_cache``.
+
+        Parameters:
+            geometry (Geometry): The geometry to turn into .avl file.
+            data (dict[str, list[float]): The data to turn into a .run file, see ``flight_conditions``.
+            height (float): The flight altitude of the cases, in meters, if the data has no 'altitude' column.
+            app_work_dir (Path): The application working directory, where the AVL should be run from.
+            workers (int): The maximal number of AVL processes run at the same time. Defaults to ``cls.workers``.
+            on_case (Callable[[int, val_dict, val_dict], None]): Optional, called with the case index, forces and ST
+              of each case as soon as it is finished, i.e. once its block is parsed in a session, or once
+              the one-shot AVL process starts the next case of the shard, or exits.
+              The shards run in parallel, so the cases are not reported in order.
+
+        Return:
+            (ResultSet of the forces and ST of each case, errors)
+        """
+        data, densities = cls.flight_conditions(data, height)
+        keys, results = cls.lookup_cache(geometry, data, densities)
+        missing = sorted((i for i, result in enumerate(results) if result is None), key=densities.__getitem__)
+        if on_case:
+            for i, result in enumerate(results):
+                if result is not None: on_case(i, *result)
+        errors = None
+        if missing:
+            def report(j: int, forces: val_dict, st: val_dict):
+                """Puts the case in its place in the series, as soon as it is finished."""
+                results[missing[j]] = [forces, st]
+                if on_case: on_case(missing[j], forces, st)
+
+            run = cls._async_run_pooled if len(missing) <= cls.max_session_cases else cls._async_run_sharded
             try:
-                work_dir = app_work_dir / f'series_{i}'
-                work_dir.mkdir()
-                break
-            except FileExistsError:
-                i += 1
-        logging.debug(f'Created temporary directory for series: {work_dir.name}')
+                complete, errors = await run(geometry, cls.select_cases(data, missing), [densities[i] for i in missing],
+                                             app_work_dir, workers, report)
+            except asyncio.CancelledError:
+                # Each finished case is complete on its own, so it is worth keeping
+                cls.store_in_cache(keys, results, [i for i in missing if results[i] is not None])
+                raise
+            if not errors: cls.store_in_cache(keys, results, [missing[j] for j in complete])
+        if None in results: return ResultSet.from_cases([]), errors or 'AVL did not finish all the cases.'
+        return ResultSet.from_cases(results), errors
+
+    @classmethod
+    async def _async_run_pooled(cls,
+                                geometry: Geometry,
+                                data: dict[str, list[float]],
+                                densities: list[float],
+                                app_work_dir: Path,
+                                workers: int,
+                                on_case: Callable[[int, val_dict, val_dict], None]
+                                ) -> tuple[list[int], str]:
+        """
+        Runs all given cases in the sessions of ``session_pool``, bypassing the cache. See ``async_run_series``.
+
+        ``_run_sharded`` is run in a worker thread, and the cases it reports are passed on to ``on_case``
+        in the event loop. Returns the indices of the finished cases, and the errors, like ``_async_run_sharded``.
+        If cancelled, raises the abort flag and waits for the sessions to stop, before re-raising.
+        """
+        loop = asyncio.get_running_loop()
+        flag = AbortFlag()
+        nof_cases = len(list(data.values())[0])
+        run = asyncio.ensure_future(asyncio.to_thread(
+            cls._run_sharded, geometry, data, densities, flag, app_work_dir, workers,
+            lambda *case: loop.call_soon_threadsafe(on_case, *case)))
+        try:
+            vals, errors = await asyncio.shield(run)
+        except asyncio.CancelledError:
+            flag.abort()
+            # The cases reported before the thread has ended are passed on before this resumes
+            await asyncio.wait([run])
+            raise
+        return list(range(nof_cases)) if len(vals) == nof_cases else [], errors
+
+    @classmethod
+    async def _async_run_sharded(cls,
+                                 geometry: Geometry,
+                                 data: dict[str, list[float]],
+                                 densities: list[float],
+                                 app_work_dir: Path,
+                                 workers: int,
+                                 on_case: Callable[[int, val_dict, val_dict], None]
+                                 ) -> tuple[list[int], str]:
+        """
+        Runs all given cases in shards, bypassing the cache. See ``async_run_series``.
+
+        The results are only reported to ``on_case``, by the index of the case, as the shards run in parallel,
+        and a shard may stop before its last case. Returns the indices of the cases of the shards that finished
+        all their cases, and the errors.
+        """
+        nof_cases = len(list(data.values())[0])
+        workers = workers or cls.workers
+        nof_shards = max(1, min(workers, -(-nof_cases // cls.min_shard_size)))
+        logging.info(f'Running {nof_cases} cases in {nof_shards} shards asynchronously.')
+        shards = cls.split_cases(data, nof_shards)
+        shard_densities = [shard['density'] for shard in cls.split_cases({'density': densities}, nof_shards)]
+        offsets = [0]
+        for shard in shards[:-1]: offsets.append(offsets[-1] + len(list(shard.values())[0]))
+        tasks = [asyncio.create_task(
+            cls._async_run_shard(geometry, shard, shard_density, app_work_dir, offset, on_case))
+            for shard, shard_density, offset in zip(shards, shard_densities, offsets)]
+        try:
+            await asyncio.wait(tasks)
+        except asyncio.CancelledError:
+            # Stop all the shards, and let them report what they have finished, before propagating the cancellation.
+            for task in tasks: task.cancel()
+            await asyncio.wait(tasks)
+            raise
+        results = [task.result() for task in tasks]
+
+        complete = []
+        for shard, offset, (shard_vals, _) in zip(shards, offsets, results):
+            size = len(list(shard.values())[0])
+            if len(shard_vals) == size: complete += range(offset, offset + size)
+        errors = '\n'.join(dict.fromkeys(shard_errors for _, shard_errors in results if shard_errors)) or None
+        return complete, errors
+
+    @classmethod
+    async def _async_run_shard(cls,
+                               geometry: Geometry,
+                               data: dict[str, list[float]],
+                               densities: list[float],
+                               app_work_dir: Path,
+                               offset: int = 0,
+                               on_case: Callable[[int, val_dict, val_dict], None] = None
+                               ) -> tuple[list[list[val_dict]], str]:
+        """
+        Runs all given cases in a single one-shot AVL process. See ``async_run_series``.
+
+        ``offset`` is the index of the shard's first case in the series, used to report the cases to ``on_case``.
+        If cancelled, reports the finished cases to ``on_case`` before re-raising ``asyncio.CancelledError``.
+        """
+        nof_cases = len(list(data.values())[0])
+        limit = cls.run_case_limit or cls.default_run_case_limit
+        work_dir = cls.create_series_dir(app_work_dir)
+        vals: list[list[val_dict]] = []
+
+        def collect(paths: list[Path]):
+            """Parses and reports the given files, that follow the ones collected so far."""
+            for path in paths:
+                vals.append(ResultsParser.st_file_to_data(path))
+                if on_case: on_case(offset + len(vals) - 1, *vals[-1])
+
+        try:
+            avl_file_path = work_dir / 'plane.avl'
+            geometry.write_avl_file(avl_file_path)
+            files = cls.create_temp_files(work_dir, nof_cases)
+            # Load and run the blocks of cases one after another, in a single process
+            command = ''
+            for k, (start, end) in enumerate(cls.density_blocks(densities, limit)):
+                run_file_path = work_dir / f'block_{k}.run'
+                cls.write_run_file(run_file_path, data, densities, start, end)
+                command += f'CASE {run_file_path.absolute()}\n' + cls.create_st_command(files[start:end], quit_avl=False)
+            command += 'Q\n'
+            try:
+                dump = await cls.async_execute(command, avl_file_path, work_dir,
+                                               lambda: collect(cls.finished_files(files, len(vals))))
+            except asyncio.CancelledError:
+                logging.info(f'Cancelled {work_dir.name}.')
+                collect(cls.finished_files(files, len(vals)))
+                raise
+            logging.info(f'Finished running {work_dir.name}.')
+            errors = ResultsParser.loading_issues_from_dump(dump)
+            if errors: logging.warning(f'Running series resulted in errors: {errors}')
+            try:
+                collect(files[len(vals):])
+            except FileNotFoundError:
+                return [], errors
+            return vals, errors
+        finally:
+            shutil.rmtree(work_dir)
+
+    @classmethod
+    def iter_series(cls,
+                    geometry: Geometry,
+                    data: dict[str, list[float]],
+                    height: float,
+                    app_work_dir: Path,
+                    flag: 'AbortFlag' = None) -> Iterator[tuple[int, val_dict, val_dict]]:
+        """
+        Runs all cases using 'ST', and yields the results of each case as soon as its ST file is written.
+
+        The cases found in ``results_cache`` are yielded right away, the others are run one by one,
+        in a single persistent AVL session from ``session_pool``.
+        Closing the generator stops the series after the current case, and returns the session to the pool.
+        The finished cases are stored in ``results_cache`` once the generator is exhausted or closed.
+        Geometry loading issues are only logged.
+
+        Parameters:
+            geometry (Geometry): The geometry to turn into .avl file.
+            data (dict[str, list[float]): The data to turn into a .run file, see ``flight_conditions``.
+            height (float): The flight altitude of the cases, in meters, if the data has no 'altitude' column.
+            app_work_dir (Path): The application working directory, where the AVL should be run from.
+            flag (AbortFlag): Optional, stops the series once raised.
+
+        Yields:
+            (case index, forces {name-value}, ST {name-value})
+        """
+        data, densities = cls.flight_conditions(data, height)
+        keys, results = cls.lookup_cache(geometry, data, densities)
+        missing = [i for i, result in enumerate(results) if result is None]
+        finished = []
+        try:
+            with closing(cls._iter_series(geometry, cls.select_cases(data, missing), [densities[i] for i in missing],
+                                          app_work_dir, flag)) as run:
+                for i, result in enumerate(results):
+                    if result is None:
+                        try:
+                            _, forces, st = next(run)
+                        except StopIteration:
+                            return
+                        results[i] = [forces, st]
+                        finished.append(i)
+                    yield i, *results[i]
+        finally:
+            # Stored all at once, as every write to the cache is committed on its own
+            cls.store_in_cache(keys, results, finished)
+
+    @classmethod
+    def _iter_series(cls,
+                     geometry: Geometry,
+                     data: dict[str, list[float]],
+                     densities: list[float],
+                     app_work_dir: Path,
+                     flag: 'AbortFlag' = None) -> Iterator[tuple[int, val_dict, val_dict]]:
+        """Runs all given cases one by one, bypassing the cache. See ``iter_series``."""
+        nof_cases = len(list(data.values())[0])
+        work_dir = cls.create_series_dir(app_work_dir)
+        try:
+            files = cls.create_temp_files(work_dir, nof_cases)
+            with cls.session_pool.session(geometry, app_work_dir) as session:
+                errors = ResultsParser.loading_issues_from_dump(session.intro)
+                if errors: logging.warning(f'Running series resulted in errors: {errors}')
+                limit = cls.get_run_case_limit(session)
+                for k, (start, end) in enumerate(cls.density_blocks(densities, limit)):
+                    run_file_path = work_dir / f'block_{k}.run'
+                    cls.write_run_file(run_file_path, data, densities, start, end)
+                    session.run(f'CASE {run_file_path.absolute()}\n')
+                    for i in range(start, end):
+                        if flag: return
+                        session.run(f'OPER\n'
+                                    f'{i - start + 1}\n'
+                                    f'X\n'
+                                    f'st\n'
+                                    f'{files[i].absolute()}\n', flag)
+                        if flag: return
+                        forces, st = ResultsParser.st_file_to_data(files[i])
+                        try:
+                            yield i, forces, st
+                        except GeneratorExit:
+                            # The session is at the top level between the cases, so it can be reused.
+                            logging.info(f'Series stopped after {i + 1} cases.')
+                            return
+        finally:
+            shutil.rmtree(work_dir)
+
+    @classmethod
+    def get_run_case_limit(cls, session: AVLSession) -> int:
+        """Returns the maximal number of run cases the AVL executable can hold, detecting it if not configured."""
+        if cls.run_case_limit is None:
+            cls.run_case_limit = cls.detect_run_case_limit(session)
+        return cls.run_case_limit
+
+    @classmethod
+    def detect_run_case_limit(cls, session: AVLSession, probe_size: int = 1000) -> int:
+        """
+        Returns the maximal number of run cases the AVL executable can hold.
+
+        Loads a run file with ``probe_size`` cases into the session, and reads the number of cases actually loaded
+        from the OPER prompt '(case 1/N)'. If the prompt cannot be read, ``default_run_case_limit`` is returned.
+        """
+        probe_path = session.work_dir / 'probe.run'
+        with open(probe_path, 'w') as probe_file:
+            probe_file.write(cls.create_run_file_contents({'alpha -> alpha': [0.0] * probe_size}, 0))
+        dump = session.run(f'CASE {probe_path.absolute()}\n'
+                           f'OPER\n'
+                           f'\n')
+        probe_path.unlink()
+        counts = re.findall(r'\(case\s*\d+\s*/\s*(\d+)\)', dump)
+        if not counts:
+            logging.warning(f'Cannot detect the run case limit, using {cls.default_run_case_limit}.')
+            return cls.default_run_case_limit
+        logging.info(f'Detected run case limit: {counts[-1]}.')
+        return int(counts[-1])
+
+    @classmethod
+    def _run_shard(cls,
+                   geometry: Geometry,
+                   data: dict[str, list[float]],
+                   densities: list[float],
+                   flag: 'AbortFlag',
+                   app_work_dir: Path,
+                   offset: int = 0,
+                   on_case: Callable[[int, val_dict, val_dict], None] = None
+                   ) -> tuple[list[list[val_dict]], str]:
+        """
+        Runs all given cases in a single AVL session. See ``run_series``.
+
+        The cases are run in blocks that fit the run case limit of the AVL executable, and are at a single density,
+        each with its own run file, see ``density_blocks``.
+        The ST files of each block are parsed while the next block is running, and the cases are reported
+        to ``on_case``, if given, by their index in the shard plus ``offset``. A block cut short by the flag is skipped.
+        """
+        nof_cases = len(list(data.values())[0])
+        work_dir = cls.create_series_dir(app_work_dir)
         # Create the required empty files
         files = cls.create_temp_files(work_dir, nof_cases)
-        avl_file_path = work_dir / 'plane.avl'
-        run_file_path = work_dir / 'plane.run'
-        # Fill the files with data
-        with open(avl_file_path, 'w') as avl_file:
-            avl_file.write(geometry.string())
-        with open(run_file_path, 'w') as run_file:
-            run_file.write(contents)
-        # Create the command to execute the series of measurements and run it
-        if not flag:
-            command = cls.create_st_command(files)
-            dump = cls.execute(command, avl_file_path, app_work_dir)
-            logging.info('Finished running series.')
-        # Parse data and potential errors
-        if not flag:
-            errors = ResultsParser.loading_issues_from_dump(dump)  # noqa The dump is not referenced before assignment, as flag is irreversible.
-            if errors: logging.warning(f'Running series resulted in errors: {errors}')
-            else: logging.info('No errors found.')
-            vals = ResultsParser.all_sts_to_data(files)
-        else:
-            errors = 'Aborted'
-            vals = []
+        parsed_blocks: list[Future[list[list[val_dict]]]] = []
+
+        def parse_block(start: int, end: int) -> list[list[val_dict]]:
+            block = ResultsParser.all_sts_to_data(files[start:end])
+            if on_case:
+                for i, case in enumerate(block, offset + start): on_case(i, *case)
+            return block
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='st_parser') as parser:
+            if not flag:
+                with cls.session_pool.session(geometry, app_work_dir) as session:
+                    limit = cls.get_run_case_limit(session)
+                    for k, (start, end) in enumerate(cls.density_blocks(densities, limit)):
+                        if flag: break
+                        # Fill the block's run file with data
+                        run_file_path = work_dir / f'block_{k}.run'
+                        cls.write_run_file(run_file_path, data, densities, start, end)
+                        # Create the command to load the run file and execute the block of measurements, and run it
+                        command = f'CASE {run_file_path.absolute()}\n' + cls.create_st_command(files[start:end], quit_avl=False)
+                        session.run(command, flag)
+                        if flag: break
+                        parsed_blocks.append(parser.submit(parse_block, start, end))
+                    intro = session.intro
+                logging.info(f'Finished running {work_dir.name}.')
+            # Parse data and potential errors
+            if not flag:
+                errors = ResultsParser.loading_issues_from_dump(intro)  # noqa The intro is not referenced before assignment, as flag is irreversible.
+                if errors: logging.warning(f'Running series resulted in errors: {errors}')
+                else: logging.info('No errors found.')
+                vals = [case for block in parsed_blocks for case in block.result()]
+            else:
+                errors = 'Aborted'
+                vals = []
         # Delete the working directory of this series
         shutil.rmtree(work_dir)
         # Return data, errors
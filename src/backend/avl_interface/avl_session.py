@@ -0,0 +1,265 @@
+"""
+Copyright (c) 2025 Wojciech Kwiatkowski
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+"""
+
+import atexit
+import logging
+import os
+import re
+import shutil
+import subprocess
+from contextlib import contextmanager
+from hashlib import sha1
+from pathlib import Path
+from queue import Queue, Empty
+from subprocess import Popen, PIPE
+from threading import Thread, Lock
+from time import monotonic
+from typing import Iterator, TYPE_CHECKING
+
+from ..geo_design import Geometry
+
+if TYPE_CHECKING:
+    from .avl_interface import AbortFlag
+
+# AVL reads all input through Drela's 'ASK' routines, which end every prompt with ' c>', ' s>', ' r>', ' i>'
+# or ' y/n>' and no newline, so the last unterminated line of the output tells if AVL waits for input.
+prompt_pattern = re.compile(r'(?:[cirs]|y/n)>\s*$')
+top_level_pattern = re.compile(r'AVL\s+c>\s*$')
+
+
+class AVLSession:
+    """
+    A long-lived AVL process, with a geometry loaded, driven through its stdin/stdout pipes.
+
+    The commands are fed line by line, and after each line the output is read until AVL prompts for the next input,
+    so the session always knows when a command is finished, and what output it produced.
+    A session is always left at the top level of AVL's menu between calls.
+
+    Attributes:
+        key (str): The hash of the .avl file contents loaded into the session.
+        work_dir (Path): The directory the AVL runs in, containing the loaded .avl file.
+        intro (str): The output produced by AVL at start-up, including the geometry loading messages.
+        timeout (float | None): The maximal time in seconds to wait for a single prompt. ``None`` to wait forever.
+    """
+
+    def __init__(self, key: str, avl_file_path: Path, timeout: float | None = None):
+        """
+        Parameters:
+            key (str): The hash of the .avl file contents.
+            avl_file_path (Path): Path to the .avl file to load. AVL is run from the file's directory.
+            timeout (float | None): The maximal time in seconds to wait for a single prompt. ``None`` to wait forever.
+        """
+        from .avl_interface import AVLInterface
+        self.key = key
+        self.work_dir = avl_file_path.parent
+        self.timeout = timeout
+        self.lock = Lock()
+        self._stdout: Queue[bytes | None] = Queue()
+        self._stderr: list[bytes] = []
+        logging.debug(f'Starting AVL session at {self.work_dir.name}')
+        # The .avl file references its airfoil files by name, so it is loaded from its own directory.
+        self._process = Popen(AVLInterface.avl_command + [avl_file_path.name],
+                              stdin=PIPE, stdout=PIPE, stderr=PIPE, cwd=self.work_dir,
+                              # gfortran buffers the output to a pipe, so the prompts would never arrive.
+                              env=os.environ | {'GFORTRAN_UNBUFFERED_PRECONNECTED': 'y'},
+                              creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0)
+        Thread(target=self._pump_stdout, daemon=True).start()
+        Thread(target=self._pump_stderr, daemon=True).start()
+        self.intro = self._read_until_prompt()
+        self._check_output(self.intro)
+
+    def _pump_stdout(self) -> None:
+        """Moves everything AVL prints into the queue, ``None`` marks the end of the output."""
+        while chunk := self._process.stdout.read1(4096):
+            self._stdout.put(chunk)
+        self._stdout.put(None)
+
+    def _pump_stderr(self) -> None:
+        while chunk := self._process.stderr.read1(4096):
+            self._stderr.append(chunk)
+
+    @property
+    def alive(self) -> bool:
+        """Returns ``True`` if the AVL process is still running."""
+        return self._process.poll() is None
+
+    def _read_until_prompt(self) -> str:
+        """Returns the output of AVL up to and including the next prompt."""
+        buffer = bytearray()
+        deadline = None if self.timeout is None else monotonic() + self.timeout
+        while True:
+            try:
+                chunk = self._stdout.get(timeout=None if deadline is None else max(deadline - monotonic(), 0))
+            except Empty:
+                raise TimeoutError(f'AVL did not respond in {self.timeout} s.')
+            if chunk is None:
+                raise RuntimeError('AVL exited unexpectedly.\n' + buffer.decode(errors='replace')[-500:])
+            buffer += chunk
+            tail = buffer[buffer.rfind(b'\n') + 1:].decode(errors='replace')
+            if prompt_pattern.search(tail) and self._stdout.empty():
+                return buffer.decode(errors='replace')
+
+    def send(self, line: str) -> str:
+        """Sends a single line of input and returns the output up to the next prompt."""
+        self._process.stdin.write(bytes(line + '\n', encoding='utf-8'))
+        self._process.stdin.flush()
+        return self._read_until_prompt()
+
+    def run(self, command: str, flag: 'AbortFlag' = None) -> str:
+        """
+        Executes the given AVL command or chain of commands, returns the AVL output as string.
+
+        The command must start and end at the top level of AVL's menu, and must not quit AVL.
+        If any errors are encountered, a respective exception will be raised, except for ``SINVRT``.
+
+        Parameters:
+            command (str): The command to be executed. For a chain of commands, join them using \\n.
+            flag (AbortFlag): Optional, checked before every line. If raised, the rest of the command is skipped,
+              and the session returns to the top level.
+        Returns:
+            str: The AVL output produced by the command.
+        """
+        logging.debug(f'Executing AVL command in session: {command.replace('\n', ' // ')}')
+        with self.lock:
+            dump = []
+            for line in command.removesuffix('\n').split('\n'):
+                if flag: break
+                dump.append(self.send(line))
+            dump.append(self.return_to_top(dump[-1] if dump else ''))
+            dump = ''.join(dump)
+        self._check_output(dump)
+        return dump
+
+    def return_to_top(self, last_output: str) -> str:
+        """Sends empty lines until AVL is back at the top level of the menu, returns the output."""
+        dump = ''
+        for _ in range(5):
+            if top_level_pattern.search(last_output): return dump
+            last_output = self.send('')
+            dump += last_output
+        raise RuntimeError('AVL session could not return to the top level menu.')
+
+    def _check_output(self, dump: str) -> None:
+        """Raises an exception if AVL reported any errors."""
+        from .avl_interface import AVLInterface
+        err = b''.join(self._stderr).decode(errors='replace')
+        self._stderr.clear()
+        AVLInterface.check_output(dump, err)
+
+    def close(self) -> None:
+        """Quits the AVL process, or kills it if it does not respond."""
+        if self.alive:
+            try:
+                self._process.stdin.write(b'\nQ\n')
+                self._process.stdin.flush()
+                self._process.wait(timeout=2)
+            except (OSError, subprocess.TimeoutExpired):
+                self._process.kill()
+                self._process.wait()
+        logging.debug(f'Closed AVL session at {self.work_dir.name}')
+
+
+class AVLSessionPool:
+    """
+    Keeps a limited number of ``AVLSession`` instances alive, keyed by the geometry they have loaded.
+
+    Requesting a session for a geometry returns an idle session with the same geometry if there is one,
+    otherwise a new session is started. When the pool is full, the least recently used idle sessions are closed,
+    so sessions of outdated geometries get recycled as the geometry changes.
+    """
+
+    def __init__(self, max_sessions: int = 4):
+        """
+        Parameters:
+            max_sessions (int): The maximal number of sessions kept alive when idle.
+        """
+        self.max_sessions = max_sessions
+        self._idle: list[AVLSession] = []  # Least recently used first
+        self._busy: list[AVLSession] = []
+        self._lock = Lock()
+        self._counter = 0
+        atexit.register(self.close_all)
+
+    @staticmethod
+    def get_key(contents: str) -> str:
+        """Returns the key identifying the given .avl file contents."""
+        return sha1(contents.encode('utf-8')).hexdigest()
+
+    @contextmanager
+    def session(self, geometry: Geometry, app_wd: Path) -> Iterator[AVLSession]:
+        """
+        Lends an ``AVLSession`` with the given geometry loaded, for the duration of the ``with`` block.
+
+        If the block raises an exception, the session is closed instead of being returned to the pool,
+        as it might have been left in an unknown state.
+
+        Parameters:
+            geometry (Geometry): The geometry to be loaded.
+            app_wd (Path): The application working directory, where the session directories are created.
+        """
+        session = self._acquire(self.get_key(geometry.string()), geometry, Path(app_wd))
+        try:
+            yield session
+        except BaseException:
+            self._discard(session)
+            raise
+        self._release(session)
+
+    def _acquire(self, key: str, geometry: Geometry, app_wd: Path) -> AVLSession:
+        """Returns an idle session with the given key, or starts a new one."""
+        with self._lock:
+            for session in self._idle:
+                if session.key == key and session.work_dir.parent.parent == app_wd and session.alive:
+                    self._idle.remove(session)
+                    self._busy.append(session)
+                    return session
+            self._counter += 1
+            work_dir = app_wd / 'sessions' / f'{key[:12]}_{self._counter}'
+            to_close = self._make_space(1)
+        for session in to_close: self._close(session)
+
+        work_dir.mkdir(parents=True)
+        avl_file_path = work_dir / 'plane.avl'
+        geometry.write_avl_file(avl_file_path)
+        session = AVLSession(key, avl_file_path)
+        with self._lock:
+            self._busy.append(session)
+        return session
+
+    def _make_space(self, nof_new: int) -> list[AVLSession]:
+        """Removes the least recently used idle sessions above the limit from the pool and returns them."""
+        to_close = []
+        while self._idle and len(self._idle) + len(self._busy) + nof_new > self.max_sessions:
+            to_close.append(self._idle.pop(0))
+        return to_close
+
+    def _release(self, session: AVLSession) -> None:
+        with self._lock:
+            self._busy.remove(session)
+            if not session.alive: to_close = [session]
+            else:
+                self._idle.append(session)
+                to_close = self._make_space(0)
+        for s in to_close: self._close(s)
+
+    def _discard(self, session: AVLSession) -> None:
+        with self._lock:
+            self._busy.remove(session)
+        self._close(session)
+
+    @staticmethod
+    def _close(session: AVLSession) -> None:
+        session.close()
+        shutil.rmtree(session.work_dir, ignore_errors=True)
+
+    def close_all(self) -> None:
+        """Closes all idle sessions. Should be called before the application working directory is deleted."""
+        with self._lock:
+            to_close, self._idle = self._idle, []
+        for session in to_close: self._close(session)
@@ -0,0 +1,191 @@
+"""
+Copyright (c) 2025 Wojciech Kwiatkowski
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+"""
+
+import logging
+import os
+import subprocess
+from pathlib import Path
+from queue import Queue, Empty
+from subprocess import Popen, PIPE
+from threading import Thread, Lock
+from time import monotonic
+
+
+class GhostscriptWorker:
+    """
+    A long-lived Ghostscript interpreter, converting PostScript files to images on request.
+
+    Ghostscript is started once, in its interactive mode without prompts, and every conversion is sent to its stdin
+    as a single line of PostScript, which selects the device and the resolution, renders the file,
+    closes the output file, and prints a marker telling whether the job succeeded.
+    The worker reads the output up to the marker, so a conversion returns exactly when the image is complete.
+
+    Ghostscript runs with ``-dSAFER``, and may only read and write the files in the ``permitted`` directories
+    and their subdirectories, so both the PostScript files and the images must be there.
+    Since Ghostscript 9.50, SAFER restricts the file access only, so the device and the output file can still be
+    switched by every job.
+
+    Attributes:
+        command (list[str]): The command starting Ghostscript, to which the options are appended.
+        permitted (list[Path]): The directories Ghostscript is allowed to read from and write to.
+        timeout (float | None): The maximal time in seconds to wait for a single job. ``None`` to wait forever.
+    """
+    _marker = 'GAVL-JOB'
+
+    def __init__(self, command: list[str], permitted: list[Path | str] = (), timeout: float | None = 60.0):
+        """
+        Parameters:
+            command (list[str]): The command starting Ghostscript, e.g. the path to the console executable.
+            permitted (list[Path | str]): The directories Ghostscript is allowed to read from and write to.
+            timeout (float | None): The maximal time in seconds to wait for a single job. ``None`` to wait forever.
+        """
+        self.command = list(command)
+        self.permitted = [Path(directory).absolute() for directory in permitted]
+        self.timeout = timeout
+        self.lock = Lock()
+        self._process: Popen | None = None
+        self._stdout: Queue[str | None] = Queue()
+
+    @property
+    def alive(self) -> bool:
+        """Returns ``True`` if the Ghostscript process is running."""
+        return self._process is not None and self._process.poll() is None
+
+    def _start(self) -> None:
+        """Starts Ghostscript, and waits until it is ready."""
+        logging.debug('Starting the Ghostscript worker.')
+        self._stdout = Queue()
+        options = ['-q', '-dNOPAUSE', '-dNOPROMPT', '-sDEVICE=nullpage'] + self.safer_options()
+        self._process = Popen(self.command + options,
+                              stdin=PIPE, stdout=PIPE, stderr=subprocess.STDOUT,
+                              creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0)
+        Thread(target=self._pump_stdout, args=(self._process, self._stdout), daemon=True).start()
+        self._run(f'({self._marker} ok\\n) print flush')
+
+    def safer_options(self) -> list[str]:
+        """Returns the options running Ghostscript with ``-dSAFER``, with access to the ``permitted`` directories.
+        The paths must match the ones of the jobs exactly, so both are written with forward slashes."""
+        _r = ['-dSAFER', f'--permit-file-write={os.devnull}']
+        for directory in self.permitted:
+            _r += [f'--permit-file-read={directory.as_posix()}/*', f'--permit-file-write={directory.as_posix()}/*']
+        return _r
+
+    @staticmethod
+    def _pump_stdout(process: Popen, queue: Queue) -> None:
+        """Moves every line Ghostscript prints into the queue, ``None`` marks the end of the output."""
+        for line in process.stdout:
+            queue.put(line.decode(errors='replace').rstrip('\r\n'))
+        queue.put(None)
+
+    def _run(self, job: str) -> None:
+        """Sends a single line of PostScript, and reads the output up to the marker.
+
+        Raises:
+            RuntimeError: If the job failed, or Ghostscript exited.
+            TimeoutError: If the job did not finish in ``timeout`` seconds.
+        """
+        self._process.stdin.write(bytes(job + '\n', encoding='utf-8'))
+        self._process.stdin.flush()
+        output = []
+        deadline = None if self.timeout is None else monotonic() + self.timeout
+        while True:
+            try:
+                line = self._stdout.get(timeout=None if deadline is None else max(deadline - monotonic(), 0))
+            except Empty:
+                self.close()
+                raise TimeoutError(f'Ghostscript did not respond in {self.timeout} s.')
+            if line is None:
+                raise RuntimeError('\n'.join(['Ghostscript exited unexpectedly.'] + output[-10:]))
+            if not line.startswith(self._marker):
+                output.append(line)
+                continue
+            if line != f'{self._marker} ok':
+                raise RuntimeError('\n'.join([f'Ghostscript {line.removeprefix(self._marker).strip()}'] + output[-10:]))
+            return
+
+    @staticmethod
+    def _ps_string(text: str) -> str:
+        """Returns the text as a PostScript string literal."""
+        return '(' + text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') + ')'
+
+    def convert(self, ps_path: Path | str, output_path: Path | str, resolution: int = 300, device: str = 'png16m') -> None:
+        """
+        Renders the PostScript file into an image, and returns once the image is written.
+        Both files must be in one of the ``permitted`` directories.
+
+        Parameters:
+            ps_path (Path | str): Path to the PostScript file.
+            output_path (Path | str): Path to the output file. For multiple pages, include '%d' for the page number,
+              otherwise only the last page is kept.
+            resolution (int): The resolution, in dpi.
+            device (str): The Ghostscript output device, e.g. 'png16m', 'pngalpha' for a transparent background,
+              or 'pdfwrite' for a single PDF file of all the pages.
+        Raises:
+            RuntimeError: If Ghostscript could not convert the file.
+        """
+        ps_path = self._ps_string(Path(ps_path).absolute().as_posix())
+        output_path = self._ps_string(Path(output_path).absolute().as_posix())
+        # Pointing the device to another file closes the output file, so the image is complete once the marker
+        # is printed. The name of the error, if any, is kept on the stack until then.
+        job = (f'{{({device}) selectdevice '
+               f'<< /HWResolution [{resolution} {resolution}] /OutputFile {output_path} >> setpagedevice '
+               f'{ps_path} run}} stopped {{$error /errorname get}} {{null}} ifelse '
+               f'mark {{<< /OutputFile {self._ps_string(os.devnull)} >> setpagedevice}} stopped cleartomark nulldevice '
+               f'dup null eq {{pop ({self._marker} ok\\n) print}} {{({self._marker} failed ) print ==}} ifelse '
+               f'clear cleardictstack flush')
+        with self.lock:
+            logging.debug(f'Converting {ps_path} to {output_path} at {resolution} dpi.')
+            try:
+                if not self.alive: self._start()
+                self._run(job)
+            except RuntimeError:
+                # The interpreter might be in an unknown state, start a new one for the next job.
+                self.close()
+                raise
+
+    def convert_once(self,
+                     ps_path: Path | str,
+                     output_path: Path | str,
+                     resolution: int = 300,
+                     device: str = 'png16m') -> None:
+        """
+        Same as ``convert``, but in a new Ghostscript process, started for this file only.
+        Slower, but independent of the state of the worker, e.g. as a fallback if the worker fails.
+
+        Raises:
+            RuntimeError: If Ghostscript could not convert the file.
+        """
+        ps_path, output_path = Path(ps_path).absolute().as_posix(), Path(output_path).absolute().as_posix()
+        logging.debug(f'Converting {ps_path} to {output_path} at {resolution} dpi, in a one-shot Ghostscript.')
+        try:
+            result = subprocess.run(self.command + ['-q', '-dBATCH', '-dNOPAUSE', f'-sDEVICE={device}',
+                                                    f'-r{resolution}', f'-sOutputFile={output_path}']
+                                    + self.safer_options() + [ps_path],
+                                    stdout=PIPE, stderr=subprocess.STDOUT, timeout=self.timeout,
+                                    creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0)
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f'Ghostscript did not respond in {self.timeout} s.')
+        if result.returncode != 0:
+            output = result.stdout.decode(errors='replace').splitlines()
+            raise RuntimeError('\n'.join([f'Ghostscript exited with code {result.returncode}.'] + output[-10:]))
+
+    def close(self) -> None:
+        """Quits the Ghostscript process, or kills it if it does not respond."""
+        if not self.alive:
+            self._process = None
+            return
+        try:
+            self._process.stdin.write(b'quit\n')
+            self._process.stdin.flush()
+            self._process.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            self._process.kill()
+            self._process.wait()
+        self._process = None
+        logging.debug('Closed the Ghostscript worker.')
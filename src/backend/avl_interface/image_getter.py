@@ -7,153 +7,248 @@ the Free Software Foundation, either version 3 of the License, or
 (at your option) any later version.
 """
 
-import re
+import atexit
+import itertools
+import logging
+import os
+import shutil
 from pathlib import Path
-from subprocess import run, CalledProcessError
-from threading import Thread
-from time import sleep
+from tempfile import mkdtemp
+from threading import Lock
+from typing import Literal, TYPE_CHECKING
+from weakref import WeakValueDictionary
 
-from PIL import Image
+if TYPE_CHECKING:
+    from PIL import Image
 
 from .avl_interface import AVLInterface
+from .ghostscript_worker import GhostscriptWorker
+from .plot_cache import PlotCache
 from ..geo_design import Geometry
 
 
 def get_gs_path() -> Path:
-    """Returns Path to GhostScript."""
+    """Returns Path to GhostScript, preferring the console executable, which can be driven through pipes."""
     base_path = Path(__file__).resolve().parent.parent.parent
-    gs_exe = base_path / "ghostscript" / "bin" / "gswin64.exe"
-    if not gs_exe.exists():
-        raise FileNotFoundError('Cannot find GhostScript executable')
-    return gs_exe
+    for name in ("gswin64c.exe", "gswin64.exe"):
+        gs_exe = base_path / "ghostscript" / "bin" / name
+        if gs_exe.exists(): return gs_exe
+    raise FileNotFoundError('Cannot find GhostScript executable')
 
 
 class ImageGetter:
-    """A toolbox class to simplify image generation from AVL."""
+    """
+    A toolbox class to simplify image generation from AVL.
+
+    The PostScript plots of AVL are converted to images by a single long-lived Ghostscript process,
+    see ``GhostscriptWorker``.
+    Every plot request runs AVL in its own workspace, see ``create_workspace``, so plots can be made
+    from several threads at once. Only the conversions, which are short, wait for each other.
+    The plots of single cases made through ``get_plot`` are kept in ``plot_cache``.
+
+    Attributes:
+        plot_cache (PlotCache | None): The cache of the plots made by ``get_plot``. ``None`` to disable caching.
+        gs_command (list[str] | None): The command starting Ghostscript. ``None`` to use the bundled executable.
+        resolution (int): The default resolution of the images, in dpi.
+        device (str): The default Ghostscript device of the images, 'pngalpha' for a transparent background.
+    """
+    plot_cache: PlotCache | None = PlotCache()
+    gs_command: list[str] | None = None
+    resolution = 300
+    device = 'png16m'
+    _worker: GhostscriptWorker | None = None
+    _worker_lock = Lock()
+    _image_numbers = itertools.count(1)
+    _plot_locks: WeakValueDictionary[str, Lock] = WeakValueDictionary()
+    _plot_locks_lock = Lock()
+    # The OPER commands plotting the executed case and saving a hardcopy, ending back in OPER, for the first case
+    # of an AVL run, and for the next ones. The options of the geometry plot are toggles, so they are only set once.
+    plot_commands = {
+        'trefftz': ('T\nH\n\n', 'T\nH\n\n'),
+        'loading': ('G\nLO\nCH\nBO\nAX\nH\n\n', 'G\nH\n\n'),
+    }
+
+    @classmethod
+    def gs_worker(cls, app_wd: str | Path) -> GhostscriptWorker:
+        """Returns the shared Ghostscript worker, allowed to access the 'plots' directory of the app working directory,
+        see ``create_workspace``. It is replaced if ``gs_command`` or the app working directory has changed."""
+        command = cls.gs_command or [str(get_gs_path())]
+        permitted = [(Path(app_wd) / 'plots').absolute()]
+        with cls._worker_lock:
+            if cls._worker is None or cls._worker.command != command or cls._worker.permitted != permitted:
+                if cls._worker is not None: cls._worker.close()
+                cls._worker = GhostscriptWorker(command, permitted)
+            return cls._worker
+
+    @classmethod
+    def close_worker(cls) -> None:
+        """Quits the Ghostscript worker. A new one is started on the next conversion."""
+        with cls._worker_lock:
+            if cls._worker is not None: cls._worker.close()
+            cls._worker = None
+
+    @staticmethod
+    def create_workspace(app_wd: str | Path, kind: str) -> Path:
+        """Creates a new directory for a single plot request, named after the kind of the plot,
+        in the 'plots' directory of the app working directory, and returns its path."""
+        plots_dir = Path(app_wd) / 'plots'
+        plots_dir.mkdir(exist_ok=True)
+        return Path(mkdtemp(prefix=f'{kind}_', dir=plots_dir))
 
     @classmethod
-    def get_image(cls, avl_file_path: str | Path, command: str, app_wd: str | Path) -> Path:
+    def next_image_path(cls, app_wd: str | Path) -> Path:
+        """
+        Returns a new path 'img_{num}.png' in the 'images' directory of the app working directory.
+
+        The numbers are taken from a counter shared by all the threads, and the file is created right away,
+        so no two requests get the same path, and files left from before are skipped.
+        """
+        img_dir = Path(app_wd) / 'images'
+        img_dir.mkdir(exist_ok=True)
+        while True:
+            png_path = img_dir / f'img_{next(cls._image_numbers)}.png'
+            try:
+                png_path.touch(exist_ok=False)
+                return png_path
+            except FileExistsError:
+                continue
+
+    @classmethod
+    def get_image(cls,
+                  avl_file_path: str | Path,
+                  command: str,
+                  app_wd: str | Path,
+                  resolution: int = None,
+                  device: str = None) -> Path:
         """
         Returns the path to a .png image created by the given command.
 
+        AVL is run in the directory of the .avl file, where it saves the plot as 'plot.ps',
+        so the file should be in the workspace of the request, see ``create_workspace``.
+
         :param avl_file_path: The path to the .avl file.
         :param command: Full command that will create the image, including 'H', return to top level, and 'Q'.
         :param app_wd: App working directory.
+        :param resolution: The resolution of the image, in dpi. Defaults to ``resolution``.
+        :param device: The Ghostscript device used. Defaults to ``device``.
         :return: Path to the .png image.
         """
-        # Execute the given command
-        _ = AVLInterface.execute(command, avl_file_path, app_wd)
-        # Open or create a directory for images
-        img_dir = Path(app_wd) / 'images'
-        if not img_dir.exists(): img_dir.mkdir()
-
-        # The images are saved as 'img_{num}.png', so we need to find the next free number to use,
-        # in case any files already exist.
-        pattern = re.compile(r"img_(?P<index>\d+)\.png")
-        # Extract numbers from matching filenames
-        numbers = [
-            int(match.group("index"))
-            for file in img_dir.iterdir()
-            if (match := pattern.match(file.name))
-        ]
-        next_number = max(numbers, default=0) + 1
-        # Create the path to save the .png under.
-        png_path = img_dir / f'img_{next_number}.png'
+        # Execute the given command in the workspace
+        workspace = Path(avl_file_path).parent
+        _ = AVLInterface.execute(command, avl_file_path, workspace)
         # AVL saves the created graphics as '{WorkDir}/plot.ps' by default
-        ps_path = app_wd / 'plot.ps'
+        ps_path = workspace / 'plot.ps'
         if not ps_path.exists():
             raise FileNotFoundError('Cannot find plot.ps file')
-        # Turn the .ps file into a .png file
-        cls._ps2png(ps_path, png_path)
-        # Create a Thread to clean-up, not to block the app
-        Thread(target=cls._cleanup, args=(ps_path,), daemon=True).start()
+        # Turn the .ps file into a .png file in the workspace, the worker returns once the image is written.
+        try:
+            cls._ps2png(ps_path, workspace / 'plot.png', app_wd, resolution, device)
+        finally:
+            ps_path.unlink()
+        png_path = cls.next_image_path(app_wd)
+        os.replace(workspace / 'plot.png', png_path)
         return png_path
 
-    @staticmethod
-    def _cleanup(ps_path: Path, wait_time: float = 3):
-        """Deletes the given .ps file after a delay, as the GhostScript needs some time to process the file."""
-        sleep(wait_time)
-        ps_path.unlink()
-
-    @staticmethod
-    def _ps2png(ps_path: str | Path, png_path: str | Path, add_background: bool = True):
-        """Converts the given PostScript file to a PNG file."""
+    @classmethod
+    def _ps2png(cls,
+                ps_path: str | Path,
+                png_path: str | Path,
+                app_wd: str | Path,
+                resolution: int = None,
+                device: str = None):
+        """Converts the given PostScript file to a PNG file, using the Ghostscript worker,
+        or a one-shot Ghostscript if the worker fails or does not respond.
+        Both files must be in a workspace of the app working directory, see ``create_workspace``."""
+        worker = cls.gs_worker(app_wd)
+        resolution, device = resolution or cls.resolution, device or cls.device
         try:
-            run([
-                get_gs_path(),
-                "-dSAFER", "-dBATCH", "-dNOPAUSE",
-                f"-sDEVICE={"png16m" if add_background else "pngalpha"}",
-                "-r300",
-                f"-sOutputFile={png_path}",
-                ps_path
-            ], check=True)
-        except CalledProcessError as e:
-            raise RuntimeError(e)
+            worker.convert(ps_path, png_path, resolution, device)
+        except (RuntimeError, TimeoutError) as e:
+            logging.warning(f'The Ghostscript worker failed, converting in a one-shot Ghostscript: {e}')
+            worker.convert_once(ps_path, png_path, resolution, device)
 
     @staticmethod
-    def _image_from_path(path: Path) -> Image.Image:
+    def _image_from_path(path: Path) -> 'Image.Image':
         """Returns a PIL Image from the given path."""
+        from PIL import Image
         return Image.open(path).rotate(-90, expand=True)
 
+    @staticmethod
+    def _case_run_file_contents(run_file_data: dict[str, list[float]], case_number: int, height: float) -> str:
+        """Returns the .run file contents of the single case plotted, at its own air density."""
+        data, densities = AVLInterface.flight_conditions(run_file_data, height)
+        return AVLInterface.create_run_file_contents(AVLInterface.select_cases(data, [case_number]),
+                                                     density=densities[case_number])
+
     @classmethod
     def get_trefftz(cls,
                     geometry: Geometry,
                     run_file_data: dict[str, list[float]],
                     case_number: int,
                     height: float,
-                    app_wd: str | Path) -> Image.Image:
+                    app_wd: str | Path,
+                    resolution: int = None,
+                    device: str = None) -> 'Image.Image':
         """Returns a Trefftz plot of the given conditions.
 
         :param geometry: The geometry of the aircraft.
         :param run_file_data: Run-file type data.
         :param case_number: The number of the cases considered.
-        :param height: The altitude of the aircraft.
+        :param height: The altitude of the aircraft, if the run-file data has no 'altitude' column.
         :param app_wd: App working directory.
+        :param resolution: The resolution of the image, in dpi. Defaults to ``resolution``.
+        :param device: The Ghostscript device used. Defaults to ``device``.
         :return: The Trefftz plot as a PIL Image.
         """
-        contents = AVLInterface.create_run_file_contents(run_file_data, height)
-
-        work_dir = Path(app_wd) / 'trefftz'
-        if not work_dir.exists(): work_dir.mkdir()
-        avl_file_path = work_dir / 'plane.avl'
-        run_file_path = work_dir / 'plane.run'
-
-        with open(avl_file_path, 'w') as avl_file: avl_file.write(geometry.string())
-        with open(run_file_path, 'w') as run_file: run_file.write(contents)
-
-        command = ('OPER\n'
-                   f'{case_number + 1}\n'
-                   'X\n'
-                   'T\n'
-                   'H\n'
-                   '\n'
-                   '\n'
-                   'Q\n')
-        png_path = cls.get_image(avl_file_path, command, app_wd)
+        contents = cls._case_run_file_contents(run_file_data, case_number, height)
+
+        work_dir = cls.create_workspace(app_wd, 'trefftz')
+        try:
+            avl_file_path = work_dir / 'plane.avl'
+            run_file_path = work_dir / 'plane.run'
+
+            geometry.write_avl_file(avl_file_path)
+            with open(run_file_path, 'w') as run_file: run_file.write(contents)
+
+            command = ('OPER\n'
+                       '1\n'
+                       'X\n'
+                       f'{cls.plot_commands['trefftz'][0]}'
+                       '\n'
+                       'Q\n')
+            png_path = cls.get_image(avl_file_path, command, app_wd, resolution, device)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
         return cls._image_from_path(png_path)
 
     @classmethod
     def get_geometry(cls,
                      geometry: Geometry,
-                     app_wd: str | Path) -> Image.Image:
+                     app_wd: str | Path,
+                     resolution: int = None,
+                     device: str = None) -> 'Image.Image':
         """Returns an image of the aircraft's geometry as seen by AVL.
 
         :param geometry: The geometry of the aircraft.
         :param app_wd: App working directory.
+        :param resolution: The resolution of the image, in dpi. Defaults to ``resolution``.
+        :param device: The Ghostscript device used. Defaults to ``device``.
         :return: The geometry image as a PIL.Image.Image."""
 
-        work_dir = Path(app_wd) / 'geometry'
-        if not work_dir.exists(): work_dir.mkdir()
-        avl_file_path = work_dir / 'plane.avl'
-        with open(avl_file_path, 'w') as avl_file: avl_file.write(geometry.string())
-
-        command = ('OPER\n'
-                   'G\n'
-                   'H\n'
-                   '\n'
-                   '\n'
-                   'Q\n')
-        png_path = cls.get_image(avl_file_path, command, app_wd)
+        work_dir = cls.create_workspace(app_wd, 'geometry')
+        try:
+            avl_file_path = work_dir / 'plane.avl'
+            geometry.write_avl_file(avl_file_path)
+
+            command = ('OPER\n'
+                       'G\n'
+                       'H\n'
+                       '\n'
+                       '\n'
+                       'Q\n')
+            png_path = cls.get_image(avl_file_path, command, app_wd, resolution, device)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
         return cls._image_from_path(png_path)
 
     @classmethod
@@ -162,37 +257,156 @@ class ImageGetter:
                     run_file_data: dict[str, list[float]],
                     case_number: int,
                     height: float,
-                    app_wd: str | Path) -> Image.Image:
+                    app_wd: str | Path,
+                    resolution: int = None,
+                    device: str = None) -> 'Image.Image':
         """Returns a loading plot of the given conditions.
 
         :param geometry: The geometry of the aircraft.
         :param run_file_data: Run-file type data.
         :param case_number: The number of the cases considered.
-        :param height: The altitude of the aircraft.
+        :param height: The altitude of the aircraft, if the run-file data has no 'altitude' column.
         :param app_wd: App working directory.
+        :param resolution: The resolution of the image, in dpi. Defaults to ``resolution``.
+        :param device: The Ghostscript device used. Defaults to ``device``.
         :return: The Trefftz plot as a PIL Image.
         """
-        contents = AVLInterface.create_run_file_contents(run_file_data, height)
-
-        work_dir = Path(app_wd) / 'loading'
-        if not work_dir.exists(): work_dir.mkdir()
-        avl_file_path = work_dir / 'plane.avl'
-        run_file_path = work_dir / 'plane.run'
-
-        with open(avl_file_path, 'w') as avl_file: avl_file.write(geometry.string())
-        with open(run_file_path, 'w') as run_file: run_file.write(contents)
-
-        command = ('OPER\n'
-                   f'{case_number + 1}\n'
-                   'X\n'
-                   'G\n'
-                   'LO\n'
-                   'CH\n'
-                   'BO\n'
-                   'AX\n'
-                   'H\n'
-                   '\n'
-                   '\n'
-                   'Q\n')
-        png_path = cls.get_image(avl_file_path, command, app_wd)
+        contents = cls._case_run_file_contents(run_file_data, case_number, height)
+
+        work_dir = cls.create_workspace(app_wd, 'loading')
+        try:
+            avl_file_path = work_dir / 'plane.avl'
+            run_file_path = work_dir / 'plane.run'
+
+            geometry.write_avl_file(avl_file_path)
+            with open(run_file_path, 'w') as run_file: run_file.write(contents)
+
+            command = ('OPER\n'
+                       '1\n'
+                       'X\n'
+                       f'{cls.plot_commands['loading'][0]}'
+                       '\n'
+                       'Q\n')
+            png_path = cls.get_image(avl_file_path, command, app_wd, resolution, device)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
         return cls._image_from_path(png_path)
+
+    @classmethod
+    def _plot_lock(cls, key: str) -> Lock:
+        """Returns the lock of the plot of the key, shared by all the requests for it while any of them holds it."""
+        with cls._plot_locks_lock:
+            lock = cls._plot_locks.get(key)
+            if lock is None:
+                lock = cls._plot_locks[key] = Lock()
+            return lock
+
+    @classmethod
+    def get_plot(cls,
+                 kind: Literal['trefftz', 'loading'],
+                 geometry: Geometry,
+                 run_file_data: dict[str, list[float]],
+                 case_number: int,
+                 height: float,
+                 app_wd: str | Path,
+                 resolution: int = None,
+                 device: str = None) -> 'Image.Image':
+        """Returns a Trefftz or loading plot of the given conditions, from ``plot_cache`` if it was made before.
+        Simultaneous requests for the same plot wait for the first one, instead of running AVL again.
+
+        :param kind: The plot, 'trefftz' or 'loading'.
+        :param geometry: The geometry of the aircraft.
+        :param run_file_data: Run-file type data.
+        :param case_number: The number of the cases considered.
+        :param height: The altitude of the aircraft, if the run-file data has no 'altitude' column.
+        :param app_wd: App working directory.
+        :param resolution: The resolution of the image, in dpi. Defaults to ``resolution``.
+        :param device: The Ghostscript device used. Defaults to ``device``.
+        :return: The plot as a PIL Image.
+        """
+        plot = {'trefftz': cls.get_trefftz, 'loading': cls.get_loading}[kind]
+        resolution, device = resolution or cls.resolution, device or cls.device
+        cache = cls.plot_cache
+        if cache is None:
+            return plot(geometry, run_file_data, case_number, height, app_wd, resolution, device)
+
+        data, densities = AVLInterface.flight_conditions(run_file_data, height)
+        case_data = {name: values[case_number] for name, values in data.items()}
+        key = cache.get_key(geometry.string(), case_data, densities[case_number], kind, resolution, device)
+        with cls._plot_lock(key):
+            image = cache.get(key)
+            if image is None:
+                image = plot(geometry, run_file_data, case_number, height, app_wd, resolution, device)
+                cache.put(key, image)
+        return image
+
+    @classmethod
+    def export_plots(cls,
+                     geometry: Geometry,
+                     run_file_data: dict[str, list[float]],
+                     height: float,
+                     output_path: str | Path,
+                     app_wd: str | Path,
+                     kind: Literal['trefftz', 'loading'] = 'trefftz',
+                     resolution: int = None) -> list[Path]:
+        """Plots every case of the series, and saves the plots as PNG images, or as a single PDF file.
+
+        All the cases are plotted by a single AVL run, in which every hardcopy adds a page to the same 'plot.ps',
+        and all the pages are converted by a single Ghostscript job.
+
+        :param geometry: The geometry of the aircraft.
+        :param run_file_data: Run-file type data.
+        :param height: The altitude of the aircraft, if the run-file data has no 'altitude' column.
+        :param output_path: A '.pdf' file, or a directory for the images, named '{kind}_{case number}.png'.
+        :param app_wd: App working directory.
+        :param kind: The plot of every case, 'trefftz' or 'loading'.
+        :param resolution: The resolution of the images, in dpi. Defaults to ``resolution``.
+        :return: The paths of the saved files.
+        """
+        data, densities = AVLInterface.flight_conditions(run_file_data, height)
+        first_plot, next_plot = cls.plot_commands[kind]
+        output_path = Path(output_path)
+        resolution = resolution or cls.resolution
+
+        work_dir = cls.create_workspace(app_wd, f'{kind}_export')
+        try:
+            avl_file_path = work_dir / 'plane.avl'
+            geometry.write_avl_file(avl_file_path)
+            # Load and plot the blocks of cases one after another, see ``AVLInterface.density_blocks``.
+            command = ''
+            limit = AVLInterface.run_case_limit or AVLInterface.default_run_case_limit
+            for k, (start, end) in enumerate(AVLInterface.density_blocks(densities, limit)):
+                run_file_path = work_dir / f'block_{k}.run'
+                AVLInterface.write_run_file(run_file_path, data, densities, start, end)
+                command += f'CASE {run_file_path.absolute()}\nOPER\n'
+                for i in range(start, end):
+                    command += f'{i - start + 1}\nX\n' + (first_plot if i == 0 else next_plot)
+                command += '\n'
+            command += 'Q\n'
+            _ = AVLInterface.execute(command, avl_file_path, work_dir)
+            ps_path = work_dir / 'plot.ps'
+            if not ps_path.exists():
+                raise FileNotFoundError('Cannot find plot.ps file')
+
+            if output_path.suffix.lower() == '.pdf':
+                cls._ps2png(ps_path, work_dir / 'plots.pdf', app_wd, resolution, 'pdfwrite')
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(work_dir / 'plots.pdf', output_path)
+                return [output_path]
+            pages_dir = work_dir / 'pages'
+            pages_dir.mkdir()
+            cls._ps2png(ps_path, pages_dir / 'page_%d.png', app_wd, resolution)
+            pages = sorted(pages_dir.iterdir(), key=lambda page: int(page.stem.removeprefix('page_')))
+            if len(pages) != len(densities):
+                raise RuntimeError(f'AVL plotted {len(pages)} of {len(densities)} cases.')
+            output_path.mkdir(parents=True, exist_ok=True)
+            paths = []
+            for i, page in enumerate(pages):
+                paths.append(output_path / f'{kind}_{i + 1}.png')
+                cls._image_from_path(page).save(paths[-1])
+            return paths
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+atexit.register(ImageGetter.close_worker)
@@ -0,0 +1,171 @@
+"""
+Copyright (c) 2025 Wojciech Kwiatkowski
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+"""
+
+import logging
+import os
+from collections import OrderedDict
+from hashlib import sha1
+from io import BytesIO
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING
+
+from platformdirs import user_cache_dir
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+
+class PlotCache:
+    """
+    A two-level cache of the plot images of single AVL cases, in memory and in a local directory of PNG files.
+
+    Every plot is keyed by a hash of the .avl file contents, the run-file parameters and the air density of the case,
+    the kind of the plot, and the resolution and device of the image, so the same plot is found regardless
+    of the series it belongs to.
+    Both levels keep the plots as PNG bytes, encoded once, and evict the least recently used plots above
+    their size limit. The plots read from the disk are kept in memory again. Any file error is logged and treated as a cache miss, so the cache never breaks a plot.
+
+    Attributes:
+        path (Path): Path to the directory of the stored images.
+        max_memory (int): The maximal total size of the PNG images kept in memory, in bytes.
+        max_disk (int): The maximal total size of the stored files, in bytes.
+        version (int): Part of every key. Bump to invalidate all the stored plots, e.g. when the plot commands change.
+    """
+    version = 1
+
+    def __init__(self, path: Path = None, max_memory: int = 200 * 2 ** 20, max_disk: int = 500 * 2 ** 20):
+        """
+        Parameters:
+            path (Path): Path to the directory of the stored images. Defaults to 'plots' in the user cache directory.
+            max_memory (int): The maximal total size of the PNG images kept in memory, in bytes.
+            max_disk (int): The maximal total size of the stored files, in bytes. 0 to keep the plots in memory only.
+        """
+        self.path = Path(path) if path else Path(user_cache_dir("GAVL")) / 'plots'
+        self.max_memory = max_memory
+        self.max_disk = max_disk
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_size = 0
+        self._disk_size: int | None = None
+        self._lock = Lock()  # Guards the images in memory
+        self._disk_lock = Lock()  # Guards the files
+
+    @classmethod
+    def get_key(cls,
+                avl_contents: str,
+                case_data: dict[str, float],
+                density: float,
+                kind: str,
+                resolution: int,
+                device: str) -> str:
+        """
+        Returns the key of a plot.
+
+        Parameters:
+            avl_contents (str): The .avl file contents, as returned by ``Geometry.string()``.
+            case_data (dict[str, float]): The run-file parameters of the case.
+            density (float): The air density of the case, in kg/m^3.
+            kind (str): The kind of the plot, e.g. 'trefftz'.
+            resolution (int): The resolution of the image, in dpi.
+            device (str): The Ghostscript device of the image.
+        """
+        geometry_hash = sha1(avl_contents.encode('utf-8')).hexdigest()
+        return sha1('|'.join([f'{cls.version}|{geometry_hash}|{density!r}|{kind}|{resolution}|{device}']
+                             + [f'{name}={value!r}' for name, value in case_data.items()])
+                    .encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _encode(image: 'Image.Image') -> bytes:
+        buffer = BytesIO()
+        image.save(buffer, format='PNG', compress_level=1)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _decode(contents: bytes) -> 'Image.Image':
+        from PIL import Image
+        with Image.open(BytesIO(contents)) as file:
+            file.load()
+            return file.copy()
+
+    def _file(self, key: str) -> Path:
+        return self.path / f'{key}.png'
+
+    def get(self, key: str) -> 'Image.Image | None':
+        """Returns the stored image of the key, ``None`` if it is not found."""
+        with self._lock:
+            contents = self._memory.get(key)
+            if contents is not None: self._memory.move_to_end(key)
+        if contents is not None: return self._decode(contents)
+        if self.max_disk <= 0: return None
+        with self._disk_lock:
+            try:
+                path = self._file(key)
+                if not path.exists(): return None
+                contents = path.read_bytes()
+                os.utime(path)
+            except OSError as e:
+                logging.warning(f'Cannot read the plot cache: {e}')
+                return None
+        try:
+            image = self._decode(contents)
+        except OSError as e:
+            logging.warning(f'Cannot read the plot cache: {e}')
+            return None
+        with self._lock: self._keep(key, contents)
+        return image
+
+    def put(self, key: str, image: 'Image.Image') -> None:
+        """Stores the image under the key, then evicts the oldest plots above the size limits."""
+        contents = self._encode(image)
+        with self._lock: self._keep(key, contents)
+        if self.max_disk <= 0: return
+        with self._disk_lock:
+            try:
+                self.path.mkdir(parents=True, exist_ok=True)
+                if self._disk_size is None:
+                    self._disk_size = sum(path.stat().st_size for path in self.path.glob('*.png'))
+                path = self._file(key)
+                old_size = path.stat().st_size if path.exists() else 0
+                path.write_bytes(contents)
+                self._disk_size += path.stat().st_size - old_size
+                self._evict_files()
+            except OSError as e:
+                logging.warning(f'Cannot write to the plot cache: {e}')
+
+    def _keep(self, key: str, contents: bytes) -> None:
+        """Keeps the PNG image in memory, evicting the least recently used ones above ``max_memory``."""
+        old = self._memory.pop(key, None)
+        if old is not None: self._memory_size -= len(old)
+        self._memory[key] = contents
+        self._memory_size += len(contents)
+        while self._memory_size > self.max_memory and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+
+    def _evict_files(self) -> None:
+        """Deletes the least recently used files until the total size is within ``max_disk``."""
+        if self._disk_size <= self.max_disk: return
+        files = sorted((path.stat().st_mtime, path.stat().st_size, path) for path in self.path.glob('*.png'))
+        self._disk_size = sum(size for _, size, _ in files)
+        evicted = 0
+        for _, size, path in files:
+            if self._disk_size <= self.max_disk: break
+            path.unlink(missing_ok=True)
+            self._disk_size -= size
+            evicted += 1
+        logging.debug(f'Evicted {evicted} plots from the plot cache.')
+
+    def clear(self) -> None:
+        """Deletes all the stored plots."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+        with self._disk_lock:
+            for path in self.path.glob('*.png'): path.unlink(missing_ok=True)
+            self._disk_size = 0
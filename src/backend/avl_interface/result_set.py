@@ -0,0 +1,137 @@
+"""
+Copyright (c) 2025 Wojciech Kwiatkowski
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+"""
+
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Iterator, overload
+
+import numpy as np
+
+val_dict = dict[str, float]
+
+
+class ResultView(Mapping[str, float]):
+    """A read-only, dict-like view of the forces or the ST results of a single case of a ``ResultSet``."""
+    __slots__ = ('_row', '_columns')
+
+    def __init__(self, row: np.ndarray, columns: dict[str, int]):
+        """
+        Parameters:
+            row (np.ndarray): The row of the case.
+            columns (dict[str, int]): The index of the column of each key, shared by all the views.
+        """
+        self._row = row
+        self._columns = columns
+
+    def __getitem__(self, key: str) -> float:
+        return float(self._row[self._columns[key]])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._columns)
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+    def __or__(self, other: Mapping[str, float]) -> val_dict:
+        return dict(self) | dict(other)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class ResultSet:
+    """
+    The results of a series of cases, stored as float64 NumPy columns with a single key schema.
+
+    ``rs[i]`` returns the [forces, ST] pair of dict-like views of a single case, like the results used to be,
+    ``rs['CLtot']`` returns a whole column, and slices, index arrays and boolean masks return a new ``ResultSet``.
+
+    Attributes:
+        forces_keys (tuple[str, ...]): The names of the forces columns, in order.
+        st_keys (tuple[str, ...]): The names of the ST columns, in order.
+        data (np.ndarray): The values, one row for each case, and one column for each key, forces first.
+    """
+
+    def __init__(self, forces_keys: tuple[str, ...], st_keys: tuple[str, ...], data: np.ndarray):
+        """
+        Parameters:
+            forces_keys (tuple[str, ...]): The names of the forces columns, in order.
+            st_keys (tuple[str, ...]): The names of the ST columns, in order.
+            data (np.ndarray): The values, of shape (number of cases, number of keys).
+        """
+        self.forces_keys = tuple(forces_keys)
+        self.st_keys = tuple(st_keys)
+        nof_columns = len(self.forces_keys) + len(self.st_keys)
+        data = np.asarray(data, dtype=np.float64)
+        # Without columns the number of rows cannot be inferred, so such a set is always empty
+        self.data = data.reshape(-1, nof_columns) if nof_columns else np.empty((0, 0))
+        self._columns = {key: i for i, key in enumerate(self.keys)}
+        self._forces_columns = {key: i for i, key in enumerate(self.forces_keys)}
+        self._st_columns = {key: i for i, key in enumerate(self.st_keys)}
+
+    @classmethod
+    def from_cases(cls, cases: list[list[val_dict]]) -> 'ResultSet':
+        """Creates a ``ResultSet`` from [forces, ST] dict pairs. The schema is taken from the first case."""
+        if not cases: return cls((), (), np.empty((0, 0)))
+        forces_keys, st_keys = tuple(cases[0][0]), tuple(cases[0][1])
+        data = np.array([[forces[key] for key in forces_keys] + [st[key] for key in st_keys] for forces, st in cases],
+                        dtype=np.float64)
+        return cls(forces_keys, st_keys, data)
+
+    @classmethod
+    def concatenate(cls, result_sets: list['ResultSet']) -> 'ResultSet':
+        """Joins result sets with the same schema, in order. Empty sets are skipped."""
+        result_sets = [rs for rs in result_sets if len(rs)]
+        if not result_sets: return cls((), (), np.empty((0, 0)))
+        first = result_sets[0]
+        if any(rs.keys != first.keys for rs in result_sets):
+            raise ValueError('Cannot concatenate result sets with different keys.')
+        return cls(first.forces_keys, first.st_keys, np.concatenate([rs.data for rs in result_sets]))
+
+    @property
+    def keys(self) -> tuple[str, ...]:
+        """The names of all the columns, forces first."""
+        return self.forces_keys + self.st_keys
+
+    def __len__(self) -> int:
+        return self.data.shape[0]
+
+    @overload
+    def __getitem__(self, item: int) -> list[ResultView]: ...
+    @overload
+    def __getitem__(self, item: str) -> np.ndarray: ...
+    @overload
+    def __getitem__(self, item: slice | np.ndarray | list[int]) -> 'ResultSet': ...
+
+    def __getitem__(self, item):
+        if isinstance(item, str):
+            return self.data[:, self._columns[item]]
+        if isinstance(item, (int, np.integer)):
+            row = self.data[item]
+            nof_forces = len(self.forces_keys)
+            return [ResultView(row[:nof_forces], self._forces_columns), ResultView(row[nof_forces:], self._st_columns)]
+        return ResultSet(self.forces_keys, self.st_keys, self.data[item])
+
+    def __iter__(self) -> Iterator[list[ResultView]]:
+        for i in range(len(self)): yield self[i]
+
+    def __repr__(self) -> str:
+        return f'<ResultSet of {len(self)} cases, {len(self.keys)} columns>'
+
+    def to_cases(self) -> list[list[val_dict]]:
+        """Returns the results as [forces, ST] dict pairs."""
+        return [[dict(forces), dict(st)] for forces, st in self]
+
+    def to_csv(self, path: Path | str) -> None:
+        """Saves the results as a CSV file, with a header row, and one row for each case."""
+        np.savetxt(path, self.data, fmt='%.12g', delimiter=',', header=','.join(self.keys), comments='')
+
+    def to_npz(self, path: Path | str) -> None:
+        """Saves the results as a NumPy .npz file of named columns."""
+        np.savez(path, **{key: self.data[:, i] for i, key in enumerate(self.keys)})
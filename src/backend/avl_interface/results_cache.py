@@ -0,0 +1,143 @@
+"""
+Copyright (c) 2025 Wojciech Kwiatkowski
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+"""
+
+import json
+import logging
+import sqlite3
+from hashlib import sha1
+from pathlib import Path
+from threading import Lock
+from time import time
+
+from platformdirs import user_cache_dir
+
+val_dict = dict[str, float]
+
+
+class ResultsCache:
+    """
+    A persistent, content-addressed cache of the results of single AVL cases, stored in a local SQLite file.
+
+    Every case is keyed by a hash of the .avl file contents, the run-file parameters of the case, and the air density,
+    so the same case is found regardless of the series it was run in.
+    When the total size of the stored results exceeds ``max_size``, the least recently used cases are evicted.
+    Any database error is logged and treated as a cache miss, so the cache never breaks a run.
+
+    Attributes:
+        path (Path): Path to the SQLite file.
+        max_size (int): The maximal total size of the stored results, in bytes.
+        version (int): Part of every key. Bump to invalidate all the stored results, e.g. when the parser changes.
+    """
+    version = 1
+    _chunk_size = 500  # Stay below the SQLite limit of variables per query
+
+    def __init__(self, path: Path = None, max_size: int = 100 * 2 ** 20):
+        """
+        Parameters:
+            path (Path): Path to the SQLite file. Defaults to 'results.sqlite' in the user cache directory.
+            max_size (int): The maximal total size of the stored results, in bytes.
+        """
+        self.path = Path(path) if path else Path(user_cache_dir("GAVL")) / 'results.sqlite'
+        self.max_size = max_size
+        self._connection: sqlite3.Connection | None = None
+        self._lock = Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Returns the connection to the database, creating the file and the table on first use."""
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            self._connection.execute('CREATE TABLE IF NOT EXISTS cases ('
+                                     'key TEXT PRIMARY KEY, '
+                                     'forces TEXT NOT NULL, '
+                                     'st TEXT NOT NULL, '
+                                     'size INTEGER NOT NULL, '
+                                     'last_used REAL NOT NULL)')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS cases_last_used ON cases (last_used)')
+            self._connection.commit()
+        return self._connection
+
+    @classmethod
+    def get_keys(cls, avl_contents: str, data: dict[str, list[float]], density: float | list[float]) -> list[str]:
+        """
+        Returns the key of every case of the series.
+
+        Parameters:
+            avl_contents (str): The .avl file contents, as returned by ``Geometry.string()``.
+            data (dict[str, list[float]]): The run-file data of the series.
+            density (float | list[float]): The air density, in kg/m^3, of the whole series, or of every case.
+        """
+        geometry_hash = sha1(avl_contents.encode('utf-8')).hexdigest()
+        nof_cases = len(list(data.values())[0])
+        densities = density if isinstance(density, list) else [density] * nof_cases
+        return [sha1('|'.join([f'{cls.version}|{geometry_hash}|{densities[i]!r}']
+                              + [f'{name}={values[i]!r}' for name, values in data.items()])
+                     .encode('utf-8')).hexdigest()
+                for i in range(nof_cases)]
+
+    def get_many(self, keys: list[str]) -> dict[str, list[val_dict]]:
+        """Returns the stored [forces, ST] results of the given keys, skipping the ones not found."""
+        _r = {}
+        try:
+            with self._lock:
+                connection = self._connect()
+                for start in range(0, len(keys), self._chunk_size):
+                    chunk = keys[start:start + self._chunk_size]
+                    rows = connection.execute(f'SELECT key, forces, st FROM cases '
+                                              f'WHERE key IN ({','.join('?' * len(chunk))})', chunk)
+                    for key, forces, st in rows:
+                        _r[key] = [json.loads(forces), json.loads(st)]
+                    connection.executemany('UPDATE cases SET last_used = ? WHERE key = ?',
+                                           [(time(), key) for key in chunk if key in _r])
+                connection.commit()
+        except sqlite3.Error as e:
+            logging.warning(f'Cannot read the results cache: {e}')
+            return {}
+        return _r
+
+    def put_many(self, results: dict[str, list[val_dict]]) -> None:
+        """Stores the given [forces, ST] results under their keys, then evicts the oldest ones above the size limit."""
+        rows = []
+        for key, (forces, st) in results.items():
+            forces, st = json.dumps(forces), json.dumps(st)
+            rows.append((key, forces, st, len(forces) + len(st), time()))
+        try:
+            with self._lock:
+                connection = self._connect()
+                connection.executemany('INSERT OR REPLACE INTO cases VALUES (?, ?, ?, ?, ?)', rows)
+                self._evict(connection)
+                connection.commit()
+        except sqlite3.Error as e:
+            logging.warning(f'Cannot write to the results cache: {e}')
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        """Deletes the least recently used cases until the total size is within the limit."""
+        excess = (connection.execute('SELECT SUM(size) FROM cases').fetchone()[0] or 0) - self.max_size
+        if excess <= 0: return
+        to_delete = []
+        for key, size in connection.execute('SELECT key, size FROM cases ORDER BY last_used'):
+            if excess <= 0: break
+            to_delete.append((key,))
+            excess -= size
+        connection.executemany('DELETE FROM cases WHERE key = ?', to_delete)
+        logging.debug(f'Evicted {len(to_delete)} cases from the results cache.')
+
+    def clear(self) -> None:
+        """Deletes all the stored results."""
+        with self._lock:
+            connection = self._connect()
+            connection.execute('DELETE FROM cases')
+            connection.commit()
+
+    def close(self) -> None:
+        """Closes the connection to the database. It is reopened on the next use."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
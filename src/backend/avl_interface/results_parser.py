@@ -14,7 +14,23 @@ val_dict = dict[str, float]
 
 
 class ResultsParser:
-    """A toolbox class to parse the AVL return string."""
+    """A toolbox class to parse the AVL return string.
+
+    Attributes:
+        forces_groups (tuple[tuple[str, ...], ...]): The groups of related values, that lead the forces dict.
+        forces_order (tuple[str, ...]): The order of the first entries of the forces dict, the groups joined.
+    """
+    forces_groups = (
+        ('Alpha', 'Beta', 'Mach'),
+        ('pb/2V', 'qc/2V', 'rb/2V'),
+        ("p'b/2V", "r'b/2V"),
+        ('CXtot', 'CYtot', 'CZtot'),
+        ('Cltot', 'Cmtot', 'Cntot'),
+        ("Cl'tot", "Cn'tot"),
+        ('CLtot', 'CDtot', 'CDvis', 'CLff', 'CYff'),
+        ('CDind', 'CDff', 'e')
+    )
+    forces_order = tuple(key for group in forces_groups for key in group)
 
     @staticmethod
     def _split_dump(dump: str) -> list[str]:
@@ -40,82 +56,72 @@ class ResultsParser:
         return [block for block in dump if 'Vortex Lattice Output' in block]
 
     @staticmethod
-    def forces_to_dict(forces_str: str) -> val_dict:
-        """Takes the chopped 'forces' string and converts it to a name-value dict."""
-        vals = re.sub(r'\s+=\s+', '=', forces_str)
-        vals = re.sub(r'\r\n', '', vals)
-        vals = vals.split()
-        _r: dict[str, float] = {}
-        for line in vals:
-            if not '=' in line: continue
-            key, value = line.split('=')
-            _r[key] = float(value)
-        return _r
-
-    @staticmethod
-    def st_file_to_dict(st_str: str) -> val_dict:
-        """Takes the raw contents of the 'ST' file and converts it to a name-value dict."""
-        st_str = re.sub(r'\s*=\s*', '=', st_str)
-        st_str = re.sub(r'\n', '', st_str)
-        st_str = re.sub(r'Clb Cnr / Clr Cnb', 'Clb_Cnr/Clr_Cnb', st_str)
-        vals = st_str.split()
-        _r: dict[str, float] = {}
-        for val in vals:
-            if not '=' in val: continue
-            k, v = val.split('=')
-            _r[k] = float(v)
-        return _r
+    def pairs(text: str) -> list[tuple[str, str]]:
+        """
+        Returns all the 'name = value' pairs of the text, in order.
 
-    @staticmethod
-    def split_st_dict(st_dict: val_dict) -> list[val_dict]:
-        """Splits the 'ST_file' dict into 'forces' and 'ST' """
-        breakpoints = ['Alpha', 'CLa']
-        result = []
-        current_dict = {}
+        The text is split into tokens only once, by ``str.split``, which is several times faster
+        than scanning it with a regular expression.
+        """
+        tokens = text.replace('Clb Cnr / Clr Cnb', 'Clb_Cnr/Clr_Cnb').replace('=', ' = ').split()
+        return [(tokens[i - 1], tokens[i + 1]) for i, token in enumerate(tokens[:-1]) if token == '=' and i]
 
-        for key, value in st_dict.items():
-            if key in breakpoints and current_dict:
-                result.append(current_dict)
-                current_dict = {}
-            current_dict[key] = value
+    @classmethod
+    def forces_to_dict(cls, forces_str: str) -> val_dict:
+        """Takes the chopped 'forces' string and converts it to a name-value dict."""
+        return {key: float(value) for key, value in cls.pairs(forces_str)}
 
-        if current_dict:
-            result.append(current_dict)  # Append the last chunk
+    @classmethod
+    def parse_st(cls, st_str: str) -> list[val_dict]:
+        """
+        Takes the raw contents of the 'ST' file and converts it to [forces, ST] dicts,
+        sorted as by ``sort_forces_dict`` and ``sort_st_dict``.
+
+        Tokenizes the contents only once, and builds the final dicts directly in a single scan.
+        The multi-pass parsing it replaced is kept in ``benchmarks/bench_parser.py``, as the reference.
+        """
+        forces: val_dict = {}
+        st_groups: dict[str, val_dict] = {}
+        xnp, clb_cnr = None, 0
+        # 0 - the header, 1 - the forces, starting at 'Alpha', 2 - the stability derivatives, starting at 'CLa'
+        block = 0
+        for key, value in cls.pairs(st_str):
+            if block < 2:
+                if key == 'CLa': block = 2
+                elif key == 'Alpha': block = 1
+            if block == 1:
+                forces[key] = float(value)
+            elif block == 2:
+                if key == 'Xnp': xnp = float(value)
+                elif key == 'Clb_Cnr/Clr_Cnb': clb_cnr = float(value)
+                else: st_groups.setdefault(key[-2:] if key[-2] == 'd' else key[-1:], {})[key] = float(value)
+        if xnp is None: raise KeyError('Xnp')
+
+        sorted_forces = {key: forces.pop(key) for key in cls.forces_order}
+        sorted_forces.update(forces)
+        st = {k: v for group in st_groups.values() for k, v in group.items()}
+        st['Xnp'] = xnp
+        st['Clb_Cnr/Clr_Cnb'] = clb_cnr
+        return [sorted_forces, st]
 
-        return result[1:]
+    @classmethod
+    def st_file_to_data(cls, path: Path) -> list[val_dict]:
+        """Reads a single 'ST' file and converts it to sorted [forces, ST] dicts."""
+        with open(path) as f: return cls.parse_st(f.read())
 
     @classmethod
     def all_sts_to_data(cls, paths: list[Path]) -> list[list[val_dict]]:
         """Converts every file in the 'ST' directory and converts it to a dict."""
-        _r = []
         try:
-            for path in paths:
-                with open(path) as f: data = f.read()
-                data = cls.st_file_to_dict(data)
-                data = cls.split_st_dict(data)
-                data[0] = cls.sort_forces_dict(data[0])
-                data[1] = cls.sort_st_dict(data[1])
-                _r.append(data)
-            return _r
+            return [cls.st_file_to_data(path) for path in paths]
         except FileNotFoundError:
             return []
 
-    @staticmethod
-    def sort_forces_dict(forces_dict: val_dict, join=True) -> val_dict | list[val_dict]:
-        """Sorts the dict so that relevant values are next to each other."""
-        sorted_keys = (
-            ('Alpha', 'Beta', 'Mach'),
-            ('pb/2V', 'qc/2V', 'rb/2V'),
-            ("p'b/2V", "r'b/2V"),
-            ('CXtot', 'CYtot', 'CZtot'),
-            ('Cltot', 'Cmtot', 'Cntot'),
-            ("Cl'tot", "Cn'tot"),
-            ('CLtot', 'CDtot', 'CDvis', 'CLff', 'CYff'),
-            ('CDind', 'CDff', 'e')
-        )
-
+    @classmethod
+    def sort_forces_dict(cls, forces_dict: val_dict, join=True) -> val_dict | list[val_dict]:
+        """Sorts the dict so that relevant values are next to each other, see ``forces_groups``."""
         sorted_dicts = []
-        for group in sorted_keys:
+        for group in cls.forces_groups:
             sorted_dicts.append({})
             for key in group: sorted_dicts[-1][key] = forces_dict.pop(key)
         sorted_dicts.append(forces_dict)
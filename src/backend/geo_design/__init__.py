@@ -2,4 +2,6 @@ from .airfoil import Airfoil
 from .geometry import Geometry
 from .geometry_generator import GeometryGenerator
 from .section import Section, Control, Flaps, Ailerons, Elevators, Rudder, control_types
+from .section_arrays import SectionArrays
 from .surface import Surface, SurfaceTemplates
+from .airfoil_library import AirfoilLibrary, AirfoilEntry
@@ -10,8 +10,14 @@ the Free Software Foundation, either version 3 of the License, or
 import re
 from pathlib import Path
 
+import numpy as np
+
 from ..math_functions import sort_loop
 
+# A line of exactly two numbers, separated by whitespace or commas.
+_number = r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?'
+_point_line = re.compile(rf'^[ \t,]*({_number})[ \t,]+({_number})[ \t,]*$', re.MULTILINE)
+
 
 def is_number(s: str):
     """Checks if a string is a valid number."""
@@ -22,14 +28,6 @@ def is_number(s: str):
         return False
 
 
-def are_numbers(ls: list[str]):
-    """Checks if all elements in a list of strings are all valid numbers."""
-    for s in ls:
-        if not is_number(s):
-            return False
-    return True
-
-
 def valid_naca(naca: str):
     """Checks if a string is a valid 4-digit symmetric NACA code."""
     return re.fullmatch(r"\d\d\d\d", naca)
@@ -41,69 +39,149 @@ class Airfoil:
 
     Attributes:
         name (str): The name of the airfoil.
-        points (Optional list[tuple[float, float]]): A list of points defining the airfoil geometry.
+        points (Optional np.ndarray): The points defining the airfoil geometry, of shape (number of points, 2).
             ``None`` if the airfoil is not point-defined.
         naca (str): The NACA code of the airfoil. ``None`` if the airfoil is not defined using NACA code.
         active_range (tuple[float, float]): The active range of the airfoil.
     """
+    __slots__ = ('name', '_points', 'naca', 'active_range', '_points_string', '_path')
+    # The points read from files, by path, with the modification time of the file.
+    _file_cache: dict[Path, tuple[int, np.ndarray]] = {}
+    max_cached_files = 64
 
-    def __init__(self, name: str, points: list[tuple[float, float]] | None, naca: str | None, active_range: tuple[float, float]):
+    def __init__(self, name: str, points: np.ndarray | list[tuple[float, float]] | None, naca: str | None, active_range: tuple[float, float]):
         """
         Parameters:
             name (str): The name of the airfoil.
-            points (Optional list[tuple[float, float]]): A list of points defining the airfoil geometry.
+            points (Optional np.ndarray | list[tuple[float, float]]): The points defining the airfoil geometry.
                 ``None`` if the airfoil is not point-defined.
             naca (str): The NACA code of the airfoil. ``None`` if the airfoil is not defined using NACA code.
             active_range (tuple[float, float]): The active range of the airfoil.
         """
         self.name = name
-        self.points = points
+        self._points = self._as_array(points)
         self.naca = naca
         self.active_range = active_range
+        self._points_string: str | None = None
+        self._path: Path | None = None  # The file to read the points from, if they are not read yet.
+
+    def __getstate__(self) -> dict:
+        return {'name': self.name, 'points': self.points, 'naca': self.naca, 'active_range': self.active_range}
+
+    def __setstate__(self, state: dict) -> None:
+        # Also reads the ``__dict__`` of airfoils pickled before ``__slots__`` were used.
+        self.name, self._points, self.naca, self.active_range = (
+            state['name'], self._as_array(state['points']), state['naca'], state['active_range'])
+        self._points_string = None
+        self._path = None
+
+    @staticmethod
+    def _as_array(points: np.ndarray | list[tuple[float, float]] | None) -> np.ndarray | None:
+        if points is None: return None
+        points = np.ascontiguousarray(points, dtype=np.float64)
+        return points if points.ndim == 2 else points.reshape(-1, 2)
+
+    @property
+    def points(self) -> np.ndarray | None:
+        if self._path is not None:
+            self._points = self._read_points(self._path)
+            self._path = None
+        return self._points
+
+    @points.setter
+    def points(self, points: np.ndarray | list[tuple[float, float]] | None) -> None:
+        self._points = self._as_array(points)
+        self._path = None
+        self._points_string = None
 
     @classmethod
-    def from_file(cls, path: Path | str, name: str = None, active_range=(0.0, 1.0)) -> 'Airfoil':
-        """Creates an Airfoil object using geometry from a file."""
+    def from_file(cls, path: Path | str, name: str = None, active_range=(0.0, 1.0), lazy: bool = False) -> 'Airfoil':
+        """
+        Creates an Airfoil object using geometry from a file.
+
+        Parameters:
+            path (Path | str): Path to the file.
+            name (str): The name of the airfoil. Defaults to the name of the file.
+            active_range (tuple[float, float]): The active range of the airfoil.
+            lazy (bool): If ``True``, the file is read only when the points are first needed.
+        """
         if isinstance(path, str): path = Path(path)
         name = name or path.stem
-        with open(path) as f:
-            raw_lines = f.readlines()
-
-        lines = []
-        for line in raw_lines:
-            line = line.replace('\n', '')
-            line = line.strip()
-            line = line.replace('\t', ',')
-            line = line.replace(' ', ',')
-            line = re.split(r',+', line)
-            line = [s for s in line if s]
-            lines.append(line)
+        if lazy:
+            af = cls(name, points=None, naca=None, active_range=active_range)
+            af._path = path
+            return af
+        return cls(name, points=cls._read_points(path), naca=None, active_range=active_range)
 
-        data: list[tuple[float, float]] = []
-        for i, line in enumerate(lines):
-            if not line: continue
-            if not are_numbers(line) or len(line) != 2: continue
-
-            new_line = (float(line[0]), float(line[1]))
-            if not (0 <= new_line[0] <= 1) or not (-1 < new_line[1] < 1): continue
-            data.append(new_line)
+    @classmethod
+    def _read_points(cls, path: Path) -> np.ndarray:
+        """
+        Returns the points of the airfoil file, see ``parse_points``.
+        The points are cached until the file is modified, and must not be modified.
+        """
+        path = Path(path).absolute()
+        mtime = path.stat().st_mtime_ns
+        cached = cls._file_cache.get(path)
+        if cached is not None and cached[0] == mtime: return cached[1]
+        try:
+            points = cls.parse_points(path.read_text())
+        except ValueError:
+            raise ValueError(f"Incorrect input file {path.name}!")
+        points.flags.writeable = False
+        cls._file_cache.pop(path, None)
+        cls._file_cache[path] = (mtime, points)
+        while len(cls._file_cache) > cls.max_cached_files:
+            del cls._file_cache[next(iter(cls._file_cache))]
+        return points
 
-        sorted_data = sort_loop(data)
+    @classmethod
+    def clear_file_cache(cls) -> None:
+        """Forgets the points read from files."""
+        cls._file_cache.clear()
 
-        if len(sorted_data) < 3: raise ValueError("Incorrect input file!")
+    @staticmethod
+    def parse_points(text: str) -> np.ndarray:
+        """
+        Returns the points of an airfoil file, as a loop starting at the trailing edge, over the upper surface.
 
-        af = cls(name, points=sorted_data, naca=None, active_range=active_range)
-        return af
+        Lines other than two numbers, e.g. the name, are skipped, as are the points outside the 0 <= x <= 1 range.
+        A Selig file is already a loop, and keeps its order. A Lednicer file, i.e. one starting with the numbers of
+        the upper and lower surface points, has both surfaces from the leading edge, and is joined into a loop.
+        Other files are sorted into a loop by ``sort_loop``.
+        """
+        rows = np.array(_point_line.findall(text), dtype=np.float64).reshape(-1, 2)
+        points = None
+        if len(rows) and np.all(rows[0] >= 1) and np.all(rows[0] == np.round(rows[0])):
+            nof_upper, nof_lower = rows[0].astype(int)
+            upper, lower = rows[1:1 + nof_upper], rows[1 + nof_upper:1 + nof_upper + nof_lower]
+            if len(upper) == nof_upper and len(lower) == nof_lower and len(upper) and len(lower):
+                # Both surfaces usually start with the same leading-edge point.
+                if np.array_equal(upper[0], lower[0]): lower = lower[1:]
+                points = np.concatenate([upper[::-1], lower])
+        if points is None:
+            points = rows
+        x, y = points[:, 0], points[:, 1]
+        points = points[(0 <= x) & (x <= 1) & (-1 < y) & (y < 1)]
+        if len(points) < 3: raise ValueError("Incorrect input file!")
+
+        x, y = points[:, 0], points[:, 1]
+        le = int(np.argmin(x))
+        dx = np.diff(x)
+        if np.all(dx[:le] <= 0) and np.all(dx[le:] >= 0):
+            # Already a loop, starting at the upper surface, unless the lower one is above it.
+            if np.mean(y[:le + 1]) < np.mean(y[le:]): points = points[::-1]
+            return np.ascontiguousarray(points)
+        return sort_loop(points)
 
     @classmethod
     def from_points(cls, points: list[tuple[float, float]], name: str, active_range=(0.0, 1.0)) -> 'Airfoil':
         """Creates an Airfoil object from a list of points."""
-        positive = [(x, y) for x, y in points if y >= 0]
-        negative = [(x, y) for x, y in points if y < 0]
-        positive.sort(key=lambda p: -p[0])
-        negative.sort(key=lambda p: p[0])
-        points = positive + negative
-        return cls(name, points=points, naca=None, active_range=active_range)
+        points = cls._as_array(points)
+        positive = points[points[:, 1] >= 0]
+        negative = points[points[:, 1] < 0]
+        positive = positive[np.argsort(-positive[:, 0], kind='stable')]
+        negative = negative[np.argsort(negative[:, 0], kind='stable')]
+        return cls(name, points=np.concatenate([positive, negative]), naca=None, active_range=active_range)
 
     @classmethod
     def from_naca(cls, naca: str, active_range=(0.0, 1.0)) -> 'Airfoil':
@@ -119,15 +197,37 @@ class Airfoil:
         af = cls(name="Empty", points=None, naca=None, active_range=(0.0, 1.0))
         return af
 
-    def string(self) -> str:
-        """Returns the current geometry as an .avl type string."""
+    @property
+    def is_point_defined(self) -> bool:
+        """Returns ``True`` if the airfoil is defined by points, and not by a NACA code or as a flat plate."""
+        return (self._points is not None or self._path is not None) and not self.naca
+
+    def string(self, afile: str = None) -> str:
+        """
+        Returns the current geometry as an .avl type string.
+
+        Parameters:
+            afile (str): Path to a .dat file of the airfoil, see ``dat_string``. If given, a point-defined airfoil
+                is referenced with 'AFILE' instead of listing its points.
+        """
         if self.points is None and self.naca is None:
             return ""
 
         if self.naca:
             return f"NACA {self.active_range[0]} {self.active_range[1]}\n{self.naca}\n"
 
-        _r = f"AIRFOIL {self.active_range[0]} {self.active_range[1]} #{self.name}\n"
-        for x, y in self.points:
-            _r += f"{x:.8f} {y:.8f}\n"
-        return _r
+        if afile is not None:
+            if ' ' in afile: afile = f'"{afile}"'
+            return f"AFILE {self.active_range[0]} {self.active_range[1]}\n{afile}\n"
+
+        return f"AIRFOIL {self.active_range[0]} {self.active_range[1]} #{self.name}\n{self.points_string()}"
+
+    def dat_string(self) -> str:
+        """Returns the contents of a .dat file of the airfoil, i.e. the name followed by the points."""
+        return f"{self.name}\n{self.points_string()}"
+
+    def points_string(self) -> str:
+        """Returns the points as .avl type lines. Formatted once, as the points of an airfoil do not change."""
+        if self._points_string is None:
+            self._points_string = ''.join([f"{x:.8f} {y:.8f}\n" for x, y in self.points.tolist()])
+        return self._points_string
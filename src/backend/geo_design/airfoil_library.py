@@ -0,0 +1,277 @@
+"""
+Copyright (c) 2025 Wojciech Kwiatkowski
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+"""
+
+import logging
+import os
+import sqlite3
+from dataclasses import dataclass
+from hashlib import sha1
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Iterator
+
+import numpy as np
+from platformdirs import user_cache_dir
+
+from .airfoil import Airfoil, is_number
+
+
+@dataclass(frozen=True)
+class AirfoilEntry:
+    """
+    An airfoil file in the index of an ``AirfoilLibrary``.
+
+    Attributes:
+        name (str): The name given in the file, or the name of the file if there is none.
+        path (Path): Path to the file.
+        thickness (float): The maximal thickness, as a fraction of the chord.
+        camber (float): The maximal camber, as a fraction of the chord, negative if the airfoil is cambered downwards.
+        nof_points (int): The number of points of the airfoil.
+        hash (str): The SHA-1 hash of the file contents.
+    """
+    name: str
+    path: Path
+    thickness: float
+    camber: float
+    nof_points: int
+    hash: str
+
+    def airfoil(self, active_range=(0.0, 1.0)) -> Airfoil:
+        """Returns the airfoil of the file. The points are read when they are first needed."""
+        return Airfoil.from_file(self.path, name=self.name, active_range=active_range, lazy=True)
+
+
+class AirfoilLibrary:
+    """
+    A persistent index of directories of airfoil files, stored in a local SQLite file.
+
+    ``scan`` reads every new or modified file of a directory once, and stores its name, thickness, camber,
+    number of points and hash, so the library can be searched without reading the files again.
+    The coordinates themselves are only read when an airfoil of the library is used, see ``AirfoilEntry.airfoil``.
+
+    Attributes:
+        path (Path): Path to the SQLite file.
+        suffixes (tuple[str, ...]): The extensions of the indexed files.
+    """
+    suffixes = ('.dat',)
+    _columns = 'name, path, thickness, camber, nof_points, hash'
+
+    def __init__(self, path: Path = None):
+        """
+        Parameters:
+            path (Path): Path to the SQLite file. Defaults to 'airfoils.sqlite' in the user cache directory.
+        """
+        self.path = Path(path) if path else Path(user_cache_dir("GAVL")) / 'airfoils.sqlite'
+        self._connection: sqlite3.Connection | None = None
+        self._lock = Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Returns the connection to the database, creating the file and the tables on first use."""
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            self._connection.execute('CREATE TABLE IF NOT EXISTS directories (path TEXT PRIMARY KEY)')
+            self._connection.execute('CREATE TABLE IF NOT EXISTS airfoils ('
+                                     'path TEXT PRIMARY KEY, '
+                                     'directory TEXT NOT NULL, '
+                                     'name TEXT NOT NULL, '
+                                     'stem TEXT NOT NULL, '
+                                     'mtime INTEGER NOT NULL, '
+                                     'size INTEGER NOT NULL, '
+                                     'hash TEXT NOT NULL, '
+                                     'thickness REAL, '
+                                     'camber REAL, '
+                                     'nof_points INTEGER NOT NULL)')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS airfoils_directory ON airfoils (directory)')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS airfoils_name ON airfoils (name COLLATE NOCASE)')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS airfoils_thickness ON airfoils (thickness)')
+            self._connection.commit()
+        return self._connection
+
+    def directories(self) -> list[Path]:
+        """Returns the directories in the library."""
+        with self._lock:
+            rows = self._connect().execute('SELECT path FROM directories ORDER BY path').fetchall()
+        return [Path(path) for path, in rows]
+
+    def scan(self, directory: Path | str, progress: Callable[[int], None] = None) -> int:
+        """
+        Adds the directory to the library, or updates its index.
+        Only the files that are new or were modified since the last scan are read.
+
+        Every file belongs to a single directory of the library. A subdirectory of a directory in the library
+        is not added, its parent is scanned instead, and a parent of directories in the library takes their files over.
+        The files are read without holding the database, so the library can be searched during the scan.
+
+        Parameters:
+            directory (Path | str): The directory, searched recursively for files with one of ``suffixes``.
+            progress (Callable[[int], None]): Optional, called with the number of files checked so far,
+              after each file.
+        Returns:
+            int: The number of files read.
+        """
+        directory = Path(directory).absolute()
+        directories = self.directories()
+        owner = next((parent for parent in directories if directory.is_relative_to(parent)), None)
+        if owner is not None and owner != directory:
+            logging.info(f'{directory} is already in the library, as a part of {owner}.')
+            directory = owner
+        nested = [str(child) for child in directories if child != directory and child.is_relative_to(directory)]
+        owners = [str(directory)] + nested
+        with self._lock:
+            known = {path: (mtime, size, digest) for path, mtime, size, digest in self._connect().execute(
+                f'SELECT path, mtime, size, hash FROM airfoils WHERE directory IN ({', '.join('?' * len(owners))})',
+                owners)}
+        seen = set()
+        changed, touched = [], []
+        for entry in self._files(directory):
+            seen.add(entry.path)
+            if progress: progress(len(seen))
+            stat = entry.stat()
+            old = known.get(entry.path)
+            if old is not None and old[:2] == (stat.st_mtime_ns, stat.st_size): continue
+            with open(entry.path, 'rb') as f: contents = f.read()
+            digest = sha1(contents).hexdigest()
+            if old is not None and old[2] == digest:
+                touched.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                continue
+            changed.append((entry.path, str(directory), *self._describe(Path(entry.path), contents),
+                            stat.st_mtime_ns, stat.st_size, digest))
+        removed = [(path,) for path in known.keys() - seen]
+        with self._lock:
+            connection = self._connect()
+            connection.execute('INSERT OR IGNORE INTO directories VALUES (?)', (str(directory),))
+            # The nested directories are taken over
+            connection.executemany('UPDATE airfoils SET directory = ? WHERE directory = ?',
+                                   [(str(directory), child) for child in nested])
+            connection.executemany('DELETE FROM directories WHERE path = ?', [(child,) for child in nested])
+            connection.executemany('INSERT OR REPLACE INTO airfoils '
+                                   '(path, directory, name, stem, thickness, camber, nof_points, mtime, size, hash) '
+                                   'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', changed)
+            connection.executemany('UPDATE airfoils SET mtime = ?, size = ? WHERE path = ?', touched)
+            connection.executemany('DELETE FROM airfoils WHERE path = ?', removed)
+            connection.commit()
+        logging.info(f'Indexed {directory}: {len(changed)} files added or modified, {len(removed)} removed.')
+        return len(changed) + len(touched)
+
+    def rescan(self, progress: Callable[[int], None] = None) -> int:
+        """
+        Updates the index of all the directories in the library, returns the number of files read.
+        ``progress`` is optional, called with the number of files checked so far, after each file.
+        """
+        nof_read, nof_done, nof_checked = 0, 0, 0
+
+        def report(n: int):
+            nonlocal nof_checked
+            nof_checked = n
+            if progress: progress(nof_done + n)
+
+        for directory in self.directories():
+            nof_read += self.scan(directory, report)
+            nof_done, nof_checked = nof_done + nof_checked, 0
+        return nof_read
+
+    def remove(self, directory: Path | str) -> None:
+        """Removes the directory from the library."""
+        directory = str(Path(directory).absolute())
+        with self._lock:
+            connection = self._connect()
+            connection.execute('DELETE FROM airfoils WHERE directory = ?', (directory,))
+            connection.execute('DELETE FROM directories WHERE path = ?', (directory,))
+            connection.commit()
+
+    def search(self,
+               text: str = '',
+               thickness: tuple[float | None, float | None] = (None, None),
+               camber: tuple[float | None, float | None] = (None, None),
+               limit: int = 200) -> list[AirfoilEntry]:
+        """
+        Returns the airfoils matching all the given criteria, by name.
+
+        Parameters:
+            text (str): A part of the name of the airfoil or of its file, case-insensitive.
+            thickness (tuple[float | None, float | None]): The minimal and maximal thickness, ``None`` for no limit.
+            camber (tuple[float | None, float | None]): The minimal and maximal camber, ``None`` for no limit.
+            limit (int): The maximal number of airfoils returned.
+        """
+        conditions, params = ['nof_points > 0'], []
+        if text:
+            pattern = '%' + text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            conditions.append("(name LIKE ? ESCAPE '\\' OR stem LIKE ? ESCAPE '\\')")
+            params += [pattern, pattern]
+        for column, (low, high) in (('thickness', thickness), ('camber', camber)):
+            if low is not None:
+                conditions.append(f'{column} >= ?')
+                params.append(low)
+            if high is not None:
+                conditions.append(f'{column} <= ?')
+                params.append(high)
+        with self._lock:
+            rows = self._connect().execute(f'SELECT {self._columns} FROM airfoils WHERE {' AND '.join(conditions)} '
+                                           f'ORDER BY name COLLATE NOCASE LIMIT ?', params + [limit]).fetchall()
+        return [AirfoilEntry(name, Path(path), thickness, camber, nof_points, digest)
+                for name, path, thickness, camber, nof_points, digest in rows]
+
+    def close(self) -> None:
+        """Closes the connection to the database. It is reopened on the next use."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    @classmethod
+    def _files(cls, directory: Path) -> Iterator[os.DirEntry]:
+        """Yields the airfoil files in the directory and its subdirectories."""
+        try:
+            entries = list(os.scandir(directory))
+        except OSError as e:
+            logging.warning(f'Cannot read {directory}: {e}')
+            return
+        for entry in entries:
+            if entry.is_dir():
+                yield from cls._files(Path(entry.path))
+            elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in cls.suffixes:
+                yield entry
+
+    @staticmethod
+    def _describe(path: Path, contents: bytes) -> tuple[str, str, float | None, float | None, int]:
+        """Returns the name, the file name, the thickness, the camber and the number of points of the file.
+        A file that is not a valid airfoil has no points."""
+        text = contents.decode(errors='replace')
+        first_line = next((line.strip() for line in text.splitlines() if line.strip()), '')
+        name = first_line if first_line and not all(is_number(word) for word in first_line.replace(',', ' ').split()) \
+            else path.stem
+        try:
+            points = Airfoil.parse_points(text)
+        except ValueError:
+            return name, path.stem, None, None, 0
+        thickness, camber = thickness_and_camber(points)
+        return name, path.stem, thickness, camber, len(points)
+
+
+def thickness_and_camber(points: np.ndarray, nof_stations: int = 101) -> tuple[float, float]:
+    """
+    Returns the maximal thickness and camber of the airfoil, as fractions of the chord.
+
+    Parameters:
+        points (np.ndarray): The points of the airfoil, as a loop from the trailing edge over the upper surface.
+        nof_stations (int): The number of chordwise stations to compare the surfaces at.
+    """
+    le = int(np.argmin(points[:, 0]))
+    upper, lower = points[:le + 1], points[le:]
+    upper = upper[np.argsort(upper[:, 0], kind='stable')]
+    lower = lower[np.argsort(lower[:, 0], kind='stable')]
+    x_min, x_max = points[le, 0], points[:, 0].max()
+    stations = x_min + (x_max - x_min) * 0.5 * (1 - np.cos(np.linspace(0, np.pi, nof_stations)))
+    y_upper = np.interp(stations, upper[:, 0], upper[:, 1])
+    y_lower = np.interp(stations, lower[:, 0], lower[:, 1])
+    chord = (x_max - x_min) or 1.0
+    mean_line = (y_upper + y_lower) / 2
+    return (float(np.max(y_upper - y_lower) / chord),
+            float(mean_line[np.argmax(np.abs(mean_line))] / chord))
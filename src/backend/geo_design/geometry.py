@@ -7,13 +7,17 @@ the Free Software Foundation, either version 3 of the License, or
 (at your option) any later version.
 """
 
+import re
 from pathlib import Path
-from typing import TextIO
+from typing import Callable, TextIO, TypeVar
 
+from .airfoil import Airfoil
 from .surface import Surface
 from ..math_functions import distribute_units
 from ..vector3 import Vector3, AnyVector3
 
+T = TypeVar('T')
+
 
 class Geometry:
     """
@@ -25,6 +29,9 @@ class Geometry:
         ref_pos (Vector3): The reference position of the aircraft, ideally the position of the centre of mass.
         surfaces (Dict[str, Surface]): The ``Surface`` objects associated with the aircraft.
         wing (Surface|None): The wing of the aircraft. Returns 'None' if the aircraft has no defined wing.
+
+    The derived properties, e.g. ``main_surface``, are cached until a surface is added or replaced,
+    or any of the surfaces changes, see ``Surface.touch``.
     """
 
     def __init__(self,
@@ -43,41 +50,154 @@ class Geometry:
         self.mach = mach
         self.ref_pos = Vector3(*ref_pos)
         self.surfaces = {surf.name: surf for surf in surfaces} if surfaces else {}
+        self._version = 0
+        self._cache = {}
+        self._cache_version = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state['_cache'] = {}
+        state['_cache_version'] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        # Geometries pickled by older versions have no version counter.
+        self.__dict__.setdefault('_version', 0)
+        self.__dict__.setdefault('_cache', {})
+        self.__dict__.setdefault('_cache_version', None)
+
+    @property
+    def version(self) -> tuple[int, int]:
+        """Changes every time a surface is added or replaced, or any of the surfaces changes."""
+        # The surfaces are fixed between the changes of ``_version``, and their versions only increase.
+        return self._version, sum(surf.version for surf in self.surfaces.values())
+
+    def touch(self) -> None:
+        """Marks the geometry as changed, so the cached derived properties are computed again."""
+        self._version += 1
+
+    def cached(self, key: str, func: Callable[[], T]) -> T:
+        """Returns ``func()``, computed once and stored under the key until the geometry changes."""
+        version = self.version
+        if version != self._cache_version:
+            self._cache.clear()
+            self._cache_version = version
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = func()
+            return value
 
     def add_surface(self, surface: Surface) -> None:
         """Add a new surface. The name must be unique."""
         if surface.name in self.surfaces.keys(): raise AttributeError("A surface with name {} already exists.".format(surface.name))
         self.surfaces[surface.name] = surface
+        self.touch()
 
     def replace_surface(self, surface: Surface) -> None:
         """Replace an existing surface with the new surface."""
         if surface.name not in self.surfaces.keys(): raise AttributeError("No surface named {}.".format(surface.name))
         self.surfaces[surface.name] = surface
+        self.touch()
+
+    def string(self, airfoil_files: dict[Airfoil, str] = None) -> str:
+        """
+        Returns the current geometry as an .avl type string.
 
-    def string(self) -> str:
-        """Returns the current geometry as an .avl type string."""
-        _r = (f"{self.name}\n"
+        Parameters:
+            airfoil_files (dict[Airfoil, str]): The .dat files to reference the airfoils with,
+                see ``write_airfoil_files``. By default, the points of the airfoils are written inline.
+        """
+        return ''.join(self.fragments(airfoil_files))
+
+    def fragments(self, airfoil_files: dict[Airfoil, str] = None) -> list[str]:
+        """Returns the parts of ``string()``. The block of every surface is cached until the surface changes."""
+        _r = [f"{self.name}\n"
               f"0.0 | Mach\n"
               f"0 0 0 | iYsym iZsym Zsym\n"
               f"{self.surface_area} {self.chord_length} {self.span_length} | Sref Cref Bref\n"
               f"{self.ref_pos.avl_string} | Xref Yref Zref\n"
-              f"0.0 | CDp\n")
+              f"0.0 | CDp\n"]
 
         for surf in self.surfaces.values():
-            _r += "\n#----------------\n\n"
-            _r += surf.string()
+            _r.append("\n#----------------\n\n")
+            _r.append(surf.string(airfoil_files))
 
         return _r
 
+    def write(self, fp: TextIO, airfoil_files: dict[Airfoil, str] = None) -> None:
+        """Writes the current geometry to an open text file using .avl format, without joining it into one string."""
+        fp.writelines(self.fragments(airfoil_files))
+
+    def write_airfoil_files(self, directory: Path, absolute: bool = True) -> dict[Airfoil, str]:
+        """
+        Writes every point-defined airfoil of the geometry once, as a .dat file in the directory.
+        Airfoils used by many sections, or different instances with the same points, share a single file.
+        An existing file is only reused if it has the same points, otherwise the airfoil gets a new name.
+
+        Parameters:
+            directory (Path): The directory to write the files to.
+            absolute (bool): Whether to reference the files by absolute paths, or just by their names,
+                i.e. relative to the .avl file when saved in the same directory.
+        Returns:
+            dict[Airfoil, str]: The path to reference each airfoil with, see ``Airfoil.string``.
+        """
+        directory = Path(directory)
+        airfoil_files: dict[Airfoil, str] = {}
+        by_contents: dict[str, str] = {}
+        used_names: set[str] = set()
+        for surf in self.surfaces.values():
+            for airfoil in surf.airfoils():
+                if not airfoil.is_point_defined or airfoil in airfoil_files: continue
+                contents = airfoil.dat_string()
+                if contents not in by_contents:
+                    stem = re.sub(r'[^\w.-]+', '_', airfoil.name).strip('_.') or 'airfoil'
+                    name, i = f'{stem}.dat', 1
+                    while name.lower() in used_names or self._file_differs(directory / name, contents):
+                        i += 1
+                        name = f'{stem}_{i}.dat'
+                    used_names.add(name.lower())
+                    if not (directory / name).exists():
+                        with open(directory / name, 'w') as f: f.write(contents)
+                    by_contents[contents] = str((directory / name).absolute()) if absolute else name
+                airfoil_files[airfoil] = by_contents[contents]
+        return airfoil_files
+
+    @staticmethod
+    def _file_differs(path: Path, contents: str) -> bool:
+        """Returns ``True`` if the file exists with other contents, so it must not be overwritten."""
+        try:
+            with open(path) as f: return f.read() != contents
+        except FileNotFoundError:
+            return False
+
+    def write_avl_file(self, path: Path, absolute: bool = False) -> None:
+        """
+        Writes the current geometry to a file using .avl format,
+        with the point-defined airfoils written once each, as .dat files next to it, see ``write_airfoil_files``.
+
+        By default, the files are referenced by their names only, as AVL reads the AFILE paths into a fixed-length line,
+        so AVL must be run from the directory of the file, see ``AVLInterface.execute``.
+        """
+        path = Path(path)
+        airfoil_files = self.write_airfoil_files(path.parent, absolute)
+        with open(path, 'w') as file:
+            self.write(file, airfoil_files)
+
     def save_to_avl(self, path: Path) -> TextIO:
-        """Saves the current geometry to a file using .avl format."""
-        contents = self.string()
+        """Saves the current geometry to a file using .avl format. The airfoils are saved next to it, as .dat files."""
+        path = Path(path)
+        airfoil_files = self.write_airfoil_files(path.parent, absolute=False)
         file = open(path, 'w')
-        file.write(contents)
+        self.write(file, airfoil_files)
         return file
 
     def get_controls(self):
         """Returns the control surfaces of the aircraft in the order in which they will appear in .avl file."""
+        return list(self.cached('controls', self._get_controls))
+
+    def _get_controls(self):
         from .section import Control
         controls: list[Control] = []
         for surf in self.surfaces.values():
@@ -99,6 +219,9 @@ class Geometry:
     @property
     def main_surface(self) -> Surface:
         """Returns the main surface of the aircraft."""
+        return self.cached('main_surface', self._main_surface)
+
+    def _main_surface(self) -> Surface:
         if 'Wing' in self.surfaces.keys():
             return self.surfaces['Wing']
         surfs = [(s, s.area()) for s in self.surfaces.values()]
@@ -108,14 +231,14 @@ class Geometry:
     @property
     def span_length(self):
         if len(self.surfaces) == 0: return 0
-        return self.main_surface.span
+        return self.cached('span_length', lambda: self.main_surface.span)
 
     @property
     def chord_length(self):
         if len(self.surfaces) == 0: return 0
-        return self.main_surface.mac()
+        return self.cached('chord_length', self.main_surface.mac)
 
     @property
     def surface_area(self):
         if len(self.surfaces) == 0: return 0
-        return self.main_surface.area()
+        return self.cached('surface_area', self.main_surface.area)
@@ -7,10 +7,11 @@ the Free Software Foundation, either version 3 of the License, or
 (at your option) any later version.
 """
 
+import logging
 from pathlib import Path
-from typing import Any
+from typing import Iterable, Iterator, NamedTuple
 
-from .airfoil import Airfoil
+from .airfoil import Airfoil, is_number
 from .geometry import Geometry
 from .section import Section, Control
 from .surface import Surface
@@ -57,213 +58,240 @@ class GeometryGenerator:
         return FromAvl.load(path)
 
 
-class FromAvl:
-    """A subclass of ``GeometryGenerator``, for handling AVL-style files."""
+class AvlLine(NamedTuple):
+    """A meaningful line of an .avl file."""
+    number: int  # The number of the line in the file, counted from 1.
+    text: str  # The line without the comment and the surrounding whitespace.
+    words: list[str]
+    keyword: str | None  # The full keyword, if the line starts with one.
+    comment: str  # The text after '#', if any.
 
-    @classmethod
-    def load(cls, path: Path | str) -> Geometry:
-        """Creates a Geometry object based on .avl file."""
-        path = Path(path)
-        with open(path) as f: raw_lines = f.readlines()
-        lines = cls._format_lines(raw_lines)
-        return cls._handle_top_level(lines, path)
 
-    ### ABANDON ALL HOPE YE WHO ENTER HERE
+class AvlReader:
+    """
+    Reads the meaningful lines of an .avl file one at a time, in a single pass,
+    recognising the keywords, and keeping track of the line numbers for the error messages.
+    """
+    # AVL only reads the first four characters of a keyword.
+    keywords = {kw[:4]: kw for kw in (
+        'SURFACE', 'BODY', 'COMPONENT', 'INDEX', 'YDUPLICATE', 'SCALE', 'TRANSLATE', 'ANGLE', 'NOWAKE', 'NOALBE',
+        'NOLOAD', 'CDCL', 'SECTION', 'NACA', 'AIRFOIL', 'AFILE', 'CONTROL', 'DESIGN', 'CLAF', 'BFILE'
+    )}
 
-    ### The following part of the code is basically a giant string parser for turning .avl files into Geometry objects.
-    ### It is recommended to understand .avl files format: https://web.mit.edu/drela/Public/web/avl/
-    ### Basically, the data is sorted into 'blocks', each block describing a structure.
-    ### Each of those blocks contains some general info about the structure, and then the blocks of its substructures.
-    ### So the top-level block, describing the Aircraft, contains some data about the plane, like wingspan and wing area etc.,
-    ### and then block representing the particular surfaces.
-    ### Each block representing a surface contains some data about the surface, and then blocks describing the sections
-    ### of the structure and so on.
+    def __init__(self, lines: Iterable[str], path: Path) -> None:
+        """
+        Parameters:
+            lines (Iterable[str]): The raw lines, e.g. an open file.
+            path (Path): Path to the file, for the error messages and the relative paths.
+        """
+        self.path = path
+        self._lines = self._tokenize(lines)
+        self._next = next(self._lines, None)
+        self._last_number = 0
 
-    ### Parsing this properly is probably above my qualifications, and definitely above my non-existent pay.
-    ### As this functionality is not really that useful, the code is just good enough to work for the majority of cases,
-    ### if you are thinking of improving/fixing/rewriting this, then stop.
+    @classmethod
+    def _tokenize(cls, lines: Iterable[str]) -> Iterator[AvlLine]:
+        """Yields the lines that are not empty after removing the comments."""
+        keywords = cls.keywords
+        for number, text in enumerate(lines, 1):
+            comment = ''
+            if '#' in text:
+                text, _, comment = text.partition('#')
+                comment = comment.strip()
+            if '!' in text: text = text.split('!', 1)[0]
+            if '|' in text: text = text.split('|', 1)[0]
+            words = text.split()
+            if not words: continue
+            first = words[0]
+            keyword = keywords.get(first[:4].upper()) if first[0].isalpha() else None
+            yield AvlLine(number, text.strip(), words, keyword, comment)
 
-    ### If you didn't - good luck.
+    def peek(self) -> AvlLine | None:
+        """Returns the next line without reading it, ``None`` at the end of the file."""
+        return self._next
 
-    @staticmethod
-    def _format_lines(raw_lines: list[str]) -> list[str]:
-        """Returns a list of lines after formatting."""
-        lines = []
-        for line in raw_lines:
-            if '#' in line:
-                line = line.split('#')[0]
-            elif '!' in line:
-                line = line.split('!')[0]
-            elif '|' in line:
-                line = line.split('|')[0]
-            line = line.strip()
-            if not line: continue
-            lines.append(line)
-        return lines
+    def next_line(self) -> AvlLine:
+        """Reads the next line, raises an error at the end of the file."""
+        line = self._next
+        if line is None: raise self.error('Unexpected end of the file.', self._last_number)
+        self._last_number = line.number
+        self._next = next(self._lines, None)
+        return line
 
-    @staticmethod
-    def _split_into_blocks(lines: list[str], keywords: tuple[str, ...]) -> list[tuple[str, list[str]]]:
-        """Splits lines into blocks, each block starting with one of the given keywords."""
-        current_block = None
-        blocks = []
-
-        def keyword_in_line(l) -> str | None:
-            for kw in keywords:
-                if kw[:4] in l: return kw
-            return None
-
-        for line in lines:
-            keyword = keyword_in_line(line)
-            if keyword is not None:
-                if current_block is not None: blocks.append(current_block)
-                current_block = (keyword, [line])
-            else:
-                if current_block is None: continue
-                current_block[1].append(line)
-        if current_block is not None: blocks.append(current_block)
-        return blocks
+    def data_lines(self) -> Iterator[AvlLine]:
+        """Reads the lines until the next keyword."""
+        line = self._next
+        while line is not None and line.keyword is None:
+            self._last_number = line.number
+            yield line
+            line = self._next = next(self._lines, None)
 
-    @classmethod
-    def _handle_top_level(cls, lines: list[str], path: Path) -> Geometry:
-        """Returns a Geometry object based on .avl file."""
-        # Reading
-        name = lines.pop(0)
-        mach = float(lines.pop(0).split()[0])
-        _ = tuple(map(float, lines.pop(0).split()[:3]))  # symmetries
-        _ = tuple(map(float, lines.pop(0).split()[:3]))  # reference values
-        ref_pos = tuple(map(float, lines.pop(0).split()[:3]))
-        next_line = lines.pop(0)
+    def floats(self, line: AvlLine, count: int, words: list[str] = None) -> list[float]:
+        """Returns the first ``count`` numbers of the line, raises an error if there are not enough of them."""
+        words = line.words if words is None else words
         try:
-            CDp = float(next_line.split()[0])
+            if len(words) < count: raise ValueError
+            return [float(word) for word in words[:count]]
         except ValueError:
-            CDp = 0
-            lines.insert(0, next_line)
-        geometry_data = {
-            'name': name,
-            'mach': mach,
-            'ref_pos': ref_pos,
-            'surfaces': []
-        }
+            raise self.error(f'Expected {count} number{"s" if count > 1 else ""}, got "{line.text}".', line.number)
+
+    def error(self, message: str, number: int) -> ValueError:
+        """Returns an error pointing at the line, to be raised."""
+        return ValueError(f'{self.path.name}, line {number}: {message}')
+
 
-        blocks = cls._split_into_blocks(lines, ('SURFACE', 'BODY'))
-        for keyword, lines in blocks:
-            if keyword == 'SURFACE':
-                geometry_data['surfaces'].append(
-                    cls._handle_surface_level(lines[1:], path)
-                )
-            if keyword == 'BODY': cls._error('GAVL does not support BODY. The block is being skipped.')
+class FromAvl:
+    """A subclass of ``GeometryGenerator``, for handling AVL-style files."""
 
-        return Geometry(**geometry_data)
+    # The data of an .avl file is sorted into blocks, each starting with a keyword: the header describing the aircraft,
+    # then the SURFACE blocks, each containing its SECTION blocks, each containing its airfoil and CONTROL blocks.
+    # The file is read in a single pass, each method reading the block it is called for, see
+    # https://web.mit.edu/drela/Public/web/avl/ for the format.
+    section_keywords = ('NACA', 'AIRFOIL', 'AFILE', 'CONTROL', 'DESIGN', 'CLAF', 'CDCL')
 
     @classmethod
-    def _handle_surface_level(cls, block: list[str], path: Path) -> Surface:
-        """Returns a Surface based on .avl description lines."""
-        surface_data: dict[str, Any] = {
-            'name': None,
-            'sections': [],
-            'y_duplicate': False,
-            'origin_position': (0, 0, 0),
-            'airfoil': None,
-        }
-        name = block.pop(0)
-        surface_data['name'] = name
-        _ = block.pop(0)  # Nchord etc
-
-        keywords = (
-            'COMPONENT',
-            'INDEX',
-            'YDUPLICATE',
-            'SCALE',
-            'TRANSLATE',
-            'ANGLE',
-            'NOWAKE',
-            'NOALBE',
-            'NOLOAD',
-            'CDCL',
-            'SECTION'
-        )
+    def load(cls, path: Path | str) -> Geometry:
+        """Creates a Geometry object based on .avl file."""
+        path = Path(path)
+        with open(path) as f:
+            return cls._read_geometry(AvlReader(f, path))
 
-        blocks = cls._split_into_blocks(block, keywords)
+    @classmethod
+    def _read_geometry(cls, reader: AvlReader) -> Geometry:
+        """Returns a Geometry object based on .avl file."""
+        name = reader.next_line().text
+        mach = reader.floats(reader.next_line(), 1)[0]
+        _ = reader.next_line()  # symmetries
+        _ = reader.next_line()  # reference values
+        ref_pos = tuple(reader.floats(reader.next_line(), 3))
+        line = reader.peek()
+        if line is not None and line.keyword is None and is_number(line.words[0]):
+            _ = reader.next_line()  # CDp
+
+        surfaces = []
+        airfoil_files: dict[tuple[Path | str, tuple[float, ...]], Airfoil] = {}
+        while (line := reader.peek()) is not None:
+            reader.next_line()
+            match line.keyword:
+                case 'SURFACE':
+                    surfaces.append(cls._read_surface(reader, line, airfoil_files))
+                case 'BODY':
+                    cls._error('GAVL does not support BODY. The block is being skipped.', line)
+                    cls._skip_body(reader)
+                case None:
+                    pass
+                case _:
+                    cls._skip(reader, line)
+
+        return Geometry(name=name, mach=mach, ref_pos=ref_pos, surfaces=surfaces)
+
+    @classmethod
+    def _read_surface(cls, reader: AvlReader, surface_line: AvlLine, airfoil_files: dict) -> Surface:
+        """Returns a Surface based on the SURFACE block starting after the given line."""
+        name = reader.next_line().text
+        _ = reader.next_line()  # Nchord etc
+        sections = []
+        origin_position = Vector3(0, 0, 0)
+        y_duplicate = False
         scale = (1, 1, 1)
         angle = 0
-        for keyword, lines in blocks:
-            match keyword:
-                case kw if kw in ('COMPONENT', 'INDEX'):
-                    cls._error(f"{kw}")
+        while (line := reader.peek()) is not None and line.keyword not in ('SURFACE', 'BODY'):
+            reader.next_line()
+            match line.keyword:
                 case 'YDUPLICATE':
-                    if float(lines[1].split()[0]) == 0.0:
-                        surface_data['y_duplicate'] = True
+                    if reader.floats(reader.next_line(), 1)[0] == 0.0:
+                        y_duplicate = True
                     else:
-                        cls._error(f"YDUPLICATE cannot be non-zero!")
+                        cls._error('YDUPLICATE cannot be non-zero!', line)
                 case 'SCALE':
-                    scale = tuple(map(float, lines[1].split()[:3]))
+                    scale = tuple(reader.floats(reader.next_line(), 3))
                 case 'TRANSLATE':
-                    vals = map(float, lines[1].split()[:3])
-                    surface_data['origin_position'] = Vector3(*vals)
+                    origin_position = Vector3(*reader.floats(reader.next_line(), 3))
                 case 'ANGLE':
-                    angle = float(lines[1].split()[0])
-                case kw if kw in ('NOWA', 'NOAL', 'NOLO'):
-                    cls._error(f"{kw}")
-                case 'CDCL':
-                    cls._error("CDCL")
+                    angle = reader.floats(reader.next_line(), 1)[0]
                 case 'SECTION':
-                    surface_data['sections'].append(
-                        cls._handle_section_level(lines[1:], path, scale, angle)
-                    )
+                    sections.append(cls._read_section(reader, scale, angle, airfoil_files))
+                case None:
+                    cls._error(f'Unexpected line "{line.text}".', line)
+                case _:
+                    cls._skip(reader, line)
 
-        surface_data['airfoil'] = surface_data['sections'][0].airfoil
-        return Surface(**surface_data)
+        if len(sections) < 2:
+            raise reader.error(f'The surface {name} must have at least two sections.', surface_line.number)
+        surface = Surface(name=name, sections=sections, origin_position=origin_position, airfoil=sections[0].airfoil)
+        surface._lock_y_duplicate = y_duplicate  # Mirror the surface only as stated in the file
+        return surface
 
     @classmethod
-    def _handle_section_level(cls, block: list[str], path: Path, scale=(1, 1, 1), angle=0) -> Section:
-        """Returns a Section based on .avl description lines."""
-        vals = list(map(float, block.pop(0).split()))
-        section_data: dict[str, Any] = {
-            'leading_edge_position': Vector3(*vals[:3]).scale(scale),
-            'chord': vals[3],
-            'inclination': vals[4] + angle,
-            'airfoil': None,
-            'control': None
-        }
-
-        blocks = cls._split_into_blocks(block, ('NACA', 'AIRFOIL', 'AFILE', 'CONTROL', 'DESIGN'))
-        for keyword, lines in blocks:
-            match keyword:
+    def _read_section(cls, reader: AvlReader, scale=(1, 1, 1), angle=0, airfoil_files: dict = None) -> Section:
+        """Returns a Section based on the SECTION block starting at the next line.
+        ``airfoil_files`` holds the airfoils referenced with AFILE, shared by the whole geometry."""
+        if airfoil_files is None: airfoil_files = {}
+        vals = reader.floats(reader.next_line(), 5)
+        airfoil = None
+        control = None
+        while (line := reader.peek()) is not None and line.keyword in cls.section_keywords:
+            reader.next_line()
+            match line.keyword:
                 case 'NACA':
-                    section_data['airfoil'] = Airfoil.from_naca(naca=' '.join(lines[1].split()[:2]))
+                    data = reader.next_line()
+                    try:
+                        airfoil = Airfoil.from_naca(data.words[0], active_range=cls._active_range(line))
+                    except ValueError as e:
+                        raise reader.error(str(e), data.number)
                 case 'AIRFOIL':
-                    if '#' in lines[0]:
-                        name = lines[0].split('#')[1]
-                    else:
-                        name = 'UnknownAirfoil'
-                    lines = lines[1:]
-                    points_str = [line.split() for line in lines]
-                    points_float = [(float(x), float(y)) for x, y in points_str]
-                    section_data['airfoil'] = Airfoil.from_points(name=name, points=points_float)
+                    points = []
+                    for data in reader.data_lines():
+                        try:
+                            points.append((float(data.words[0]), float(data.words[1])))
+                        except (ValueError, IndexError):
+                            reader.floats(data, 2)  # Raises the error with the line number.
+                    airfoil = Airfoil.from_points(points, name=line.comment or 'UnknownAirfoil',
+                                                  active_range=cls._active_range(line))
                 case 'AFILE':
-                    _path = lines[1]
-                    if '"' in _path:
-                        start = _path.find('"') + 1
-                        end = _path.rfind('"')
-                        _path = _path[start:end]
-                    else:
-                        _path = _path.split()[0]
-                    afile_path = Path(_path)
-                    if not afile_path.exists():
-                        afile_path = path.parent / afile_path
-                    section_data['airfoil'] = Airfoil.from_file(afile_path)
+                    airfoil = cls._read_afile(reader, line, airfoil_files)
                 case 'CONTROL':
-                    section_data['control'] = cls._handle_control_level(lines[1:])
-                case 'DESIGN':
-                    cls._error("DESIGN")
-        return Section(**section_data)
+                    control = cls._read_control(reader)
+                case _:
+                    cls._skip(reader, line)
+        return Section(leading_edge_position=Vector3(*vals[:3]).scale(scale),
+                       chord=vals[3],
+                       inclination=vals[4] + angle,
+                       airfoil=airfoil,
+                       control=control)
+
+    @classmethod
+    def _read_afile(cls, reader: AvlReader, afile_line: AvlLine, airfoil_files: dict) -> Airfoil:
+        """Returns the airfoil referenced by the AFILE block. The file itself is read when the points are needed."""
+        data = reader.next_line()
+        if '"' in data.text:
+            _path = data.text[data.text.find('"') + 1:data.text.rfind('"')]
+        else:
+            _path = data.words[0]
+        # Many sections usually share a single file, so share a single ``Airfoil`` as well,
+        # found by the path as written first, to resolve it only once.
+        active_range = cls._active_range(afile_line)
+        airfoil = airfoil_files.get((_path, active_range))
+        if airfoil is not None: return airfoil
+        afile_path = Path(_path)
+        if not afile_path.is_absolute() and (reader.path.parent / afile_path).exists():
+            afile_path = reader.path.parent / afile_path
+        key = (afile_path.absolute(), active_range)
+        if key not in airfoil_files:
+            if not afile_path.is_file():
+                raise FileNotFoundError(f'{reader.path.name}, line {data.number}: Cannot find {_path}.')
+            airfoil_files[key] = Airfoil.from_file(afile_path, active_range=active_range, lazy=True)
+        airfoil = airfoil_files[_path, active_range] = airfoil_files[key]
+        return airfoil
 
     @staticmethod
-    def _handle_control_level(block: list[str]) -> Control:
-        """Returns a Control based on .avl description lines."""
-        vals = block.pop(0).split()
-        name = vals.pop(0)
-        vals = list(map(float, vals))
+    def _read_control(reader: AvlReader) -> Control:
+        """Returns a Control based on the CONTROL block starting at the next line."""
+        data = reader.next_line()
+        name = data.words[0]
+        vals = reader.floats(data, len(data.words) - 1, data.words[1:])
+        if len(vals) < 2: raise reader.error(f'Expected the gain and the hinge of {name}.', data.number)
+        if not -1 < vals[1] < 1: raise reader.error(f'The hinge of {name} must be between -1 and 1.', data.number)
         control_data = {
             'instance_name': name,
             'gain': vals[0],
@@ -274,6 +302,28 @@ class FromAvl:
         return Control(**control_data)
 
     @staticmethod
-    def _error(message: str) -> None:
+    def _active_range(line: AvlLine) -> tuple[float, ...]:
+        """Returns the active range given after an airfoil keyword, (0.0, 1.0) if none."""
+        try:
+            return tuple(map(float, line.words[1:3])) or (0.0, 1.0)
+        except ValueError:
+            return 0.0, 1.0
+
+    @classmethod
+    def _skip(cls, reader: AvlReader, line: AvlLine) -> None:
+        """Skips an unsupported keyword and its data."""
+        cls._error(line.keyword, line)
+        for _ in reader.data_lines(): pass
+
+    @staticmethod
+    def _skip_body(reader: AvlReader) -> None:
+        """Skips a BODY block, up to the next SURFACE or BODY."""
+        _ = reader.next_line()  # name
+        while (line := reader.peek()) is not None and line.keyword not in ('SURFACE', 'BODY'):
+            reader.next_line()
+            if line.keyword == 'BFILE': reader.next_line()  # The path could start like a keyword.
+
+    @staticmethod
+    def _error(message: str, line: AvlLine) -> None:
         """Handles a Syntax Error in the .avl file."""
-        print(f'Keyword ignored: {message}')  # Temporary
+        logging.warning(f'Line {line.number}, keyword ignored: {message}')
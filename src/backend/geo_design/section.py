@@ -26,6 +26,7 @@ class Section:
         airfoil (list[tuple[float, float]]): The airfoil of the section.
         control (Control): The control surface of the section.
     """
+    __slots__ = ('leading_edge_position', 'chord', 'inclination', 'airfoil', 'control', 'spanwise_points')
 
     def __init__(self,
                  leading_edge_position: AnyVector3,
@@ -40,20 +41,29 @@ class Section:
             inclination (float): The total inclination of the section, in degrees.
             airfoil (Airfoil): The airfoil of the section.
         """
-        self.leading_edge_position = Vector3(*leading_edge_position)
+        self.leading_edge_position = (leading_edge_position.copy() if isinstance(leading_edge_position, Vector3)
+                                      else Vector3(*leading_edge_position))
         self.chord = chord
         self.inclination = inclination
         self.airfoil = airfoil or Airfoil.empty()
         self.control = control
         self.spanwise_points = 1
 
+    def __getstate__(self) -> dict:
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    def __setstate__(self, state: dict) -> None:
+        # Also reads the ``__dict__`` of sections pickled before ``__slots__`` were used.
+        self.spanwise_points = 1
+        for key, value in state.items(): setattr(self, key, value)
+
     def __repr__(self) -> str:
         return f"Section at: {self.leading_edge_position.tuple()} x {self.chord}, control: {self.control.__repr__()}"
 
     def mirror(self) -> 'Section':
         """Returns a copy of self, mirrored about Y-axis."""
-        lep = self.leading_edge_position.scale((1, -1, 1))
-        sec = Section(lep, self.chord, self.inclination, self.airfoil)
+        lep = self.leading_edge_position
+        sec = Section(Vector3._new(lep.x, -lep.y, lep.z), self.chord, self.inclination, self.airfoil)
         sec.control = self.control.copy() if self.control is not None else None
         return sec
 
@@ -88,20 +98,30 @@ class Section:
         """Returns the z position of the section."""
         return self.leading_edge_position.z
 
-    def string(self) -> str:
+    def string(self, airfoil_files: dict[Airfoil, str] = None) -> str:
         """Returns the current geometry as an .avl type string."""
-        _r = (f"\n"
+        return ''.join(self.fragments(airfoil_files))
+
+    def fragments(self, airfoil_files: dict[Airfoil, str] = None) -> list[str]:
+        """
+        Returns the parts of ``string()``, to be joined once with the rest of the file.
+
+        Parameters:
+            airfoil_files (dict[Airfoil, str]): The .dat files to reference the airfoils with, see ``Airfoil.string``.
+        """
+        _r = [f"\n"
               f"SECTION\n"
-              f"{self.leading_edge_position.avl_string} {self.chord} {self.inclination} {self.spanwise_points} {1.0}\n")
-        _r += self.airfoil.string()
+              f"{self.leading_edge_position.avl_string} {self.chord} {self.inclination} {self.spanwise_points} {1.0}\n",
+              self.airfoil.string(airfoil_files.get(self.airfoil) if airfoil_files else None)]
         if self.has_control:
-            _r += self.control.string()
+            _r.append(self.control.string())
         return _r
 
 
 class Control:
     """Class representing a control surface attached to a section."""
     class_name: str
+    __slots__ = ('x_hinge', 'SgnDup', 'gain', 'colour', 'instance_name')
 
     def __init__(self, x_hinge: float, SgnDup: str = '',
                  gain: float = 1, colour: str = 'green', instance_name: str = None) -> None:
@@ -122,12 +142,19 @@ class Control:
         self.colour = colour
         self.instance_name = instance_name
 
+    def __getstate__(self) -> dict:
+        return {key: getattr(self, key) for key in Control.__slots__}
+
+    def __setstate__(self, state: dict) -> None:
+        # Also reads the ``__dict__`` of controls pickled before ``__slots__`` were used.
+        for key, value in state.items(): setattr(self, key, value)
+
     def __repr__(self) -> str:
         return f"{self.name}: {super().__repr__()}"
 
     def copy(self: T) -> T:
         """Returns a copy of this control surface."""
-        return self.__class__(**self.__dict__)
+        return self.__class__(self.x_hinge, self.SgnDup, self.gain, self.colour, self.instance_name)
 
     def string(self) -> str:
         """Returns the current geometry as an .avl type string."""
@@ -159,6 +186,7 @@ class Control:
 
 class PreDefControl(Control):
     """An interface for pre-defined types of control surfaces."""
+    __slots__ = ()
 
     def __init__(self, x_hinge: float, SgnDup: str,
                  gain: float = 1, colour: str = 'green') -> None:
@@ -171,6 +199,7 @@ class PreDefControl(Control):
 
 class Flaps(PreDefControl):
     class_name = 'flaps'
+    __slots__ = ()
 
     def __init__(self, x_hinge: float):
         """
@@ -183,6 +212,7 @@ class Flaps(PreDefControl):
 
 class Ailerons(PreDefControl):
     class_name = 'ailerons'
+    __slots__ = ()
 
     def __init__(self, x_hinge: float):
         """
@@ -195,6 +225,7 @@ class Ailerons(PreDefControl):
 
 class Elevators(PreDefControl):
     class_name = 'elevators'
+    __slots__ = ()
 
     def __init__(self, x_hinge: float):
         """
@@ -207,6 +238,7 @@ class Elevators(PreDefControl):
 
 class Rudder(PreDefControl):
     class_name = 'rudder'
+    __slots__ = ()
 
     def __init__(self, x_hinge: float):
         """
@@ -0,0 +1,138 @@
+"""
+Copyright (c) 2025 Wojciech Kwiatkowski
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+"""
+
+import numpy as np
+
+from .airfoil import Airfoil
+from .section import Section, Control
+from ..vector3 import Vector3, Vec3Array
+
+
+class SectionArrays:
+    """
+    An array-backed representation of the sections of a surface, used to compute the surface metrics
+    as vectorized operations instead of looping over ``Section`` objects.
+
+    Attributes:
+        leading_edges (np.ndarray): The leading-edge positions, of shape (number of sections, 3).
+        chords (np.ndarray): The chords of the sections.
+        inclinations (np.ndarray): The inclinations of the sections, in degrees.
+        control_indices (np.ndarray): The index in ``controls`` of the control of each section, -1 if it has none.
+        controls (list[Control]): The distinct control surfaces, in the order of their first section.
+        airfoils (list[Airfoil]): The airfoil of each section.
+    """
+
+    def __init__(self,
+                 leading_edges: np.ndarray,
+                 chords: np.ndarray,
+                 inclinations: np.ndarray,
+                 control_indices: np.ndarray = None,
+                 controls: list[Control] = None,
+                 airfoils: list[Airfoil] = None):
+        """
+        Parameters:
+            leading_edges (np.ndarray): The leading-edge positions, of shape (number of sections, 3).
+            chords (np.ndarray): The chords of the sections.
+            inclinations (np.ndarray): The inclinations of the sections, in degrees.
+            control_indices (np.ndarray): The index in ``controls`` of the control of each section, -1 if it has none.
+            controls (list[Control]): The distinct control surfaces.
+            airfoils (list[Airfoil]): The airfoil of each section. Defaults to empty airfoils.
+        """
+        self.leading_edges = np.asarray(leading_edges, dtype=np.float64).reshape(-1, 3)
+        n = len(self.leading_edges)
+        self.chords = np.asarray(chords, dtype=np.float64)
+        self.inclinations = np.asarray(inclinations, dtype=np.float64)
+        self.control_indices = (np.full(n, -1, dtype=np.intp) if control_indices is None
+                                else np.asarray(control_indices, dtype=np.intp))
+        self.controls = controls or []
+        self.airfoils = airfoils if airfoils is not None else [Airfoil.empty() for _ in range(n)]
+
+    @classmethod
+    def from_sections(cls, sections: list[Section]) -> 'SectionArrays':
+        """Collects the data of the sections into arrays, in a single pass."""
+        n = len(sections)
+        leading_edges = Vec3Array.from_vectors([section.leading_edge_position for section in sections]).data
+        chords = np.fromiter([section.chord for section in sections], np.float64, n)
+        inclinations = np.fromiter([section.inclination for section in sections], np.float64, n)
+        control_indices = np.full(n, -1, dtype=np.intp)
+        controls: list[Control] = []
+        control_ids: dict[int, int] = {}
+        for i, section in enumerate(sections):
+            if section.control is None: continue
+            index = control_ids.get(id(section.control))
+            if index is None:
+                index = control_ids[id(section.control)] = len(controls)
+                controls.append(section.control)
+            control_indices[i] = index
+        return cls(leading_edges, chords, inclinations, control_indices, controls,
+                   [section.airfoil for section in sections])
+
+    def __len__(self) -> int:
+        return len(self.chords)
+
+    def section(self, index: int) -> Section:
+        """Returns a ``Section`` of the given row. The control and the airfoil are shared, not copied."""
+        control_index = self.control_indices[index]
+        return Section(Vector3._new(*self.leading_edges[index].tolist()),
+                       float(self.chords[index]),
+                       float(self.inclinations[index]),
+                       self.airfoils[index],
+                       self.controls[control_index] if control_index >= 0 else None)
+
+    def sections(self) -> list[Section]:
+        """Returns a ``Section`` of every row."""
+        return [self.section(i) for i in range(len(self))]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.leading_edges[:, 1]
+
+    @property
+    def z(self) -> np.ndarray:
+        return self.leading_edges[:, 2]
+
+    def spanwise(self) -> np.ndarray:
+        """Returns the spanwise position of every section, i.e. its distance from the first section in YZ plane."""
+        return np.sqrt((self.y - self.y[0]) ** 2 + (self.z - self.z[0]) ** 2)
+
+    def segment_lengths_yz(self) -> np.ndarray:
+        """Returns the distance in YZ plane between every pair of neighbouring sections."""
+        return np.sqrt(np.diff(self.y) ** 2 + np.diff(self.z) ** 2)
+
+    def area(self) -> float:
+        """Returns the area of the panels between the sections, not mirrored."""
+        # Each panel has two edges along X, so the two triangles of ``Surface.area``
+        # reduce to 1/2 * (|prev.chord| + |next.chord|) * YZ length of the panel.
+        abs_chords = np.abs(self.chords)
+        return float(0.5 * np.sum((abs_chords[:-1] + abs_chords[1:]) * self.segment_lengths_yz()))
+
+    def length_yz(self) -> float:
+        """Returns the total length in YZ plane."""
+        return float(np.sum(self.segment_lengths_yz()))
+
+    def length_abs(self) -> float:
+        """Returns the total length of the leading edge."""
+        return float(np.sum(np.linalg.norm(np.diff(self.leading_edges, axis=0), axis=1)))
+
+    def is_straight(self, tol: float = 0.05) -> bool:
+        """Returns ``True`` if all the leading edges lie on a line, as seen from the front."""
+        if len(self) < 2: return False
+        if len(self) == 2: return True
+        yr, zr = self.y[0], self.z[0]
+        yt, zt = self.y[-1], self.z[-1]
+        y, z = self.y[1:-1], self.z[1:-1]
+        return bool(np.all(np.abs((y - yr) * (zt - zr) - (z - zr) * (yt - yr)) <= tol))
+
+    def y_duplicate(self) -> bool:
+        """Returns ``True`` if all the sections are on one side of the Y=0 plane."""
+        return bool(np.any(self.y > 0.05)) != bool(np.any(self.y < -0.05))
+
+    def spanwise_order(self) -> np.ndarray:
+        """Returns the indices that sort the sections by their spanwise position, keeping the order of equal ones."""
+        return np.argsort(self.spanwise(), kind='stable')
@@ -7,15 +7,21 @@ the Free Software Foundation, either version 3 of the License, or
 (at your option) any later version.
 """
 
+from bisect import bisect_left, bisect_right
 from copy import copy
 from math import atan2, degrees, sqrt, radians, sin, cos, tan
-from typing import Literal, Optional
+from typing import Callable, Literal, Optional, TypeVar
+
+import numpy as np
 
 from .airfoil import Airfoil
 from .section import Section, Control, control_types
+from .section_arrays import SectionArrays
 from ..math_functions import best_factor_pair, distribute_units
 from ..vector3 import Vector3, AnyVector3
 
+T = TypeVar('T')
+
 
 class SurfaceTemplates:
     """A factory class for ``Surface`` templates."""
@@ -124,11 +130,17 @@ class SurfaceTemplates:
 
         mid_section = surf.add_section_gentle(seam_spanwise)
         mid_section.chord = mid_chord
+        surf.touch()
 
         return surf
 
     @staticmethod
     def is_simple_tapered(surface: 'Surface', accuracy=.05) -> bool:
+        return surface.cached(f'is_simple_tapered {accuracy}',
+                              lambda: SurfaceTemplates._is_simple_tapered(surface, accuracy))
+
+    @staticmethod
+    def _is_simple_tapered(surface: 'Surface', accuracy=.05) -> bool:
         try:
             surface.assert_straight()
         except AssertionError:
@@ -140,15 +152,14 @@ class SurfaceTemplates:
         inc = surface.root.inclination
 
         # Check if the surface is of the correct shape
-        for section in surface.sections:
-            if section is surface.root or section is surface.tip: continue
-            y = section.y
-            le = section.leading_edge_position
-            c = section.chord
-            if abs((le.x - x_eq(y)) / c) > accuracy: return False
-            if abs((le.z - z_eq(y)) / c) > accuracy: return False
-            if abs((c - c_eq(y)) / c) > accuracy: return False
-            if section.inclination != inc: return False
+        arrays = surface.arrays()
+        x, y, z = arrays.leading_edges[1:-1].T
+        c = arrays.chords[1:-1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if np.any(np.abs((x - x_eq(y)) / c) > accuracy): return False
+            if np.any(np.abs((z - z_eq(y)) / c) > accuracy): return False
+            if np.any(np.abs((c - c_eq(y)) / c) > accuracy): return False
+        if np.any(arrays.inclinations[1:-1] != inc): return False
         return True
 
     @staticmethod
@@ -173,6 +184,10 @@ class SurfaceTemplates:
 
     @staticmethod
     def get_type(surface: 'Surface', accuracy=0.05) -> Optional['SurfaceTemplates.types']:
+        return surface.cached(f'type {accuracy}', lambda: SurfaceTemplates._get_type(surface, accuracy))
+
+    @staticmethod
+    def _get_type(surface: 'Surface', accuracy=0.05) -> Optional['SurfaceTemplates.types']:
         vertical = SurfaceTemplates.is_vertical(surface, accuracy)
         if SurfaceTemplates.is_delta(surface, accuracy):
             return 'Delta'
@@ -191,6 +206,13 @@ class SurfaceTemplates:
 
 
 class Surface:
+    """
+    A lifting surface, made of sections.
+
+    The derived properties, e.g. ``area()`` or ``span``, are cached until the surface changes.
+    The methods of the surface mark it as changed themselves, but after modifying its sections directly,
+    e.g. ``surface.root.chord = 2``, ``touch()`` must be called.
+    """
     template = SurfaceTemplates
 
     def __init__(self,
@@ -211,6 +233,8 @@ class Surface:
         self.origin_position = Vector3(*origin_position)
         self.airfoil = airfoil if airfoil else Airfoil.empty()
         if len(sections) < 2: raise ValueError("Cannot create a surface with less than two sections.")
+        self._version = 0
+        self._cache = {}
         self.sections = sections
         self.sort_sections()
         self.chord_points = 1
@@ -221,6 +245,46 @@ class Surface:
     def __repr__(self) -> str:
         return self.name
 
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state['_cache'] = {}
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        # Surfaces pickled by older versions have no version counter.
+        self.__dict__.setdefault('_version', 0)
+        self.__dict__.setdefault('_cache', {})
+
+    @property
+    def version(self) -> int:
+        """A counter increased every time the surface changes."""
+        return self._version
+
+    def touch(self, keep: tuple[str, ...] = ()) -> None:
+        """
+        Marks the surface as changed, so the cached derived properties are computed again.
+
+        Parameters:
+            keep (tuple[str, ...]): The keys of the cached values known to be unaffected by the change.
+        """
+        self._version += 1
+        kept = {key: self._cache[key] for key in keep if key in self._cache}
+        self._cache.clear()
+        self._cache.update(kept)
+
+    def cached(self, key: str, func: Callable[[], T]) -> T:
+        """Returns ``func()``, computed once and stored under the key until the surface changes."""
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = func()
+            return value
+
+    def arrays(self) -> SectionArrays:
+        """Returns the sections as arrays, see ``SectionArrays``. Must not be modified, as it is cached."""
+        return self.cached('arrays', lambda: SectionArrays.from_sections(self.sections))
+
     @property
     def root(self) -> Section:
         return self.sections[0]
@@ -236,13 +300,7 @@ class Surface:
             return self._lock_y_duplicate
         # A surface should not be mirrored if it's fully in the Y=0 plane,
         # or it has sections on both sides of the plane.
-        has_positive_y = any(section.y > 0.05 for section in self.sections)
-        has_negative_y = any(section.y < -0.05 for section in self.sections)
-        if not has_positive_y and not has_negative_y:
-            return False
-        if has_positive_y and has_negative_y:
-            return False
-        return True
+        return self.cached('y_duplicate', self.arrays().y_duplicate)
 
     @property
     def is_straight(self, tol=0.05) -> bool:
@@ -253,16 +311,14 @@ class Surface:
         if len(self.sections) == 2:
             return True
 
+        return self.cached('is_straight', lambda: self.arrays().is_straight(tol))
+
+    def _is_in_line(self, section: Section, tol=0.05) -> bool:
+        """Returns ``True`` if the section is in line with the root and the tip, as seen from the front."""
         _, yr, zr = self.root.leading_edge_position.tuple()
         _, yt, zt = self.tip.leading_edge_position.tuple()
-
-        for section in self.sections[1:-1]:
-            _, y, z = section.leading_edge_position.tuple()
-            lhs = (y - yr) * (zt - zr)
-            rhs = (z - zr) * (yt - yr)
-            if abs(lhs - rhs) > tol:
-                return False
-        return True
+        _, y, z = section.leading_edge_position.tuple()
+        return abs((y - yr) * (zt - zr) - (z - zr) * (yt - yr)) <= tol
 
     @property
     def dihedral(self) -> float | None:
@@ -284,16 +340,7 @@ class Surface:
         """Returns the area of the surface."""
         # For each section, A = 1/2 * ||(B-A)x(C-A)|| + 1/2 * ||(C-A)x(D-A)||
         # Where ABCD are tips of the section: A=prev.le, B=prev.te, C=next.te, D=next.le
-        area = 0
-        for i in range(len(self.sections) - 1):
-            _prev = self.sections[i]
-            _next = self.sections[i + 1]
-            A = _prev.leading_edge_position
-            B = A + (_prev.chord, 0, 0)
-            D = _next.leading_edge_position
-            C = D + (_next.chord, 0, 0)
-            sect_area = 0.5 * ((B - A).cross_product(C - A)).length() + 0.5 * ((C - A).cross_product(D - A)).length()
-            area += sect_area
+        area = self.cached('area', self.arrays().area)
         if self.y_duplicate:
             area *= 2
         return area
@@ -306,29 +353,23 @@ class Surface:
         """Returns the length of the surface in YZ plane."""
         if len(self.sections) < 2:
             return 0
-        l = 0
-        for i in range(len(self.sections) - 1):
-            _prev = self.sections[i]
-            _next = self.sections[i + 1]
-            l += sqrt((_next.y - _prev.y) ** 2 + (_next.z - _prev.z) ** 2)
-        return l
+        return self.cached('length_yz', self.arrays().length_yz)
 
     @property
     def length_abs(self) -> float:
         """Returns the absolute total length of the surface sections."""
         if len(self.sections) < 2:
             return 0
-        l = 0
-        for i in range(len(self.sections) - 1):
-            _prev = self.sections[i].leading_edge_position
-            _next = self.sections[i + 1].leading_edge_position
-            l += (_next - _prev).length()
-        return l
+        return self.cached('length_abs', self.arrays().length_abs)
 
     def spanwise(self, section: Section) -> float:
         """Returns the spanwise position of the section on the surface."""
         return sqrt((section.y - self.root.y) ** 2 + (section.z - self.root.z) ** 2)
 
+    def spanwise_positions(self) -> list[float]:
+        """Returns the sorted spanwise position of every section. Must not be modified, as it is cached."""
+        return self.cached('spanwise_positions', lambda: self.arrays().spanwise().tolist())
+
     def is_simple_tapered(self, accuracy=.05) -> bool:
         return SurfaceTemplates.is_simple_tapered(self, accuracy)
 
@@ -340,6 +381,9 @@ class Surface:
     def sweep_angle(self) -> float:
         if not self.is_simple_tapered():
             raise ValueError('Surface is too complex')
+        return self.cached('sweep_angle', self._sweep_angle)
+
+    def _sweep_angle(self) -> float:
         root_25mac = self.root.get_position_at_xc(.25)
         tip_25mac = self.tip.get_position_at_xc(.25)
         sweep = degrees(atan2(tip_25mac.x - root_25mac.x, self.spanwise(self.tip) - self.spanwise(self.root)))
@@ -347,13 +391,21 @@ class Surface:
 
     def add_section(self, section: Section) -> None:
         """Add a new section to the surface and ensures the sections are well-ordered."""
+        positions = self.spanwise_positions()
+        spanwise = self.spanwise(section)
         # Check whether the section is not outside the wing.
-        if not self.spanwise(self.root) < self.spanwise(section) < self.spanwise(self.tip): return
+        if not positions[0] < spanwise < positions[-1]: return
         # Check if a section with identical major axis coordinate doesn't already exist.
-        if self.spanwise(section) in [self.spanwise(sec) for sec in self.sections]: return
+        i = bisect_left(positions, spanwise)
+        if positions[i] == spanwise: return
 
-        self.sections.append(section)
-        self.sort_sections()
+        # Insert in place, and update the spanwise positions and straightness instead of computing them again.
+        # Neither the root nor the tip changes, so only the new section needs to be checked.
+        straight = self._cache.get('is_straight')
+        self.sections.insert(i, section)
+        positions.insert(i, spanwise)
+        self.touch(keep=('spanwise_positions',))
+        if straight is not None: self._cache['is_straight'] = straight and self._is_in_line(section)
 
     def add_section_gentle(self, spanwise: float | list[float]) -> Section | list[Section]:
         """Add a new section to the surface without modifying the shape of the surface."""
@@ -365,16 +417,14 @@ class Surface:
 
         assert isinstance(spanwise, (int, float))
 
-        for i, sec in enumerate(self.sections):
-            if self.spanwise(sec) >= spanwise:
-                prev_sec = self.sections[i - 1]
-                next_sec = sec
-                break
-        else:
-            raise Exception('Incorrect spanwise coordinate!')
+        positions = self.spanwise_positions()
+        i = bisect_left(positions, spanwise)
+        if i == len(positions): raise Exception('Incorrect spanwise coordinate!')
+        prev_sec = self.sections[i - 1]
+        next_sec = self.sections[i]
 
         # Calculate the leading-edge position as prev.x + d_spanwise * dx
-        d_spanwise = (spanwise - self.spanwise(prev_sec)) / (self.spanwise(next_sec) - self.spanwise(prev_sec))
+        d_spanwise = (spanwise - positions[i - 1]) / (positions[i] - positions[i - 1])
         xle = (prev_sec.x + d_spanwise * (next_sec.x - prev_sec.x))
         chord = prev_sec.chord + d_spanwise * (next_sec.chord - prev_sec.chord)
         inc = prev_sec.inclination + d_spanwise * (next_sec.inclination - prev_sec.inclination)
@@ -385,15 +435,16 @@ class Surface:
     def sort_sections(self) -> None:
         """Sorts the sections along the major axis of the surface."""
         if len(self.sections) < 2: return
-        ref_sec = self.sections[0]
-
-        def pos(section):
-            return sqrt((section.y - ref_sec.y) ** 2 + (section.z - ref_sec.z) ** 2)
-
-        self.sections.sort(key=lambda section: pos(section))
+        self.touch()
+        order = self.arrays().spanwise_order()
+        if np.array_equal(order, np.arange(len(order))): return
+        self.sections[:] = [self.sections[i] for i in order]
+        self.touch()
 
     def copy(self) -> 'Surface':
-        return copy(self)
+        surf = copy(self)
+        surf._cache = {}
+        return surf
 
     def get_symmetric(self) -> 'Surface':
         """Returns a copy of the surface mirrored about Y-axis."""
@@ -402,6 +453,7 @@ class Surface:
         reflected_sections = [sec.mirror() for sec in self.sections]
         surf.sections = reflected_sections
         surf._lock_y_duplicate = False
+        surf.touch()
         return surf
 
     def assert_straight(self):
@@ -410,16 +462,15 @@ class Surface:
 
     def has_section_at(self, spanwise: float) -> bool:
         """Returns ``True`` if the surface has a section at a given spanwise coordinate."""
-        self.assert_straight()
-        poss = [self.spanwise(section) for section in self.sections]
-        return spanwise in poss
+        return self.get_section_at(spanwise) is not None
 
     def get_section_at(self, spanwise: float) -> Section | None:
         """Returns the section at a given major axis coordinate, if exists, else returns ``None``."""
         self.assert_straight()
-        for sec in self.sections:
-            if self.spanwise(sec) == spanwise:
-                return sec
+        positions = self.spanwise_positions()
+        i = bisect_left(positions, spanwise)
+        if i < len(positions) and positions[i] == spanwise:
+            return self.sections[i]
         return None
 
     def get_sections_between(self, spanwise_start: float, spanwise_end: float,
@@ -429,16 +480,15 @@ class Surface:
         self.assert_straight()
         if not spanwise_start < spanwise_end:
             raise Exception('spanwise_start must be smaller than spanwise_end!')
-        secs = []
-        if include_start and self.has_section_at(spanwise_start):
-            secs.append(self.get_section_at(spanwise_start))
-
-        secs += [section for section in self.sections if spanwise_start < self.spanwise(section) < spanwise_end]
-
-        if include_end and self.has_section_at(spanwise_end):
-            secs.append(self.get_section_at(spanwise_end))
-
-        return secs
+        positions = self.spanwise_positions()
+        start = bisect_left(positions, spanwise_start)
+        end = bisect_right(positions, spanwise_end)
+        # Sections exactly at the ends are at the ends of the range.
+        if not include_start or start == len(positions) or positions[start] != spanwise_start:
+            start = bisect_right(positions, spanwise_start, start)
+        if not include_end or end == 0 or positions[end - 1] != spanwise_end:
+            end = bisect_left(positions, spanwise_end, start, end)
+        return self.sections[start:end]
 
     def xspan_to_xyz(self, x: float, ma: float) -> Vector3:
         y = ma * cos(radians(self.dihedral))
@@ -450,6 +500,7 @@ class Surface:
         self.mechanization = {}
         for sec in self.sections:
             sec.control = None
+        self.touch()
 
     def set_mechanization(self, **kwargs: list[tuple[float, float, float]]) -> None:
         """Sets the mechanisation of the surface.
@@ -490,6 +541,7 @@ class Surface:
                 for section in sections:
                     if section.has_control: raise Exception("A section already has a control surface!")
                     section.control = control_instance
+                self.touch(keep=('spanwise_positions', 'is_straight'))
 
             # Check if there are blocks with the same control next to each other,
             # and if so, add a section in between.
@@ -506,22 +558,36 @@ class Surface:
 
     def distribute_points(self, nof_points: int) -> None:
         chord_points, span_points = best_factor_pair(nof_points)
-        self.chord_points = chord_points
         span_points -= len(self.sections) - 1  # Each section requires at least a point, except for the last one.
-        lengths = []
-        for i in range(len(self.sections) - 1):
-            _prev = self.sections[i]
-            _next = self.sections[i + 1]
-            lengths.append((self.spanwise(_prev) - self.spanwise(_next)))
+        positions = self.spanwise_positions()
+        lengths = [_prev - _next for _prev, _next in zip(positions, positions[1:])]
 
         spanwise_distribution = distribute_units(span_points, lengths)
         spanwise_distribution.append(-1)  # For the last section, with the later '+1' will give 0
+        changed = self.chord_points != chord_points
+        self.chord_points = chord_points
         for section, distribution in zip(self.sections, spanwise_distribution):
+            changed |= section.spanwise_points != distribution + 1
             section.spanwise_points = distribution + 1
+        if changed: self.touch()
+
+    def airfoils(self) -> list[Airfoil]:
+        """Returns the distinct airfoils of the sections, in order."""
+        return self.cached('airfoils', lambda: list({id(airfoil): airfoil for airfoil in self.arrays().airfoils}.values()))
 
-    def string(self) -> str:
-        """Returns the current geometry as an .avl type string."""
-        _r = (f"SURFACE\n"
+    def string(self, airfoil_files: dict[Airfoil, str] = None) -> str:
+        """
+        Returns the current geometry as an .avl type string. Cached until the surface changes.
+
+        Parameters:
+            airfoil_files (dict[Airfoil, str]): The .dat files to reference the airfoils with, see ``Airfoil.string``.
+        """
+        if not airfoil_files: return self.cached('string', self._string)
+        key = f"string {'|'.join(airfoil_files.get(airfoil, '') for airfoil in self.airfoils())}"
+        return self.cached(key, lambda: self._string(airfoil_files))
+
+    def _string(self, airfoil_files: dict[Airfoil, str] = None) -> str:
+        _r = [f"SURFACE\n"
               f"{self.name}\n"
               f"{self.chord_points} 1.0\n"  # Spanwise points are distributed per section.
               f"{'YDUPLICATE\n0.0' if self.y_duplicate else ''}\n"
@@ -530,20 +596,17 @@ class Surface:
               f"TRANSLATE\n"
               f"{self.origin_position.avl_string}\n"
               f"ANGLE\n"
-              f"0\n")
+              f"0\n"]
         for sec in self.sections:
-            _r += sec.string()
-        return _r
+            _r += sec.fragments(airfoil_files)
+        return ''.join(_r)
 
     def get_controls(self) -> list[Control]:
         """Returns the control surfaces of the surface in the order in which they will appear in the .avl file."""
-        controls = []
-        for sec in self.sections:
-            if sec.control and sec.control not in controls:
-                controls.append(sec.control)
-        return controls
+        return list(self.arrays().controls)
 
     def clear_controls(self) -> None:
         """Removes all control surfaces from the surface."""
         for sec in self.sections:
             sec.control = None
+        self.touch()
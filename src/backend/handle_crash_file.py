@@ -13,8 +13,6 @@ import logging
 from platformdirs import user_config_dir
 from pathlib import Path
 
-from customtkinter import CTk, CTkTextbox, CTkLabel, CTkButton
-from tkinter.filedialog import asksaveasfilename
 import shutil
 import subprocess
 import os
@@ -23,6 +21,7 @@ from time import sleep
 
 class CrashWindow:
     def __init__(self, error: str):
+        from customtkinter import CTk, CTkTextbox, CTkLabel, CTkButton
         root = CTk()
         root.title('Critical Error')
         self._root = root
@@ -54,6 +53,7 @@ class CrashWindow:
 
     @staticmethod
     def _get_log_file():
+        from tkinter.filedialog import asksaveasfilename
         log_file_path = Path(user_config_dir("GAVL")) / "logs.txt"
         new_path = Path(asksaveasfilename(defaultextension='.txt',
                                           filetypes=[('Text File', ['.txt'])],
@@ -7,6 +7,7 @@ the Free Software Foundation, either version 3 of the License, or
 (at your option) any later version.
 """
 
+import json
 from pathlib import Path
 
 
@@ -15,7 +16,7 @@ def load_from_csv(path: Path | str) -> dict[str, list[float]] | list[list[float]
     if isinstance(path, str): path = Path(path)
     with open(path) as f:
         data = f.readlines()
-    raw_vals = [line.split(',') for line in data]
+    raw_vals = [line.rstrip('\n').split(',') for line in data if line.strip()]
     try:
         float(raw_vals[0][0])
         return _to_columns(raw_vals)
@@ -41,3 +42,14 @@ def _to_dict(raw_vals: list[list[str]]) -> dict[str, list[float]]:
     keys = raw_vals.pop(0)
     cols = _to_columns(raw_vals)
     return {k: c for k, c in zip(keys, cols)}
+
+
+def load_from_json(path: Path | str) -> dict[str, list[float]]:
+    """Returns the data from a JSON file as a dict of lists.
+    The file holds either an object of named columns, or a list of objects, one for each row."""
+    if isinstance(path, str): path = Path(path)
+    with open(path) as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        return {k: [float(v) for v in c] for k, c in data.items()}
+    return {k: [float(row[k]) for row in data] for k in data[0].keys()}
@@ -9,6 +9,8 @@ the Free Software Foundation, either version 3 of the License, or
 
 import math
 
+import numpy as np
+
 
 def best_factor_pair(n: int) -> tuple[int, int]:
     """Gets two factors of n or lower, that are as close to each other as possible.
@@ -52,18 +54,16 @@ def distribute_units(total_units: int, weights: list[float]) -> list[int]:
     return allocations
 
 
-def sort_loop(points):
+def sort_loop(points: np.ndarray | list[tuple[float, float]]) -> np.ndarray:
     """Sorts points counterclockwise around their centre of mass, starting from the point with max x."""
-    cx = sum(x for x, y in points) / len(points)
-    cy = sum(y for x, y in points) / len(points)
-
-    def angle(p):
-        x, y = p
-        return math.atan2(y - cy, x - cx)
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    cx, cy = points.mean(axis=0)
 
     # Sort counterclockwise by angle
-    sorted_points = sorted(points, key=angle)
+    sorted_points = points[np.argsort(np.arctan2(points[:, 1] - cy, points[:, 0] - cx), kind='stable')]
 
-    # Rotate so it starts from the point with max x
-    max_x_index = max(range(len(sorted_points)), key=lambda i: sorted_points[i][0])
-    return sorted_points[max_x_index:] + sorted_points[:max_x_index]
+    # Rotate so it starts from the point with max x, the upper one for an open trailing edge
+    x, y = sorted_points[:, 0], sorted_points[:, 1]
+    is_max_x = x == x.max()
+    start = np.flatnonzero(is_max_x & (y == y[is_max_x].max()))[0]
+    return np.roll(sorted_points, -start, axis=0)
@@ -8,6 +8,10 @@ the Free Software Foundation, either version 3 of the License, or
 """
 
 import math
+from bisect import bisect_right
+from functools import lru_cache
+
+import numpy as np
 
 # Constants
 g0 = 9.80665  # m/s^2
@@ -29,68 +33,133 @@ layers = [
 ]
 
 
-def _get_temperature(h: float) -> float:
-    """Calculate temperature at a given altitude, up to 80 km.
+# Per-layer constants, computed once
+_base_altitudes = np.array([layer[0] for layer in layers], dtype=np.float64)
+_base_temperatures = np.array([layer[1] for layer in layers], dtype=np.float64)
+_base_pressures = np.array([layer[2] for layer in layers], dtype=np.float64)
+_lapse_rates = np.array([layer[3] for layer in layers], dtype=np.float64)
+_isothermal_divisors = R_star * _base_temperatures
+_gradient_exponents = np.array([(g0 * M) / (R_star * L * 1e-3) if L != 0 else 0.0 for *_, L in layers])
+_layer_constants = list(zip(_base_altitudes.tolist(), _base_temperatures.tolist(), _base_pressures.tolist(),
+                            _lapse_rates.tolist(), _isothermal_divisors.tolist(), _gradient_exponents.tolist()))
+_base_altitudes_list = _base_altitudes.tolist()
+_top_layer = len(layers) - 2  # The last layer is only the top of the one below
 
-    :param h: Altitude in meters.
-    :return: Temperature in Kelvins.
-    """
+Altitude = float | np.ndarray
+
+
+def _scalar_state(h: float) -> tuple[float, float]:
+    """Returns the temperature in Kelvins and the pressure in Pascals at a single altitude in meters."""
     assert 0 <= h <= 8e4
     h_km = h / 1000
-    for i in range(len(layers) - 1):
-        h0, T0, _, L = layers[i]
-        h1 = layers[i + 1][0]
-        if h0 <= h_km < h1:
-            return T0 + L * (h_km - h0)
-    return layers[-1][1]  # Altitude exactly at the top layer
+    h0, T0, P0, L, isothermal_divisor, gradient_exponent = (
+        _layer_constants[min(bisect_right(_base_altitudes_list, h_km) - 1, _top_layer)])
+    T = T0 + L * (h_km - h0)
+    if L == 0:
+        # Isothermal
+        return T, P0 * math.exp(-g0 * M * (h_km - h0) * 1000 / isothermal_divisor)
+    # Gradient
+    return T, P0 * (T0 / T) ** gradient_exponent
+
+
+def _layer_arrays(h: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the altitudes in km, and the index of the layer of each."""
+    h = np.asarray(h, dtype=np.float64)
+    assert np.all((0 <= h) & (h <= 8e4))
+    h_km = h / 1000
+    return h_km, np.minimum(np.searchsorted(_base_altitudes, h_km, side='right') - 1, _top_layer)
 
 
-def _get_pressure(h: float) -> float:
+def _get_temperature(h: Altitude) -> Altitude:
+    """Calculate temperature at a given altitude, up to 80 km.
+
+    :param h: Altitude in meters, a number or an array.
+    :return: Temperature in Kelvins, of the same shape.
+    """
+    if isinstance(h, (int, float)): return _scalar_state(h)[0]
+    h_km, i = _layer_arrays(h)
+    return _base_temperatures[i] + _lapse_rates[i] * (h_km - _base_altitudes[i])
+
+
+def _get_pressure(h: Altitude) -> Altitude:
     """Calculate pressure at a given altitude, up to 80 km.
 
-    :param h: Altitude in meters.
-    :return: Pressure in Pascals."""
-    assert 0 <= h <= 8e4
-    h_km = h / 1000
-    for i in range(len(layers) - 1):
-        h0, T0, P0, L = layers[i]
-        h1 = layers[i + 1][0]
-        if h0 <= h_km < h1:
-            if L == 0:
-                # Isothermal
-                exponent = -g0 * M * (h_km - h0) * 1000 / (R_star * T0)
-                return P0 * math.exp(exponent)
-            else:
-                # Gradient
-                T = T0 + L * (h_km - h0)
-                base = T0 / T
-                exponent = (g0 * M) / (R_star * L * 1e-3)
-                return P0 * base ** exponent
-    return layers[-1][2]  # Altitude exactly at the top layer
-
-
-def get_density(h: float) -> float:
+    :param h: Altitude in meters, a number or an array.
+    :return: Pressure in Pascals, of the same shape."""
+    if isinstance(h, (int, float)): return _scalar_state(h)[1]
+    h_km, i = _layer_arrays(h)
+    h0, T0, P0, L = _base_altitudes[i], _base_temperatures[i], _base_pressures[i], _lapse_rates[i]
+    T = T0 + L * (h_km - h0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(L == 0,
+                        P0 * np.exp(-g0 * M * (h_km - h0) * 1000 / _isothermal_divisors[i]),
+                        P0 * (T0 / T) ** _gradient_exponents[i])
+
+
+def get_density(h: Altitude) -> Altitude:
     """Returns air density at altitudes up to 80 km.
 
-    :param h: Altitude above sea level in meters.
-    :return: Air density in kg/m^3.
+    :param h: Altitude above sea level in meters, a number or an array.
+    :return: Air density in kg/m^3, of the same shape.
     """
-    assert 0 <= h <= 8e4
-    T = _get_temperature(h)
-    P = _get_pressure(h)
+    if isinstance(h, (int, float)):
+        T, P = _scalar_state(h)
+    else:
+        T, P = _get_temperature(h), _get_pressure(h)
     return P / (R * T)
 
 
-def get_mach(velocity: float, altitude: float = 0.0) -> float:
+def get_mach(velocity: Altitude, altitude: Altitude = 0.0) -> Altitude:
     """
     Calculate Mach number at a given altitude, up to 80 km.
     Parameters:
-        velocity (float): Velocity in m/s.
-        altitude (float): Altitude in meters.
+        velocity (float | np.ndarray): Velocity in m/s.
+        altitude (float | np.ndarray): Altitude in meters.
     Returns:
-        Mach number.
+        Mach number, a number or an array of the broadcast shape of the arguments.
     """
-    assert 0 <= altitude <= 8e4
+    if not isinstance(velocity, (int, float)): velocity = np.asarray(velocity, dtype=np.float64)
     T = _get_temperature(altitude)
     a = (SHR_air * R * T) ** 0.5
     return velocity / a
+
+
+class ISATable:
+    """
+    The atmosphere tabulated at regular altitude steps, and interpolated linearly,
+    for the hot loops where the table is used many more times than it takes to build.
+    With the default step of 1 m the relative error of the density is below 1e-6.
+
+    Attributes:
+        altitudes (np.ndarray): The altitudes of the table, in meters.
+        temperatures (np.ndarray): The temperatures at the altitudes, in Kelvins.
+        densities (np.ndarray): The air densities at the altitudes, in kg/m^3.
+    """
+
+    def __init__(self, step: float = 1.0, top: float = 8e4):
+        """
+        Parameters:
+            step (float): The altitude step of the table, in meters.
+            top (float): The highest altitude of the table, in meters, up to 80 km.
+        """
+        self.altitudes = np.append(np.arange(0, top, step), top)
+        self.temperatures = _get_temperature(self.altitudes)
+        self.densities = _get_pressure(self.altitudes) / (R * self.temperatures)
+
+    def get_temperature(self, h: Altitude) -> Altitude:
+        """Returns the interpolated temperature in Kelvins, at the altitudes in meters."""
+        return np.interp(h, self.altitudes, self.temperatures)
+
+    def get_density(self, h: Altitude) -> Altitude:
+        """Returns the interpolated air density in kg/m^3, at the altitudes in meters."""
+        return np.interp(h, self.altitudes, self.densities)
+
+    def get_mach(self, velocity: Altitude, altitude: Altitude = 0.0) -> Altitude:
+        """Returns the Mach number of the velocity in m/s, at the altitudes in meters."""
+        return velocity / np.sqrt(SHR_air * R * self.get_temperature(altitude))
+
+
+@lru_cache
+def isa_table(step: float = 1.0) -> ISATable:
+    """Returns the ``ISATable`` of the given step, built on first use."""
+    return ISATable(step)
@@ -7,7 +7,9 @@ the Free Software Foundation, either version 3 of the License, or
 (at your option) any later version.
 """
 
-from typing import Union
+from typing import Iterable, Union
+
+import numpy as np
 
 Tuple3 = tuple[float, float, float]
 AnyVector3 = Union['Vector3', Tuple3]
@@ -18,16 +20,32 @@ def _is_tuple3(var) -> bool:
 
 
 class Vector3:
+    __slots__ = ('x', 'y', 'z')
+
     def __init__(self, x: float, y: float, z: float) -> None:
         """An object representing a 3-dimensional vector. Mimics a tuple, has some additional methods."""
-        if not all(isinstance(val, (int, float)) for val in (x, y, z)):  # Check if all arguments are numeric
+        if not (isinstance(x, (int, float)) and isinstance(y, (int, float)) and isinstance(z, (int, float))):
             raise TypeError("All arguments must be numeric")
         self.x, self.y, self.z = x, y, z
 
+    @classmethod
+    def _new(cls, x: float, y: float, z: float) -> 'Vector3':
+        """Creates a vector without checking the arguments, for values computed from other vectors."""
+        vec = object.__new__(cls)
+        vec.x, vec.y, vec.z = x, y, z
+        return vec
+
+    def __getstate__(self) -> dict:
+        return {'x': self.x, 'y': self.y, 'z': self.z}
+
+    def __setstate__(self, state: dict) -> None:
+        # Also reads the ``__dict__`` of vectors pickled before ``__slots__`` were used.
+        self.x, self.y, self.z = state['x'], state['y'], state['z']
+
     @classmethod
     def zero(cls) -> 'Vector3':
         """Returns a zero vector."""
-        return cls(0, 0, 0)
+        return cls._new(0, 0, 0)
 
     def __repr__(self) -> str:
         return f"Vector3({self.x}, {self.y}, {self.z})"
@@ -43,24 +61,26 @@ class Vector3:
 
     def copy(self) -> 'Vector3':
         """Returns a copy of this vector."""
-        return Vector3(*self)
+        return Vector3._new(self.x, self.y, self.z)
 
     def __add__(self, other: AnyVector3) -> 'Vector3':
-        if _is_tuple3(other): other = Vector3(*other)
-        assert isinstance(other, Vector3)
-        return Vector3(self.x + other.x, self.y + other.y, self.z + other.z)
+        if not isinstance(other, Vector3):
+            assert _is_tuple3(other)
+            return Vector3._new(self.x + other[0], self.y + other[1], self.z + other[2])
+        return Vector3._new(self.x + other.x, self.y + other.y, self.z + other.z)
 
     def __mul__(self, other: int | float) -> 'Vector3':
         assert isinstance(other, (int, float))
-        return Vector3(self.x * other, self.y * other, self.z * other)
+        return Vector3._new(self.x * other, self.y * other, self.z * other)
 
     def __sub__(self, other: AnyVector3) -> 'Vector3':
-        if _is_tuple3(other): other = Vector3(*other)
-        assert isinstance(other, Vector3)
-        return self.__add__(other * -1)
+        if not isinstance(other, Vector3):
+            assert _is_tuple3(other)
+            return Vector3._new(self.x - other[0], self.y - other[1], self.z - other[2])
+        return Vector3._new(self.x - other.x, self.y - other.y, self.z - other.z)
 
     def __eq__(self, other: AnyVector3) -> bool:
-        if _is_tuple3(other): other = Vector3(*other)
+        if _is_tuple3(other): return self.x == other[0] and self.y == other[1] and self.z == other[2]
         if not isinstance(other, Vector3):
             return NotImplemented
         return self.x == other.x and self.y == other.y and self.z == other.z
@@ -68,12 +88,12 @@ class Vector3:
     def scale(self, other: AnyVector3) -> 'Vector3':
         """Returns a copy of self scaled by the vector so that ``new``.x = ``self``.x * ``scale``.x etc.
         From the mathematical point of view it's the same as ``self`` * ``other`` ^T."""
-        other = Vector3(*other)
-        return Vector3(self.x * other.x, self.y * other.y, self.z * other.z)
+        if not isinstance(other, Vector3): other = Vector3(*other)
+        return Vector3._new(self.x * other.x, self.y * other.y, self.z * other.z)
 
     def cross_product(self, other: AnyVector3) -> 'Vector3':
         """Returns cross-product of two vectors."""
-        return Vector3(self.y * other.z - self.z * other.y, self.z * other.x - self.x * other.z, self.x * other.y - self.y * other.x)
+        return Vector3._new(self.y * other.z - self.z * other.y, self.z * other.x - self.x * other.z, self.x * other.y - self.y * other.x)
 
     def length(self) -> float:
         """Returns the length of the vector."""
@@ -83,3 +103,92 @@ class Vector3:
     def avl_string(self) -> str:
         """Returns a string 'x y z'."""
         return f"{self.x} {self.y} {self.z}"
+
+
+class Vec3Array:
+    """
+    A batch of 3-dimensional vectors, stored as a single float64 array of shape (n, 3),
+    for operations on many vectors at once without creating a ``Vector3`` for each.
+
+    Attributes:
+        data (np.ndarray): The vectors, one in each row.
+    """
+    __slots__ = ('data',)
+
+    def __init__(self, data: np.ndarray) -> None:
+        """
+        Parameters:
+            data (np.ndarray): The vectors, of shape (n, 3).
+        """
+        self.data = np.asarray(data, dtype=np.float64).reshape(-1, 3)
+
+    @classmethod
+    def from_vectors(cls, vectors: Iterable[AnyVector3]) -> 'Vec3Array':
+        """Creates the array from ``Vector3`` objects or 3-tuples, in a single pass over the components."""
+        vectors = list(vectors)
+        n = len(vectors)
+        data = np.empty((n, 3))
+        if n and isinstance(vectors[0], Vector3):
+            data[:, 0] = np.fromiter([vec.x for vec in vectors], np.float64, n)
+            data[:, 1] = np.fromiter([vec.y for vec in vectors], np.float64, n)
+            data[:, 2] = np.fromiter([vec.z for vec in vectors], np.float64, n)
+        elif n:
+            data[:] = [tuple(vec) for vec in vectors]
+        return cls(data)
+
+    def to_vectors(self) -> list[Vector3]:
+        """Returns a ``Vector3`` of every row."""
+        return [Vector3._new(x, y, z) for x, y, z in self.data.tolist()]
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, item: int | slice | np.ndarray) -> 'Vector3 | Vec3Array':
+        if isinstance(item, (int, np.integer)): return Vector3._new(*self.data[item].tolist())
+        return Vec3Array(self.data[item])
+
+    def __iter__(self):
+        return iter(self.to_vectors())
+
+    def __repr__(self) -> str:
+        return f"Vec3Array of {len(self)} vectors"
+
+    @staticmethod
+    def _operand(other: 'Vec3Array | AnyVector3') -> np.ndarray:
+        if isinstance(other, Vec3Array): return other.data
+        return np.asarray(tuple(other), dtype=np.float64)
+
+    def __add__(self, other: 'Vec3Array | AnyVector3') -> 'Vec3Array':
+        return Vec3Array(self.data + self._operand(other))
+
+    def __sub__(self, other: 'Vec3Array | AnyVector3') -> 'Vec3Array':
+        return Vec3Array(self.data - self._operand(other))
+
+    def __mul__(self, other: float | np.ndarray) -> 'Vec3Array':
+        """Multiplies by a scalar, or by one scalar for each vector."""
+        other = np.asarray(other, dtype=np.float64)
+        return Vec3Array(self.data * (other[:, None] if other.ndim == 1 else other))
+
+    def scale(self, other: 'Vec3Array | AnyVector3') -> 'Vec3Array':
+        """Returns a copy scaled component-wise, see ``Vector3.scale``."""
+        return Vec3Array(self.data * self._operand(other))
+
+    def cross_product(self, other: 'Vec3Array | AnyVector3') -> 'Vec3Array':
+        """Returns the cross-products of the vectors."""
+        return Vec3Array(np.cross(self.data, self._operand(other)))
+
+    def lengths(self) -> np.ndarray:
+        """Returns the length of every vector."""
+        return np.sqrt(np.sum(self.data ** 2, axis=1))
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.data[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.data[:, 1]
+
+    @property
+    def z(self) -> np.ndarray:
+        return self.data[:, 2]
@@ -0,0 +1,96 @@
+"""
+Copyright (c) 2025 Wojciech Kwiatkowski
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+"""
+
+import logging
+import pickle
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from .backend import AVLInterface, AbortFlag, ResultSet, load_from_csv, load_from_json
+from .backend.geo_design import Geometry, GeometryGenerator
+
+# Run-file parameters set directly, instead of being variables constrained to themselves.
+run_file_constants = ('X_cg', 'Y_cg', 'Z_cg', 'Mach', 'velocity', 'mass', 'altitude')
+
+
+def load_geometry(path: Path | str) -> Geometry:
+    """Loads the geometry from a .avl file, or a .gavl file saved by the app."""
+    path = Path(path)
+    if path.suffix.lower() == '.avl': return GeometryGenerator.from_avl(path)
+    with open(path, 'rb') as f:
+        geometry = pickle.load(f)
+    if not isinstance(geometry, Geometry): raise ValueError(f'{path.name} does not contain a geometry.')
+    return geometry
+
+
+def load_sweep(path: Path | str, geometry: Geometry) -> dict[str, list[float]]:
+    """
+    Loads the sweep definition from a CSV or JSON file with named columns, and converts it to run-file data.
+
+    Columns named 'variable -> constraint' are used as they are. Other columns are either run-file constants,
+    e.g. 'X_cg', or variables constrained to themselves, e.g. 'alpha' becomes 'alpha -> alpha'.
+    An 'altitude' column, in meters, sets the air density of every case, see ``AVLInterface.flight_conditions``.
+    As in the Calc tab, the center of mass defaults to the reference point of the geometry.
+    """
+    path = Path(path)
+    raw = load_from_json(path) if path.suffix.lower() == '.json' else load_from_csv(path)
+    if isinstance(raw, list): raise ValueError(f'The columns of {path.name} must be named.')
+    data: dict[str, list[float]] = {}
+    for name, values in raw.items():
+        name = name.strip()
+        if '->' not in name and name not in run_file_constants: name = f'{name} -> {name}'
+        data[name] = values
+    nof_cases = len(list(data.values())[0])
+    if any(len(values) != nof_cases for values in data.values()):
+        raise ValueError(f'All the columns of {path.name} must have the same length.')
+    for name, value in zip(('X_cg', 'Y_cg', 'Z_cg'), geometry.ref_pos.tuple()):
+        data.setdefault(name, [value] * nof_cases)
+    return data
+
+
+def save_results(results: ResultSet, path: Path | str) -> None:
+    """Saves the results as a CSV file, one case per row, or as a NumPy .npz file of named columns."""
+    path = Path(path)
+    if path.suffix.lower() == '.npz': results.to_npz(path)
+    else: results.to_csv(path)
+
+
+def run_batch(geometry_path: Path | str,
+              sweep_path: Path | str,
+              output_path: Path | str,
+              height: float = 0.0,
+              workers: int = None) -> int:
+    """
+    Runs a sweep without the GUI, and saves the results.
+
+    Parameters:
+        geometry_path (Path | str): Path to the .gavl or .avl geometry file.
+        sweep_path (Path | str): Path to the .csv or .json sweep definition, see ``load_sweep``.
+        output_path (Path | str): Path to the output .csv or .npz file.
+        height (float): The flight altitude, in meters, of the cases, if the sweep has no 'altitude' column.
+        workers (int): The maximal number of AVL processes run at the same time.
+    Returns:
+        int: The exit code, 0 if the results were saved.
+    """
+    geometry = load_geometry(geometry_path)
+    data = load_sweep(sweep_path, geometry)
+    logging.info(f'Running {len(list(data.values())[0])} cases of {Path(sweep_path).name} '
+                 f'on {Path(geometry_path).name}.')
+    with TemporaryDirectory(prefix='gavl_') as work_dir:
+        try:
+            vals, errors = AVLInterface.run_series(geometry, data, height, AbortFlag(), Path(work_dir), workers)
+        finally:
+            AVLInterface.session_pool.close_all()
+    if errors: logging.error(f'AVL reported errors:\n{errors}')
+    if not vals:
+        logging.error('No results to save.')
+        return 1
+    save_results(vals, output_path)
+    logging.info(f'Saved the results to {output_path}.')
+    return 0
@@ -9,6 +9,7 @@ the Free Software Foundation, either version 3 of the License, or
 from pathlib import Path
 from customtkinter import CTkFrame, CTkButton, CTkLabel
 from threading import Thread
+import asyncio
 import logging
 from .results_display import ResultsDisplay
 from .oper_input import OperSeriesInputPanel
@@ -16,7 +17,7 @@ from .static_input import StaticInputPanel
 from ..help_top_level import HelpTopLevel
 from ..popup import Popup
 from ..ask_popup import AskPopup
-from ...backend import AVLInterface, AbortFlag
+from ...backend import AVLInterface, ResultSet
 
 
 class CalcDisplay(CTkFrame):
@@ -86,7 +87,6 @@ class CalcDisplay(CTkFrame):
         if len(self.geometry.surfaces) == 0: return
         self.exec_button.configure(state='disabled')
         data = self.get_data()
-        abort_flag = AbortFlag()
 
         popup = Popup(self)
         CTkLabel(popup.frame, text='Running...').grid(row=0, column=0, padx=5, pady=5, sticky='nsew')
@@ -94,32 +94,60 @@ class CalcDisplay(CTkFrame):
         abort_button.grid(row=1, column=0, padx=5, pady=5, sticky='news')
         popup.run()
 
-        def task():
+        # The series is driven by an event loop in a separate thread, so that it can be cancelled from here.
+        loop = asyncio.new_event_loop()
+
+        # The cases reported so far, by their index, to keep the finished ones if the series is cancelled
+        finished: dict[int, list[dict[str, float]]] = {}
+
+        def task(series):
             logging.info('Running calculation')
-            vals, errors = AVLInterface.run_series(self.geometry, data, self.static_input.height, abort_flag, self.app_wd)
+            try:
+                vals, errors = loop.run_until_complete(series)
+            except asyncio.CancelledError:
+                nof_finished = next((i for i in range(len(finished) + 1) if i not in finished))
+                vals, errors = ResultSet.from_cases([finished[i] for i in range(nof_finished)]), 'Aborted'
+            finally:
+                loop.close()
             self.after(0, on_task_done, *(vals, errors))
 
         def abort():
             logging.info('Aborting calculation')
-            abort_flag.abort()
-            self.error('Calculation aborted')
-            on_task_done()
+            abort_button.configure(state='disabled')
+            if not loop.is_closed(): loop.call_soon_threadsafe(series.cancel)
 
         def on_task_done(vals=None, errors=''):
             popup.destroy()
             self.exec_button.configure(state='normal')
-            if abort_flag: return
+            if vals is None: return  # Nothing was run
+            if errors == 'Aborted':
+                self.error(f'Calculation aborted, {len(vals)} cases finished.')
+                errors = None
             if errors:
+                # Drop the pages of the cases that did not finish, so that no empty pages are left
+                self.results_display.clear_results()
                 self.run_errors(errors)
                 return
-            if vals:
+            if len(vals):
                 self.results_display.set_results(vals)
+            else:
+                self.results_display.clear_results()
+
+        def on_case(index, forces, st):
+            finished[index] = [forces, st]
+            self.after(0, self.results_display.set_result, *(index, forces, st))
 
         if data:
+            # Show the pages as the cases finish
+            self.results_display.start_results(len(list(data.values())[0]))
+            # The altitude of each case is in the data
+            series = loop.create_task(AVLInterface.async_run_series(
+                self.geometry, data, 0.0, self.app_wd, on_case=on_case))
             abort_button.configure(command=abort)
             self.update_idletasks()
-            Thread(target=task).start()
+            Thread(target=task, args=(series,)).start()
         else:
+            loop.close()
             on_task_done()
 
     def run_errors(self, errors):
@@ -30,6 +30,11 @@ bindable_names = {
     'Pitch Moment': ('pm', 'Cm pitchmom'),
     'Yaw Moment': ('ym', 'Cn yaw mom')
 }
+# The flight conditions, set directly for each case instead of being bound, and their run-file names
+flight_condition_names = {
+    'Altitude': 'altitude',
+    'Velocity': 'velocity'
+}
 
 
 class OperSeriesInput(RowManager):
@@ -106,6 +111,47 @@ class OperSeriesInput(RowManager):
         return f"{self._run_file_name} -> {bound_run_file_name}"
 
 
+class FlightConditionInput(RowManager):
+    """Represents a single flight condition in the Calc menu, handles the data input."""
+
+    def __init__(self, grid: Gridable, master_row: int, files_manager: FilesManager, name: str):
+        """
+
+        :param grid: Master widget.
+        :param master_row: A row number to grid the widget to.
+        :param files_manager: The FilesManager instance to use for loading files.
+        :param name: Name of the flight condition represented.
+        """
+        super().__init__(grid, master_row)
+        if name not in flight_condition_names.keys(): raise ValueError("Invalid name")
+        self.display_name = name
+        self._run_file_name = flight_condition_names[name]
+
+        self.name_label = CTkLabel(self.grid, text=self.display_name, anchor='e')
+        self.series_config = SeriesConfig(self.grid, files_manager)
+        self._build()
+
+    def get_value(self):
+        return self.series_config.get_value()
+
+    def get_size(self):
+        """Returns the number of values in the series."""
+        return self.series_config.vals_size
+
+    def update(self):
+        self.series_config.update()
+
+    def _build(self):
+        self.stack_spacing(0)
+        self.stack(self.name_label, sticky='e', pady=6, padx=6)
+        self.stack_spacing(140)  # In place of the bind menu
+        self.stack(self.series_config, padx=4, pady=6)
+        self.update()
+
+    def run_file_names(self) -> str:
+        return self._run_file_name
+
+
 class OperSeriesInputPanel(CTkFrame):
     """Represents the entire main input panel for the Calc menu."""
 
@@ -122,12 +168,16 @@ class OperSeriesInputPanel(CTkFrame):
         series_toggle_button.set('Single')
         series_toggle_button.grid(row=0, column=3, sticky='w', pady=10)
         self._load_from_file_button = CTkButton(self, text='Add File', width=169, command=self._add_file)
-        self._ois: list[OperSeriesInput] = []
+        self._ois: list[OperSeriesInput | FlightConditionInput] = []
         names = base_names | OperSeriesInput.get_controls_names(control_surfaces)
         for i, name in enumerate(names.keys()):
             self._ois.append(
                 OperSeriesInput(grid=self, files_manager=self._files_manager, name=name, master_row=i + 1, control_surfaces_names=control_surfaces)
             )
+        for i, name in enumerate(flight_condition_names.keys()):
+            self._ois.append(
+                FlightConditionInput(grid=self, files_manager=self._files_manager, name=name, master_row=len(names) + i + 1)
+            )
         # Add padding at ends
         self.rowconfigure(20, minsize=10)
         self.columnconfigure(20, minsize=10)
@@ -178,10 +228,15 @@ class OperSeriesInputPanel(CTkFrame):
             oi.update()
 
     def get_run_file_data(self, ignore_resource_warning=False) -> tuple[dict[str, list[float]], int]:
-        """Returns a dict with the names of the parameters and the values of the series, as well as the size of the series."""
+        """Returns a dict with the names of the parameters and the values of the series, as well as the size of the series.
+        The velocity is left out if it is zero for all the cases, so that AVL's own default is used."""
         names = [oi.run_file_names() for oi in self._ois]
         values, size = self.get_values(ignore_resource_warning)
-        return dict(zip(names, values)), size
+        data = dict(zip(names, values))
+        if not all(0 <= altitude <= 8e4 for altitude in data['altitude']):
+            raise ValueError('Altitude must be between 0 and 80,000 m.')
+        if not any(data['velocity']): del data['velocity']
+        return data, size
 
     def _add_file(self) -> None:
         path = askopenfilename(
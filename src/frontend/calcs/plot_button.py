@@ -8,41 +8,125 @@ the Free Software Foundation, either version 3 of the License, or
 """
 
 
-from customtkinter import CTkButton, CTkToplevel
+from customtkinter import CTkButton, CTkToplevel, CTkLabel
 from pathlib import Path
 from PIL import Image
-from tkinter.filedialog import asksaveasfilename
+from threading import Thread
+from concurrent.futures import ThreadPoolExecutor, Future
+from functools import partial
+from copy import deepcopy
+from typing import Callable
+from tkinter.filedialog import asksaveasfilename, askdirectory
 from abc import ABC, abstractmethod
+import logging
 from ..image_frame import ImageFrame
+from ..ask_popup import AskPopup
+from ..help_top_level import HelpTopLevel
+from ..popup import Popup
 from ...backend import ImageGetter
 
 
 
 class PlotButton(CTkButton, ABC):
+    """A button showing a plot of the current results page.
+
+    The plots are made off the Tk thread, through ``ImageGetter.get_plot``, which keeps them in its cache.
+    Once the button has been used, the plots of the shown page and of its neighbours are made in the background
+    whenever the page changes, see ``prefetch``, so flipping through the pages shows them without waiting for AVL.
+    """
+    _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='plot')
+
     def __init__(self, parent, text: str):
         super().__init__(parent, text=text, command=self.plot)
+        self._text = text
+        self._used = False
+        self._prefetched: list[Future] = []
 
     @abstractmethod
-    def generate_image(self) -> Image.Image:
+    def plot_tasks(self, case_numbers: list[int]) -> list[Callable[[], Image.Image]]:
+        """Reads the inputs, and returns the functions making the plots of the cases, to be run off the Tk thread.
+        The functions must not refer to any object that can change in the meantime, e.g. the live geometry."""
+        pass
+
+    @property
+    @abstractmethod
+    def current_page(self) -> int:
+        pass
+
+    @property
+    @abstractmethod
+    def nof_pages(self) -> int:
         pass
 
     def plot(self):
-        PlotWindow(self.generate_image())
+        self._used = True
+        try:
+            task, = self.plot_tasks([self.current_page])
+        except ValueError as e:
+            HelpTopLevel(None, e.args[0])
+            return
+        # The plot of the clicked page goes before the ones waiting to be prefetched
+        self._cancel_prefetch()
+        self.configure(state='disabled', text='Plotting...')
+        self._show_when_done(self._executor.submit(task))
+        self.prefetch()
+
+    def _show_when_done(self, future: Future):
+        if not future.done():
+            self.after(50, self._show_when_done, future)  # noqa
+            return
+        self.configure(state='normal', text=self._text)
+        try:
+            img = future.result()
+        except (RuntimeError, FileNotFoundError, TimeoutError, ValueError) as e:
+            logging.error(f'Plot failed: {e}')
+            HelpTopLevel(None, str(e))
+            return
+        PlotWindow(img)
+
+    def prefetch(self):
+        """Makes the plots of the current page and the next and previous ones in the background,
+        if the button has been used. The plots of the pages shown before, not yet started, are dropped."""
+        if not self._used: return
+        self._cancel_prefetch()
+        page = self.current_page
+        pages = [p for p in (page, page + 1, page - 1) if 0 <= p < self.nof_pages]
+        try:
+            tasks = self.plot_tasks(pages)
+        except ValueError:
+            return
+        self._prefetched = [self._executor.submit(self._prefetch_task, task) for task in tasks]
+
+    def _cancel_prefetch(self):
+        for future in self._prefetched: future.cancel()
+        self._prefetched = []
+
+    @staticmethod
+    def _prefetch_task(task: Callable[[], Image.Image]) -> None:
+        try:
+            task()
+        except (RuntimeError, FileNotFoundError, TimeoutError, ValueError) as e:
+            logging.debug(f'Prefetching a plot failed: {e}')
 
 
 class PlotTrefftz(PlotButton):
+    kind = 'trefftz'
+
     def __init__(self, parent, app_wd: str | Path, calc_display):
         super().__init__(parent, 'Plot Trefftz')
         self._calc_display = calc_display
         self.app_wd = app_wd
 
-    def generate_image(self) -> Image.Image:
-        geometry = self.calc_display.geometry
-        run_file_data: dict[str, list[float]] = self.calc_display.oip.get_run_file_data()[0]
-        case_number: int = self.current_page
-        return ImageGetter.get_trefftz(geometry, run_file_data, case_number,
-                                       self.calc_display.static_input.height,
-                                       self.app_wd)
+    def plot_tasks(self, case_numbers: list[int]) -> list[Callable[[], Image.Image]]:
+        # A copy, as the geometry can be edited while the plots are made
+        geometry = deepcopy(self.calc_display.geometry)
+        # The series has already been run, so a long one needs no confirmation here
+        run_file_data: dict[str, list[float]] = \
+            self.calc_display.oip.get_run_file_data(ignore_resource_warning=True)[0]
+        return [partial(ImageGetter.get_plot, self.kind, geometry, run_file_data, case_number,
+                        0.0,  # The altitude of each case is in the data
+                        self.app_wd)
+                for case_number in case_numbers]
 
     @property
     def calc_display(self):
@@ -54,19 +138,77 @@ class PlotTrefftz(PlotButton):
     def current_page(self):
         return self.calc_display.results_display.page
 
+    @property
+    def nof_pages(self):
+        return len(self.calc_display.results_display.results)
+
 
 class PlotLoading(PlotTrefftz):
+    kind = 'loading'
+
     def __init__(self, parent, app_wd: str | Path, calc_display):
         super().__init__(parent, app_wd, calc_display)
-        self.configure(text='Plot Loading')
+        self._text = 'Plot Loading'
+        self.configure(text=self._text)
+
+
+class ExportPlots(CTkButton):
+    """Saves the Trefftz or loading plots of all the cases, as PNG images or a single PDF file."""
+    def __init__(self, parent, app_wd: str | Path, calc_display):
+        super().__init__(parent, text='Export Plots', command=self.export)
+        self._calc_display = calc_display
+        self.app_wd = app_wd
+
+    @property
+    def calc_display(self):
+        from .calc_display import CalcDisplay
+        assert isinstance(self._calc_display, CalcDisplay)
+        return self._calc_display
 
-    def generate_image(self) -> Image.Image:
+    def export(self):
         geometry = self.calc_display.geometry
-        run_file_data: dict[str, list[float]] = self.calc_display.oip.get_run_file_data()[0]
-        case_number: int = self.current_page
-        return ImageGetter.get_loading(geometry, run_file_data, case_number,
-                                       self.calc_display.static_input.height,
-                                       self.app_wd)
+        if len(geometry.surfaces) == 0: return
+        kind = AskPopup.ask('Which plots to export?', ['Trefftz', 'Loading'], 'Trefftz').lower()
+        file_format = AskPopup.ask('Export as?', ['Images', 'PDF'], 'Images')
+        if file_format == 'PDF':
+            path = asksaveasfilename(defaultextension='.pdf', filetypes=[('PDF File', ['.pdf'])],
+                                     title='Export Plots', confirmoverwrite=True)
+        else:
+            path = askdirectory(title='Export Plots', mustexist=False)
+        if not path: return
+        # A copy, as the geometry can be edited while the plots are exported
+        geometry = deepcopy(geometry)
+        try:
+            # The series has already been run, so a long one needs no confirmation here
+            run_file_data: dict[str, list[float]] = \
+                self.calc_display.oip.get_run_file_data(ignore_resource_warning=True)[0]
+        except ValueError as e:
+            HelpTopLevel(None, e.args[0])
+            return
+
+        self.configure(state='disabled')
+        popup = Popup(None)
+        CTkLabel(popup.frame, text='Exporting...').grid(row=0, column=0, padx=5, pady=5, sticky='nsew')
+        popup.run()
+
+        def task():
+            logging.info(f'Exporting {kind} plots to {path}')
+            try:
+                paths = ImageGetter.export_plots(geometry, run_file_data,
+                                                 0.0,  # The altitude of each case is in the data
+                                                 path, self.app_wd, kind)
+                message = f'Saved {len(paths)} file{"s" if len(paths) > 1 else ""} to {Path(path)}.'
+            except (RuntimeError, FileNotFoundError, ValueError) as e:
+                logging.error(f'Export failed: {e}')
+                message = str(e)
+            self.after(0, on_task_done, message)
+
+        def on_task_done(message: str):
+            popup.destroy()
+            self.configure(state='normal')
+            HelpTopLevel(None, message)
+
+        Thread(target=task, daemon=True).start()
 
 
 class PlotWindow(CTkToplevel):
@@ -10,7 +10,8 @@ the Free Software Foundation, either version 3 of the License, or
 
 from customtkinter import CTkFrame, CTkSegmentedButton, CTkLabel, CTkEntry, CTkButton
 from pathlib import Path
-from .plot_button import PlotTrefftz, PlotLoading
+from .plot_button import PlotTrefftz, PlotLoading, ExportPlots
+from ...backend import ResultSet
 
 
 class ResultsDisplay(CTkFrame):
@@ -27,6 +28,7 @@ class ResultsDisplay(CTkFrame):
         self.current_display = self.forces_display
         self.trefftz_button = PlotTrefftz(self, app_wd, calc_display)
         self.loading_button = PlotLoading(self, app_wd, calc_display)
+        self.export_button = ExportPlots(self, app_wd, calc_display)
         self.mode_button.set('Forces')
         self.build()
 
@@ -35,7 +37,7 @@ class ResultsDisplay(CTkFrame):
         return self.results[self.page]
 
     def build(self):
-        self.set_results([[{}, {}]])
+        self.clear_results()
 
         self.rowconfigure(0, weight=0)
         self.rowconfigure(1, weight=0)
@@ -51,6 +53,7 @@ class ResultsDisplay(CTkFrame):
         self.current_display.grid(row=2, column=0, columnspan=2, sticky='nsew')
         self.trefftz_button.grid(row=4, column=0, columnspan=2, sticky='nsew', pady=6, padx=3)
         self.loading_button.grid(row=5, column=0, columnspan=2, sticky='nsew', pady=6, padx=3)
+        self.export_button.grid(row=6, column=0, columnspan=2, sticky='nsew', pady=6, padx=3)
         self.update()
 
     def update(self):
@@ -69,14 +72,35 @@ class ResultsDisplay(CTkFrame):
                 self.current_display = self.stability_display
         self.update()
 
-    def set_results(self, results: list[list[dict[str, float]]]):
+    def set_results(self, results: ResultSet | list[list[dict[str, float]]]):
         self.results = results
+        self.page = 0
         self.page_button.set_size(len(results))
         self.update()
+        self.prefetch_plots()
+
+    def clear_results(self):
+        """Shows a single empty page."""
+        self.set_results([[{}, {}]])
+
+    def start_results(self, nof_cases: int):
+        """Sets empty pages for a series, to be filled by ``set_result`` as the cases finish."""
+        self.set_results([[{}, {}] for _ in range(nof_cases)])
+
+    def set_result(self, index: int, forces: dict[str, float], st: dict[str, float]):
+        """Sets the results of a single case, refreshing the display if its page is shown."""
+        self.results[index] = [forces, st]
+        if index == self.page: self.update()
 
     def switch_page(self, page: str):
         self.page = int(page) - 1
         self.update()
+        self.prefetch_plots()
+
+    def prefetch_plots(self):
+        """Starts making the plots around the shown page in the background, see ``PlotButton.prefetch``."""
+        self.trefftz_button.prefetch()
+        self.loading_button.prefetch()
 
     def save_to_csv(self):
         from pathlib import Path
@@ -87,19 +111,13 @@ class ResultsDisplay(CTkFrame):
             title='Gavl_results',
             confirmoverwrite=True
         ))
-        to_save = ''
-        for key in (self.active_results[0] | self.active_results[1]).keys():
-            to_save += f'{key},'
-        to_save = to_save[:-1]
-        to_save += '\n'
-        for i in range(len(self.results)):
-            for val in (self.results[i][0] | self.results[i][1]).values():
-                to_save += f'{val},'
-            to_save = to_save[:-1]
-            to_save += '\n'
-        to_save = to_save[:-1]
-        with open(path, 'w') as f:
-            f.write(to_save)
+        if path == Path('.'): return
+        if isinstance(self.results, ResultSet):
+            results = self.results
+        else:
+            # Skip the empty pages of the cases that are not finished
+            results = ResultSet.from_cases([case for case in self.results if case[0]])
+        results.to_csv(path)
 
 
 class TextBox(CTkFrame):
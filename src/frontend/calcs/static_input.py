@@ -9,7 +9,7 @@ the Free Software Foundation, either version 3 of the License, or
 
 
 from customtkinter import CTkFrame, CTkLabel
-from ..advanced_entry import EntryWithInstructionsBlock, EntryWithInstructions
+from ..advanced_entry import EntryWithInstructionsBlock
 from ..help_top_level import HelpTopLevel
 from ...backend import handle_crash
 
@@ -21,13 +21,9 @@ class StaticInputPanel(CTkFrame):
         self.mass_label = CTkLabel(self, width=120, anchor='e')
         self.mass_entry = EntryWithInstructionsBlock(self, on_enter=self.set_mass, instructions=('x', 'y', 'z'),
                                                      width=120, padx=1, fg_color='transparent')
-        self.height = 0
-        self.height_label = CTkLabel(self, width=120, anchor='e')
-        self.height_entry = EntryWithInstructions(self, self.set_height, 'altitude', width=120)
 
         for i, val in enumerate(self.center_of_mass):
             self.set_mass(i, str(val))
-        self.set_height('0')
         self.build()
 
     def build(self):
@@ -36,10 +32,6 @@ class StaticInputPanel(CTkFrame):
         self.mass_label.grid(column=2, row=0, padx=3, pady=3, sticky='ew')
         self.mass_entry.grid(column=3, row=0, padx=3, pady=3, sticky='ew')
 
-        CTkLabel(self, text='Altitude', width=120, anchor='e').grid(column=0, row=1, padx=3, pady=3)
-        self.height_label.grid(column=2, row=1, padx=3, pady=3)
-        self.height_entry.grid(column=3, row=1, padx=3, pady=3)
-
     @handle_crash
     def set_mass(self, i: int, val: str):
         vals = list(self.center_of_mass)
@@ -53,23 +45,6 @@ class StaticInputPanel(CTkFrame):
         self.center_of_mass = (x, y, z)
         self.mass_label.configure(text=f'({round(x, 3)} , {round(y, 3)} , {round(z, 3)})')
 
-    @handle_crash
-    def set_height(self, raw: str):
-        try:
-            value = int(raw)
-        except ValueError:
-            self.height_entry.flash()
-            HelpTopLevel(None, 'Values must be numeric.')
-            return
-        if not 0 <= value <= 8e4:
-            self.height_entry.flash()
-            HelpTopLevel(None, 'Altitude must be between 0 and 80,000 m.')
-            return
-        self.height_entry.clear()
-        self.focus_set()
-        self.height = value
-        self.height_label.configure(text=str(value))
-
     def get_data(self, size: int):
         return {
             'X_cg': [self.center_of_mass[0]] * size,
@@ -8,18 +8,21 @@ the Free Software Foundation, either version 3 of the License, or
 """
 
 
-from customtkinter import CTkFrame, CTkButton, CTkLabel
+from customtkinter import CTkFrame, CTkButton, CTkLabel, CTkScrollableFrame
 from tkinter import filedialog
 from pathlib import Path
+from threading import Thread
 
-from ..advanced_entry import AdvancedEntry
+from ..advanced_entry import AdvancedEntry, EntryWithInstructions
 from ..popup import Popup
 from ..help_top_level import HelpTopLevel
-from ...backend.geo_design import Airfoil
+from ...backend.geo_design import Airfoil, AirfoilLibrary, AirfoilEntry
 from ...backend import handle_crash
 
 
 class AirfoilChooser(CTkFrame):
+    library = AirfoilLibrary()  # Shared by all the choosers, and kept between sessions.
+
     def __init__(self, parent):
         super().__init__(parent, border_width=3)
         self.path: Path | None = None
@@ -37,6 +40,8 @@ class AirfoilChooser(CTkFrame):
                   ).grid(row=0, column=2, sticky="nse", padx=8, pady=8)
         CTkButton(self, text="NACA", command=self.load_naca
                   ).grid(row=2, column=2, sticky="nse", padx=8, pady=8)
+        CTkButton(self, text="Library", command=self.load_from_library
+                  ).grid(row=1, column=2, sticky="nse", padx=8, pady=0)
 
     @handle_crash
     def load_naca(self):
@@ -73,6 +78,86 @@ class AirfoilChooser(CTkFrame):
             return
         self.airfoil_label.configure(text=self.airfoil.name)
 
+    @handle_crash
+    def load_from_library(self):
+        window = Popup(self)
+        search_entry = EntryWithInstructions(window.frame, lambda _: show_results(), 'Search by name', width=200)
+        search_entry.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+        thickness_entries = [EntryWithInstructions(window.frame, lambda _: show_results(), text, width=90)
+                             for text in ('min t/c %', 'max t/c %')]
+        for i, entry in enumerate(thickness_entries):
+            entry.grid(row=0, column=i + 1, sticky="nsew", padx=(0, 10), pady=10)
+        results = CTkScrollableFrame(window.frame, width=420, height=300)
+        results.grid(row=1, column=0, columnspan=3, sticky="nsew", padx=10)
+        status_label = CTkLabel(window.frame, text="")
+        status_label.grid(row=2, column=0, sticky="nsw", padx=10, pady=10)
+
+        @handle_crash
+        def choose(entry: AirfoilEntry):
+            self.airfoil = entry.airfoil()
+            self.airfoil_label.configure(text=self.airfoil.name)
+            window.destroy()
+
+        @handle_crash
+        def show_results():
+            try:
+                thickness = [float(e.get()) / 100 if e.get() else None for e in thickness_entries]
+            except ValueError:
+                thickness = [None, None]
+            entries = self.library.search(search_entry.get(), thickness=tuple(thickness))
+            for widget in results.winfo_children(): widget.destroy()
+            for i, entry in enumerate(entries):
+                CTkButton(results, text=f"{entry.name}   t/c {entry.thickness:.1%}   camber {entry.camber:.1%}",
+                          anchor="w", fg_color="transparent", command=lambda e=entry: choose(e)
+                          ).grid(row=i, column=0, sticky="nsew")
+            if not self.library.directories(): status_label.configure(text="Add a folder of .dat files.")
+            else: status_label.configure(text=f"{len(entries)} airfoils found.")
+
+        @handle_crash
+        def scan(task):
+            """Runs the scan in the background, showing the number of files checked until it is done."""
+            checked, outcome = [0], []
+
+            def run():
+                try:
+                    task(lambda n: checked.__setitem__(0, n))
+                except Exception as e:  # noqa Raised again in the UI thread
+                    outcome.append(e)
+
+            @handle_crash
+            def poll():
+                if not window.winfo_exists(): return
+                if thread.is_alive():
+                    status_label.configure(text=f"Scanning... {checked[0]} files checked.")
+                    window.after(100, poll)
+                    return
+                for button in scan_buttons: button.configure(state="normal")
+                if outcome: raise outcome[0]
+                show_results()
+
+            for button in scan_buttons: button.configure(state="disabled")
+            thread = Thread(target=run, daemon=True)
+            thread.start()
+            poll()
+
+        @handle_crash
+        def add_folder():
+            directory = filedialog.askdirectory(title="Select Airfoil Folder")
+            if not directory: return
+            scan(lambda progress: self.library.scan(directory, progress))
+
+        @handle_crash
+        def rescan():
+            scan(self.library.rescan)
+
+        search_entry.bind("<KeyRelease>", lambda _: show_results(), add="+")
+        scan_buttons = [CTkButton(window.frame, text="Add Folder", width=90, command=add_folder),
+                        CTkButton(window.frame, text="Rescan", width=90, command=rescan)]
+        for i, button in enumerate(scan_buttons):
+            button.grid(row=2, column=i + 1, sticky="nse", padx=(0, 10), pady=10)
+        show_results()
+        window.run()
+
     def set(self, airfoil: Airfoil):
         self.airfoil = airfoil
         self.airfoil_label.configure(text=f"NACA {airfoil.name}")